@@ -5,7 +5,7 @@ from sqlalchemy import engine_from_config
 from sqlalchemy import pool
 
 from core.config import settings
-from db.models import Base
+from db.models import Base, posts_fts
 
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
@@ -31,6 +31,16 @@ target_metadata = Base.metadata
 # my_important_option = config.get_main_option("my_important_option")
 # ... etc.
 
+# Full-text search objects are managed by hand-written migrations
+SEARCH_INDEX_NAME = 'posts_search_index'
+
+
+def include_object(object, name, type_, reflected, compare_to):
+    """Skip posts_fts with its FTS5 shadow tables and search index."""
+    if type_ == 'table' and name.startswith(posts_fts.name):
+        return False
+    return not (type_ == 'index' and name == SEARCH_INDEX_NAME)
+
 
 def run_migrations_offline() -> None:
     """Run migrations in 'offline' mode.
@@ -50,6 +60,7 @@ def run_migrations_offline() -> None:
         target_metadata=target_metadata,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
+        include_object=include_object,
     )
 
     with context.begin_transaction():
@@ -71,7 +82,9 @@ def run_migrations_online() -> None:
 
     with connectable.connect() as connection:
         context.configure(
-            connection=connection, target_metadata=target_metadata
+            connection=connection,
+            target_metadata=target_metadata,
+            include_object=include_object,
         )
 
         with context.begin_transaction():
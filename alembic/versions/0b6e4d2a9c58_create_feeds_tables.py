@@ -0,0 +1,40 @@
+"""Create feeds, feed_entries tables
+
+Revision ID: 0b6e4d2a9c58
+Revises: f58b2d7e9a40
+Create Date: 2026-10-18 14:02:51.846210
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0b6e4d2a9c58'
+down_revision = 'f58b2d7e9a40'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('feeds',
+    sa.Column('group_id', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('floor_post_id', sa.Integer(), nullable=True),
+    sa.Column('floor_pub_date', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('group_id')
+    )
+    op.create_table('feed_entries',
+    sa.Column('group_id', sa.Integer(), nullable=False),
+    sa.Column('post_id', sa.Integer(), nullable=False),
+    sa.Column('pub_date', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['group_id'], ['feeds.group_id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['post_id'], ['posts.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('group_id', 'post_id')
+    )
+    op.create_index('feed_entries_group_id_pub_date_post_id_index', 'feed_entries', ['group_id', sa.text('pub_date DESC'), sa.text('post_id DESC')], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('feed_entries_group_id_pub_date_post_id_index', table_name='feed_entries')
+    op.drop_table('feed_entries')
+    op.drop_table('feeds')
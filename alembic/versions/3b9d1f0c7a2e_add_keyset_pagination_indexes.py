@@ -0,0 +1,36 @@
+"""Add keyset pagination indexes
+
+Revision ID: 3b9d1f0c7a2e
+Revises: 816cb2e3f5af
+Create Date: 2026-10-18 10:12:41.208364
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3b9d1f0c7a2e'
+down_revision = '816cb2e3f5af'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        'groups_created_at_id_index', 'groups', ['created_at', 'id'],
+        unique=False
+    )
+    op.create_index(
+        'posts_pub_date_id_index', 'posts', ['pub_date', 'id'], unique=False
+    )
+    op.create_index(
+        'users_date_joined_id_index', 'users', ['date_joined', 'id'],
+        unique=False
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('users_date_joined_id_index', table_name='users')
+    op.drop_index('posts_pub_date_id_index', table_name='posts')
+    op.drop_index('groups_created_at_id_index', table_name='groups')
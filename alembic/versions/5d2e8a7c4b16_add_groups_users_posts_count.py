@@ -0,0 +1,34 @@
+"""Add groups, users posts_count counters
+
+Revision ID: 5d2e8a7c4b16
+Revises: 0b6e4d2a9c58
+Create Date: 2026-10-18 16:32:41.207815
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5d2e8a7c4b16'
+down_revision = '0b6e4d2a9c58'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('groups', sa.Column('posts_count', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('users', sa.Column('posts_count', sa.Integer(), server_default='0', nullable=False))
+    op.execute(
+        'UPDATE groups SET posts_count = '
+        '(SELECT count(*) FROM posts WHERE posts.group_id = groups.id)'
+    )
+    op.execute(
+        'UPDATE users SET posts_count = '
+        '(SELECT count(*) FROM posts WHERE posts.author_id = users.id)'
+    )
+
+
+def downgrade() -> None:
+    op.drop_column('users', 'posts_count')
+    op.drop_column('groups', 'posts_count')
@@ -0,0 +1,29 @@
+"""Create import checkpoints table
+
+Revision ID: a41c7e9b5d03
+Revises: 3b9d1f0c7a2e
+Create Date: 2026-10-18 11:02:17.530912
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a41c7e9b5d03'
+down_revision = '3b9d1f0c7a2e'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('import_checkpoints',
+    sa.Column('shard', sa.String(length=255), nullable=False),
+    sa.Column('is_completed', sa.Boolean(), nullable=False),
+    sa.Column('rows_count', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('shard')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('import_checkpoints')
@@ -0,0 +1,26 @@
+"""Add posts, groups updated_at for ETag versions
+
+Revision ID: c7f25d8e1b94
+Revises: a41c7e9b5d03
+Create Date: 2026-10-18 11:47:05.114528
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c7f25d8e1b94'
+down_revision = 'a41c7e9b5d03'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('groups', sa.Column('updated_at', sa.DateTime(), nullable=True))
+    op.add_column('posts', sa.Column('updated_at', sa.DateTime(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('posts', 'updated_at')
+    op.drop_column('groups', 'updated_at')
@@ -0,0 +1,26 @@
+"""Add posts group and author feed indexes
+
+Revision ID: e3a90c4f6b17
+Revises: c7f25d8e1b94
+Create Date: 2026-10-18 12:31:42.603917
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e3a90c4f6b17'
+down_revision = 'c7f25d8e1b94'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index('posts_group_id_pub_date_id_index', 'posts', ['group_id', sa.text('pub_date DESC'), sa.text('id DESC')], unique=False)
+    op.create_index('posts_author_id_pub_date_id_index', 'posts', ['author_id', sa.text('pub_date DESC'), sa.text('id DESC')], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('posts_author_id_pub_date_id_index', table_name='posts')
+    op.drop_index('posts_group_id_pub_date_id_index', table_name='posts')
@@ -0,0 +1,60 @@
+"""Add posts full-text search index
+
+Revision ID: f58b2d7e9a40
+Revises: e3a90c4f6b17
+Create Date: 2026-10-18 13:08:19.275634
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f58b2d7e9a40'
+down_revision = 'e3a90c4f6b17'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.drop_index('ix_posts_text', table_name='posts')
+    if op.get_bind().dialect.name == 'postgresql':
+        op.execute(
+            "CREATE INDEX posts_search_index ON posts USING gin "
+            "(to_tsvector('english', title || ' ' || text))"
+        )
+        return
+    op.execute(
+        "CREATE VIRTUAL TABLE posts_fts USING fts5("
+        "title, text, content='posts', content_rowid='id')"
+    )
+    op.execute(
+        "CREATE TRIGGER posts_fts_insert AFTER INSERT ON posts BEGIN "
+        "INSERT INTO posts_fts(rowid, title, text) "
+        "VALUES (new.id, new.title, new.text); END"
+    )
+    op.execute(
+        "CREATE TRIGGER posts_fts_delete AFTER DELETE ON posts BEGIN "
+        "INSERT INTO posts_fts(posts_fts, rowid, title, text) "
+        "VALUES ('delete', old.id, old.title, old.text); END"
+    )
+    op.execute(
+        "CREATE TRIGGER posts_fts_update AFTER UPDATE OF title, text ON posts "
+        "BEGIN "
+        "INSERT INTO posts_fts(posts_fts, rowid, title, text) "
+        "VALUES ('delete', old.id, old.title, old.text); "
+        "INSERT INTO posts_fts(rowid, title, text) "
+        "VALUES (new.id, new.title, new.text); END"
+    )
+    op.execute("INSERT INTO posts_fts(posts_fts) VALUES ('rebuild')")
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name == 'postgresql':
+        op.drop_index('posts_search_index', table_name='posts')
+    else:
+        op.execute('DROP TRIGGER posts_fts_update')
+        op.execute('DROP TRIGGER posts_fts_delete')
+        op.execute('DROP TRIGGER posts_fts_insert')
+        op.execute('DROP TABLE posts_fts')
+    op.create_index('ix_posts_text', 'posts', ['text'], unique=False)
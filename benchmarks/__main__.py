@@ -0,0 +1,120 @@
+import json
+import os
+
+import click
+
+
+# Names of scenarios.SCENARIOS, kept in sync by tests. The module is not
+# imported here as it imports the app before database url is set
+SCENARIO_NAMES = (
+    'feed_paging', 'deep_pages', 'post_detail', 'login', 'post_create',
+    'post_update', 'post_delete',
+)
+
+
+@click.group()
+def benchmarks():
+    """
+    Measure endpoints latency and throughput on seeded database.
+    Results are saved as JSON to compare runs across commits.
+    """
+    pass
+
+
+@benchmarks.command(help='Seed database and run benchmark scenarios.')
+@click.option(
+    '--concurrency',
+    default=10,
+    help='Requests in flight.',
+    show_default=True,
+    type=click.IntRange(min=1),
+)
+@click.option(
+    '--database-url',
+    default='sqlite:///benchmark.db',
+    help='Database to seed and benchmark, never point it to real data.',
+    show_default=True,
+)
+@click.option(
+    '--groups',
+    default=100,
+    help='Groups seeded into empty database.',
+    show_default=True,
+    type=click.IntRange(min=1),
+)
+@click.option(
+    '--output',
+    default=None,
+    help='Save results to this JSON file.',
+    type=click.Path(dir_okay=False, writable=True),
+)
+@click.option(
+    '--posts',
+    default=10000,
+    help='Posts seeded into empty database.',
+    show_default=True,
+    type=click.IntRange(min=1),
+)
+@click.option(
+    '--requests',
+    default=500,
+    help='Requests sent by every scenario.',
+    show_default=True,
+    type=click.IntRange(min=1),
+)
+@click.option(
+    '--scenario',
+    'names',
+    default=SCENARIO_NAMES,
+    help='Scenario to run, all by default.',
+    multiple=True,
+    type=click.Choice(SCENARIO_NAMES),
+)
+@click.option(
+    '--seed',
+    default=0,
+    help='Random seed of data and requests.',
+    show_default=True,
+    type=int,
+)
+def run(concurrency, database_url, groups, output, posts, requests, names,
+        seed):
+    # Database settings are read on import of the app modules, scenarios
+    # module included
+    os.environ['SQLALCHEMY_DATABASE_URL'] = database_url
+    from benchmarks import runner, workload
+
+    workload.seed(posts=posts, groups=groups, seed=seed)
+    results = runner.run(
+        workload.load(), names, requests, concurrency, seed
+    )
+    for name, stats in results['scenarios'].items():
+        click.echo(
+            f'{name:<12} {stats["rps"]:>9} req/s'
+            f'  p50 {stats["p50_ms"]:>8} ms  p95 {stats["p95_ms"]:>8} ms'
+            f'  p99 {stats["p99_ms"]:>8} ms  errors {stats["errors"]}'
+            f'  skipped {stats["skipped"]}'
+        )
+    if output is not None:
+        with open(output, mode='w', encoding='utf-8') as results_file:
+            json.dump(results, results_file, indent=2)
+
+
+@benchmarks.command(help='Compare results of two benchmark runs.')
+@click.argument('old', type=click.File())
+@click.argument('new', type=click.File())
+def compare(old, new):
+    from benchmarks.runner import compare as compare_results
+
+    for name, metric, old_value, new_value, change in compare_results(
+        json.load(old), json.load(new)
+    ):
+        change = 'n/a' if change is None else f'{change:+}%'
+        click.echo(
+            f'{name:<12} {metric:<7} {old_value:>10} -> {new_value:>10}'
+            f'  {change}'
+        )
+
+
+if __name__ == '__main__':
+    benchmarks()
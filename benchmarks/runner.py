@@ -0,0 +1,156 @@
+import asyncio
+import datetime as dt
+import math
+import platform
+import random
+import subprocess
+import time
+from typing import Iterable, List
+
+import httpx
+
+from benchmarks.scenarios import SCENARIOS, Scenario, login, post_create
+from benchmarks.workload import Workload
+from core.hashing import hashing_pool
+from db.session import engine
+from main import start_app
+
+
+RESULTS_VERSION = 1
+PERCENTILES = (50, 95, 99)
+
+
+def percentile(latencies: List[float], rank: int) -> float:
+    """Get nearest-rank percentile of sorted latencies."""
+    return latencies[max(0, math.ceil(rank / 100 * len(latencies)) - 1)]
+
+
+def get_commit() -> str:
+    """Get current git commit or None outside of repository."""
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            capture_output=True, check=True, text=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def create_posts(
+    client: httpx.AsyncClient, workload: Workload, count: int, seed: int
+):
+    """Create posts of benchmark user until there are count of them."""
+    rng = random.Random(f'{seed}:setup')
+    while len(workload.created_ids) < count:
+        response = await post_create(client, workload, rng)
+        if response.status_code != httpx.codes.CREATED:
+            return
+
+
+async def run_scenario(
+    client: httpx.AsyncClient, scenario: Scenario, workload: Workload,
+    requests: int, concurrency: int, seed: int,
+) -> dict:
+    """Send scenario requests by concurrent workers, get latency stats."""
+    rng = random.Random(f'{seed}:{scenario.name}')
+    remaining = iter(range(requests))
+    latencies = []
+    errors = skipped = 0
+
+    async def worker():
+        nonlocal errors, skipped
+        for _ in remaining:
+            started_at = time.perf_counter()
+            response = await scenario.request(client, workload, rng)
+            if response is None:
+                skipped += 1
+                continue
+            latencies.append(time.perf_counter() - started_at)
+            if response.is_error or response.is_redirect:
+                errors += 1
+
+    started_at = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started_at
+    latencies.sort()
+    # Skipped requests are not sent, all stats are 0 if none were
+    sent = len(latencies)
+    return {
+        'requests': requests,
+        'errors': errors,
+        'skipped': skipped,
+        'rps': round(sent / elapsed, 2),
+        'mean_ms': round(sum(latencies) / sent * 1000, 3) if sent else 0,
+        **{
+            f'p{rank}_ms': round(percentile(latencies, rank) * 1000, 3)
+            if sent else 0
+            for rank in PERCENTILES
+        },
+    }
+
+
+async def run_scenarios(
+    workload: Workload, names: Iterable[str], requests: int,
+    concurrency: int, seed: int,
+) -> dict:
+    """Run scenarios against app started in process."""
+    transport = httpx.ASGITransport(app=start_app())
+    async with httpx.AsyncClient(
+        transport=transport, base_url='http://benchmark'
+    ) as client:
+        token = (await login(client, workload, None)).json()['access_token']
+        workload.headers = {'Authorization': f'Bearer {token}'}
+        results = {}
+        for scenario in SCENARIOS:
+            if scenario.name not in names:
+                continue
+            if scenario.uses_created_posts:
+                await create_posts(client, workload, requests, seed)
+            results[scenario.name] = await run_scenario(
+                client, scenario, workload, requests, concurrency, seed
+            )
+        return results
+
+
+def run(
+    workload: Workload, names: Iterable[str], requests: int,
+    concurrency: int, seed: int,
+) -> dict:
+    """Run scenarios, get results with environment of the run."""
+    try:
+        scenarios = asyncio.run(
+            run_scenarios(workload, names, requests, concurrency, seed)
+        )
+    finally:
+        hashing_pool.shutdown()
+    return {
+        'version': RESULTS_VERSION,
+        'commit': get_commit(),
+        'created_at': dt.datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'database': engine.dialect.name,
+        'posts': len(workload.post_ids),
+        'requests': requests,
+        'concurrency': concurrency,
+        'seed': seed,
+        'scenarios': scenarios,
+    }
+
+
+def compare(old: dict, new: dict) -> List[tuple]:
+    """Get (scenario, metric, old, new, change %) of common scenarios."""
+    rows = []
+    for name, new_stats in new['scenarios'].items():
+        old_stats = old['scenarios'].get(name)
+        if old_stats is None:
+            continue
+        for metric in ('rps', *(f'p{rank}_ms' for rank in PERCENTILES)):
+            change = None
+            if old_stats[metric]:
+                change = round(
+                    (new_stats[metric] / old_stats[metric] - 1) * 100, 1
+                )
+            rows.append(
+                (name, metric, old_stats[metric], new_stats[metric], change)
+            )
+    return rows
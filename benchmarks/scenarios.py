@@ -0,0 +1,101 @@
+import random
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Optional
+
+import httpx
+
+from benchmarks.workload import BENCHMARK_USER, Workload
+from routes.base import API_URL_PREFIX
+
+
+POSTS_URL = f'{API_URL_PREFIX}/posts/'
+# Newest pages are read the most, deep pages are the oldest ones
+FEED_PAGES = 10
+DEEP_PAGES = 100
+
+
+@dataclass
+class Scenario:
+    """Named request repeated by benchmark."""
+
+    name: str
+    request: Callable[
+        [httpx.AsyncClient, Workload, random.Random],
+        Awaitable[Optional[httpx.Response]],
+    ]
+    # Posts of benchmark user are created for scenario beforehand
+    uses_created_posts: bool = False
+
+
+async def feed_paging(client, workload, rng):
+    """Anonymous read of one of the newest feed pages."""
+    return await client.get(
+        POSTS_URL, params={'page': rng.randint(1, FEED_PAGES)}
+    )
+
+
+async def deep_pages(client, workload, rng):
+    """Anonymous read of one of the oldest feed pages."""
+    return await client.get(POSTS_URL, params={'page': rng.randint(
+        max(1, workload.pages - DEEP_PAGES + 1), workload.pages
+    )})
+
+
+async def post_detail(client, workload, rng):
+    """Anonymous read of random post."""
+    return await client.get(f'{POSTS_URL}{rng.choice(workload.post_ids)}')
+
+
+async def login(client, workload, rng):
+    """Get access token of benchmark user."""
+    return await client.post(f'{API_URL_PREFIX}/login/token', data={
+        'username': BENCHMARK_USER['username'],
+        'password': BENCHMARK_USER['password'],
+    })
+
+
+async def post_create(client, workload, rng):
+    """Create post by benchmark user."""
+    response = await client.post(POSTS_URL, headers=workload.headers, json={
+        'group_id': workload.group_id,
+        'text': f'Benchmark text {rng.random()}',
+        'title': 'Benchmark post',
+    })
+    if response.status_code == httpx.codes.CREATED:
+        workload.created_ids.append(response.json()['id'])
+    return response
+
+
+async def post_update(client, workload, rng):
+    """Update one of posts created by benchmark, skip if there are none."""
+    if not workload.created_ids:
+        return None
+    return await client.put(
+        f'{POSTS_URL}{rng.choice(workload.created_ids)}',
+        headers=workload.headers,
+        json={
+            'group_id': workload.group_id,
+            'text': f'Updated benchmark text {rng.random()}',
+            'title': 'Updated benchmark post',
+        },
+    )
+
+
+async def post_delete(client, workload, rng):
+    """Delete one of posts created by benchmark, skip if there are none."""
+    if not workload.created_ids:
+        return None
+    return await client.delete(
+        f'{POSTS_URL}{workload.created_ids.pop()}', headers=workload.headers
+    )
+
+
+SCENARIOS = (
+    Scenario('feed_paging', feed_paging),
+    Scenario('deep_pages', deep_pages),
+    Scenario('post_detail', post_detail),
+    Scenario('login', login),
+    Scenario('post_create', post_create),
+    Scenario('post_update', post_update, uses_created_posts=True),
+    Scenario('post_delete', post_delete, uses_created_posts=True),
+)
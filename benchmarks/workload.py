@@ -0,0 +1,83 @@
+import datetime as dt
+import math
+import random
+from dataclasses import dataclass, field
+from typing import Dict, List
+
+from sqlalchemy import func, insert, select
+
+from core.config import settings
+from core.hashing import Hasher
+from db.management.commands import rebuild_feeds, reconcile_counts
+from db.models import Base, Group, Post, User
+from db.session import engine
+
+
+BENCHMARK_USER = {
+    'email': 'benchmark@postfeed.com',
+    'password': 'Benchmark_Password_1',
+    'username': 'benchmark_user',
+}
+BATCH_SIZE = 10000
+PUB_DATES_START = dt.datetime(2024, 1, 1)
+PUB_DATES_SPAN = dt.timedelta(days=365)
+
+
+@dataclass
+class Workload:
+    """Seeded data requested by scenarios."""
+
+    group_id: int
+    pages: int
+    post_ids: List[int]
+    headers: Dict[str, str] = field(default_factory=dict)
+    created_ids: List[int] = field(default_factory=list)
+
+
+def seed(posts: int, groups: int, seed: int):
+    """Fill empty database with benchmark user, groups and posts."""
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as connection:
+        if connection.scalar(select(User.id).where(
+            User.username == BENCHMARK_USER['username']
+        )) is not None:
+            return
+        rng = random.Random(seed)
+        author_id = connection.scalar(insert(User).values(
+            email=BENCHMARK_USER['email'],
+            password=Hasher.get_hashed_password(BENCHMARK_USER['password']),
+            username=BENCHMARK_USER['username'],
+        ).returning(User.id))
+        group_ids = connection.scalars(insert(Group).returning(Group.id), [{
+            'description': f'Benchmark group {index}',
+            'slug': f'benchmark{index}',
+            'title': f'Benchmark group {index}',
+        } for index in range(groups)]).all()
+        for start in range(0, posts, BATCH_SIZE):
+            connection.execute(insert(Post), [{
+                'author_id': author_id,
+                'group_id': rng.choice(group_ids),
+                'pub_date': PUB_DATES_START + PUB_DATES_SPAN * rng.random(),
+                'text': ' '.join(
+                    f'word{rng.randrange(1000)}'
+                    for _ in range(rng.randint(10, 200))
+                ),
+                'title': f'Benchmark post {index}',
+            } for index in range(start, min(start + BATCH_SIZE, posts))])
+    rebuild_feeds.handle()
+    reconcile_counts.handle()
+
+
+def load() -> Workload:
+    """Get ids and pages count of seeded data."""
+    with engine.connect() as connection:
+        return Workload(
+            group_id=connection.scalar(select(func.min(Group.id))),
+            pages=max(1, math.ceil(
+                connection.scalar(select(func.count(Post.id)))
+                / settings.PAGE_SIZE_POST
+            )),
+            post_ids=connection.scalars(
+                select(Post.id).order_by(Post.id)
+            ).all(),
+        )
@@ -1,26 +1,230 @@
-import click
-
-from db.management.commands import import_csv
-
-
-@click.group()
-def posts():
-    """
-    A web app for reading posts in feed and publishing your own.
-    You can add test data into database to try project features.
-    """
-    pass
-
-
-@posts.command(help='Import test data from .csv file into database.')
-def test_data():
-    import_csv.handle()
-    click.secho(
-        bold=True,
-        fg='green',
-        message='Test data was successfully imported!',
-    )
-
-
-if __name__ == '__main__':
-    posts()
+import os
+
+import click
+
+from core.config import settings
+from core.export import ExportFormat
+from db.management.commands import (
+    export_posts, import_csv, import_shards, rebuild_feeds, reconcile_counts,
+    seed
+)
+
+
+class CountParamType(click.ParamType):
+    """Count with optional k, M or G suffix, e.g. 100k."""
+
+    name = 'count'
+    suffixes = {'k': 10 ** 3, 'm': 10 ** 6, 'g': 10 ** 9}
+
+    def convert(self, value, param, ctx):
+        if isinstance(value, int):
+            return value
+        multiplier = self.suffixes.get(value[-1:].lower(), 1)
+        number = value[:-1] if multiplier > 1 else value
+        try:
+            count = int(float(number) * multiplier)
+        except ValueError:
+            self.fail(f'{value!r} is not a count like 1000 or 20M', param, ctx)
+        if count < 0:
+            self.fail(f'{value!r} is negative', param, ctx)
+        return count
+
+
+@click.group()
+def posts():
+    """
+    A web app for reading posts in feed and publishing your own.
+    You can add test data into database to try project features.
+    """
+    pass
+
+
+@posts.command(help='Import test data from .csv file into database.')
+@click.option(
+    '--batch-size',
+    default=settings.CSV_IMPORT_BATCH_SIZE,
+    help='Rows inserted in one transaction.',
+    show_default=True,
+    type=click.IntRange(min=1),
+)
+@click.option(
+    '--file',
+    'file_path',
+    default=None,
+    help='Import single .csv file named after its table, e.g. posts.csv.',
+    type=click.Path(exists=True, dir_okay=False),
+)
+def test_data(batch_size, file_path):
+    import_csv.handle(batch_size=batch_size, file_path=file_path)
+    click.secho(
+        bold=True,
+        fg='green',
+        message='Test data was successfully imported!',
+    )
+
+
+@posts.command(
+    name='import',
+    help=(
+        'Import groups*.csv, users*.csv and posts*.csv shards from directory'
+        ' in parallel, continue from saved checkpoints.'
+    ),
+)
+@click.argument(
+    'directory', type=click.Path(exists=True, file_okay=False)
+)
+@click.option(
+    '--batch-size',
+    default=settings.CSV_IMPORT_BATCH_SIZE,
+    help='Rows inserted in one transaction.',
+    show_default=True,
+    type=click.IntRange(min=1),
+)
+@click.option(
+    '--workers',
+    default=os.cpu_count() or 1,
+    help='Processes parsing shards concurrently.',
+    show_default=True,
+    type=click.IntRange(min=1),
+)
+def import_data(directory, batch_size, workers):
+    import_shards.handle(
+        directory=directory, batch_size=batch_size, workers=workers
+    )
+    click.secho(
+        bold=True,
+        fg='green',
+        message='Data was successfully imported!',
+    )
+
+
+@posts.command(
+    name='rebuild-feeds',
+    help=(
+        'Rebuild materialized feeds of all posts and of every group, imports'
+        ' run it on their own.'
+    ),
+)
+@click.option(
+    '--size',
+    default=settings.FEED_SIZE,
+    help='Newest posts kept in every feed.',
+    show_default=True,
+    type=click.IntRange(min=1),
+)
+def rebuild(size):
+    rebuild_feeds.handle(size=size)
+
+
+@posts.command(
+    name='reconcile-counts',
+    help=(
+        'Recount posts of every group and user, fix drifted counters.'
+        ' Imports run it on their own.'
+    ),
+)
+def reconcile():
+    reconcile_counts.handle()
+
+
+@posts.command(
+    name='seed',
+    help=(
+        'Generate synthetic users, groups and posts of skewed group sizes,'
+        ' bursty publication dates and varied text lengths.'
+    ),
+)
+@click.option(
+    '--batch-size',
+    default=settings.SEED_BATCH_SIZE,
+    help='Rows inserted in one transaction.',
+    show_default=True,
+    type=click.IntRange(min=1),
+)
+@click.option(
+    '--groups',
+    default='1k',
+    help='Groups to generate.',
+    show_default=True,
+    type=CountParamType(),
+)
+@click.option(
+    '--posts',
+    'posts_count',
+    default='1M',
+    help='Posts to generate.',
+    show_default=True,
+    type=CountParamType(),
+)
+@click.option(
+    '--seed',
+    'random_seed',
+    default=0,
+    help='Random seed, equal seeds generate equal data.',
+    show_default=True,
+    type=int,
+)
+@click.option(
+    '--users',
+    default='10k',
+    help='Users to generate.',
+    show_default=True,
+    type=CountParamType(),
+)
+def seed_data(batch_size, groups, posts_count, random_seed, users):
+    if posts_count and not (groups and users):
+        raise click.BadParameter('Posts require at least one group and user')
+    seed.handle(
+        users=users,
+        groups=groups,
+        posts=posts_count,
+        seed=random_seed,
+        batch_size=batch_size,
+    )
+
+
+@posts.command(
+    name='export',
+    help=(
+        'Export posts as NDJSON or as pipe-delimited .csv the test-data'
+        ' command imports.'
+    ),
+)
+@click.option(
+    '--batch-size',
+    default=settings.EXPORT_BATCH_SIZE,
+    help='Rows fetched from database cursor at once.',
+    show_default=True,
+    type=click.IntRange(min=1),
+)
+@click.option(
+    '--format',
+    'export_format',
+    default=ExportFormat.ndjson.value,
+    help='Export file format.',
+    show_default=True,
+    type=click.Choice([export_format.value for export_format in ExportFormat]),
+)
+@click.option(
+    '--output',
+    default='-',
+    help='File to write, standard output by default.',
+    type=click.File('wb'),
+)
+@click.option(
+    '--since',
+    default=None,
+    help='Export only posts added or changed since then.',
+    type=click.DateTime(),
+)
+def export(batch_size, export_format, output, since):
+    export_posts.handle(
+        output=output,
+        export_format=ExportFormat(export_format),
+        since=since,
+        batch_size=batch_size,
+    )
+
+
+if __name__ == '__main__':
+    posts()
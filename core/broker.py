@@ -0,0 +1,181 @@
+import abc
+import asyncio
+import contextlib
+from functools import cached_property
+from typing import Callable, Dict, Iterable, Optional, Set
+
+import orjson
+from fastapi import WebSocket, WebSocketDisconnect, status
+
+from core.cache import import_string
+from core.config import settings
+
+
+class Event:
+    """Published message serialized once, shared by all subscribers."""
+
+    def __init__(self, data: bytes):
+        self.data = data
+
+    @cached_property
+    def text(self) -> str:
+        """Get WebSocket text frame."""
+        return self.data.decode()
+
+    @cached_property
+    def sse(self) -> bytes:
+        """Get server-sent event."""
+        return b'data: ' + self.data + b'\n\n'
+
+
+class Subscription:
+    """Events of a channel queued for one subscriber."""
+
+    def __init__(self, queue_size: int):
+        self.queue = asyncio.Queue(maxsize=queue_size)
+
+    async def get(self) -> Optional[Event]:
+        """Wait for next event, None if subscriber was dropped."""
+        return await self.queue.get()
+
+
+class BrokerBackend(abc.ABC):
+    """
+    Interface of transport delivering events to brokers of all workers.
+
+    Implement it over a shared pub/sub (e.g. Redis) so that events
+    published by any worker reach subscribers of every worker.
+    """
+
+    @abc.abstractmethod
+    def attach(self, dispatch: Callable[[str, bytes], None]):
+        """Pass messages of all workers channels to dispatch."""
+
+    @abc.abstractmethod
+    async def publish(self, channel: str, data: bytes):
+        """Send message to channel."""
+
+
+class InMemoryBrokerBackend(BrokerBackend):
+    """Broker backend delivering events within worker process."""
+
+    def __init__(self):
+        self.dispatch = None
+
+    def attach(self, dispatch: Callable[[str, bytes], None]):
+        self.dispatch = dispatch
+
+    async def publish(self, channel: str, data: bytes):
+        self.dispatch(channel, data)
+
+
+class Broker:
+    """
+    Publish events to channels subscribers.
+
+    Subscriber whose queue is full is dropped instead of slowing down
+    publishers and other subscribers.
+    """
+
+    def __init__(self, backend: BrokerBackend, queue_size: int):
+        self.backend = backend
+        self.queue_size = queue_size
+        self.subscriptions: Dict[str, Set[Subscription]] = {}
+        backend.attach(self.dispatch)
+
+    async def publish(self, channels: Iterable[str], message: dict):
+        """Serialize message once and send it to channels."""
+        data = orjson.dumps(message)
+        for channel in channels:
+            await self.backend.publish(channel, data)
+
+    def dispatch(self, channel: str, data: bytes):
+        """Queue event for channel subscribers of this worker."""
+        subscriptions = self.subscriptions.get(channel)
+        if not subscriptions:
+            return
+        event = Event(data)
+        for subscription in list(subscriptions):
+            try:
+                subscription.queue.put_nowait(event)
+            except asyncio.QueueFull:
+                self.drop(channel, subscription)
+
+    def drop(self, channel: str, subscription: Subscription):
+        """Unsubscribe slow consumer, discard its events and notify it."""
+        self.subscriptions[channel].discard(subscription)
+        while not subscription.queue.empty():
+            subscription.queue.get_nowait()
+        subscription.queue.put_nowait(None)
+
+    @contextlib.asynccontextmanager
+    async def subscribe(self, channel: str):
+        """Subscribe to channel events until exit."""
+        subscription = Subscription(self.queue_size)
+        self.subscriptions.setdefault(channel, set()).add(subscription)
+        try:
+            yield subscription
+        finally:
+            subscriptions = self.subscriptions.get(channel, set())
+            subscriptions.discard(subscription)
+            if not subscriptions:
+                self.subscriptions.pop(channel, None)
+
+
+def get_feed_channel(group_id: int = None) -> str:
+    """Get channel of all posts feed or of group feed."""
+    return 'feed:all' if group_id is None else f'feed:{group_id}'
+
+
+async def stream_events(broker: Broker, channel: str):
+    """Stream channel events as server-sent events with keepalives."""
+    async with broker.subscribe(channel) as subscription:
+        # Sent at once so response headers are not held until first event
+        yield f'retry: {settings.LIVE_RETRY}\n\n'.encode()
+        while True:
+            try:
+                event = await asyncio.wait_for(
+                    subscription.get(), settings.LIVE_KEEPALIVE
+                )
+            except asyncio.TimeoutError:
+                yield b': keepalive\n\n'
+                continue
+            if event is None:
+                return
+            yield event.sse
+
+
+async def send_events(broker: Broker, channel: str, websocket: WebSocket):
+    """Send channel events to WebSocket until client disconnects."""
+    await websocket.accept()
+    async with broker.subscribe(channel) as subscription:
+
+        async def forward():
+            while (event := await subscription.get()) is not None:
+                await websocket.send_text(event.text)
+            await websocket.close(code=status.WS_1013_TRY_AGAIN_LATER)
+
+        async def wait_disconnect():
+            message = {}
+            while message.get('type') != 'websocket.disconnect':
+                message = await websocket.receive()
+
+        tasks = [
+            asyncio.create_task(forward()),
+            asyncio.create_task(wait_disconnect()),
+        ]
+        done, pending = await asyncio.wait(
+            tasks, return_when=asyncio.FIRST_COMPLETED
+        )
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+        for task in done:
+            with contextlib.suppress(WebSocketDisconnect):
+                task.result()
+
+
+broker = Broker(
+    backend=import_string(settings.BROKER_BACKEND)(),
+    queue_size=settings.LIVE_QUEUE_SIZE,
+)
@@ -0,0 +1,150 @@
+import abc
+import importlib
+import time
+from collections import OrderedDict
+from urllib.parse import parse_qsl, urlencode
+
+from core.config import settings
+
+
+def import_string(path: str):
+    """Import class by dotted path."""
+    module_path, name = path.rsplit('.', 1)
+    return getattr(importlib.import_module(module_path), name)
+
+
+class TTLCache:
+    """Least recently used cache with entries expiring after ttl seconds."""
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+
+    def get(self, key, default=None):
+        """Get value by key if it is not expired."""
+        try:
+            expires_at, value = self._data[key]
+        except KeyError:
+            return default
+        if expires_at <= time.monotonic():
+            del self._data[key]
+            return default
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key, value, ttl: float = None):
+        """Store value, evict the least recently used one if cache is full."""
+        ttl = self.ttl if ttl is None else ttl
+        self._data[key] = (time.monotonic() + ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def delete(self, key):
+        """Remove value by key if exists."""
+        self._data.pop(key, None)
+
+    def clear(self):
+        """Remove all values."""
+        self._data.clear()
+
+
+class CacheBackend(abc.ABC):
+    """
+    Interface of storage for cached responses.
+
+    Implement it over a shared store (e.g. Redis) to share cache entries
+    and invalidations between app workers.
+    """
+
+    @abc.abstractmethod
+    async def get(self, key):
+        """Get value by key or None."""
+
+    @abc.abstractmethod
+    async def set(self, key, value, ttl: float):
+        """Store value for ttl seconds."""
+
+    @abc.abstractmethod
+    async def incr(self, key) -> int:
+        """Increment persistent counter and return its new value."""
+
+    @abc.abstractmethod
+    async def clear(self):
+        """Remove all values and counters."""
+
+
+class InMemoryCacheBackend(CacheBackend):
+    """Cache backend storing values in worker process memory."""
+
+    def __init__(self, maxsize: int):
+        # Counters are kept apart so that LRU eviction never resets them
+        self.counters = {}
+        self.values = TTLCache(maxsize=maxsize, ttl=0)
+
+    async def get(self, key):
+        if key in self.counters:
+            return self.counters[key]
+        return self.values.get(key)
+
+    async def set(self, key, value, ttl: float):
+        self.values.set(key, value, ttl)
+
+    async def incr(self, key) -> int:
+        self.counters[key] = self.counters.get(key, 0) + 1
+        return self.counters[key]
+
+    async def clear(self):
+        self.counters.clear()
+        self.values.clear()
+
+
+class ResponseCache:
+    """
+    Cache of serialized responses keyed by route and query params.
+
+    Every namespace has a generation counter which is a part of its keys,
+    mutators bump it so stale entries are never read again and expire.
+    """
+
+    def __init__(self, backend: CacheBackend, ttl: float):
+        self.backend = backend
+        self.ttl = ttl
+
+    async def get_key(
+        self, namespace: str, path: str, query_string: bytes,
+        encoding: str = None,
+    ):
+        """Get key of response encoding in current namespace generation."""
+        generation = await self.backend.get(f'generation:{namespace}') or 0
+        query = urlencode(sorted(parse_qsl(query_string.decode())))
+        key = f'response:{namespace}:{generation}:{path}?{query}'
+        if encoding is not None:
+            key = f'{key}#{encoding}'
+        return key
+
+    async def get(self, key):
+        """Get cached response or None."""
+        return await self.backend.get(key)
+
+    async def set(self, key, response):
+        """Store response."""
+        await self.backend.set(key, response, self.ttl)
+
+    async def invalidate(self, *namespaces: str):
+        """Make all cached responses of namespaces stale."""
+        for namespace in namespaces:
+            await self.backend.incr(f'generation:{namespace}')
+
+    async def clear(self):
+        """Remove all cached responses."""
+        await self.backend.clear()
+
+
+response_cache = ResponseCache(
+    backend=import_string(settings.RESPONSE_CACHE_BACKEND)(
+        maxsize=settings.RESPONSE_CACHE_MAX_SIZE
+    ),
+    ttl=settings.RESPONSE_CACHE_TTL,
+)
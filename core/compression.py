@@ -0,0 +1,85 @@
+import gzip
+from typing import Iterable, Optional
+
+from starlette.datastructures import Headers
+
+from core.config import settings
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+class Compressor:
+    """
+    Negotiate and apply response content encodings.
+
+    Encodings are tried in the given order of preference, brotli is
+    skipped if Brotli package is not installed.
+    """
+
+    def __init__(
+        self,
+        encodings: Iterable[str],
+        minimum_size: int,
+        content_types: Iterable[str],
+        gzip_level: int,
+        brotli_quality: int,
+    ):
+        self.encodings = [
+            encoding for encoding in encodings
+            if encoding == 'gzip' or (encoding == 'br' and brotli is not None)
+        ]
+        self.minimum_size = minimum_size
+        self.content_types = set(content_types)
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    def negotiate(self, accept_encoding: Optional[str]) -> Optional[str]:
+        """Get preferred encoding accepted by client or None."""
+        if not accept_encoding:
+            return None
+        accepted = {}
+        for item in accept_encoding.split(','):
+            coding, _, params = item.strip().partition(';')
+            quality = 1.0
+            name, _, value = params.strip().partition('=')
+            if name.strip() == 'q':
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+            accepted[coding.strip().lower()] = quality
+        for encoding in self.encodings:
+            if accepted.get(encoding, accepted.get('*', 0)) > 0:
+                return encoding
+        return None
+
+    def is_compressible_type(self, headers: Headers) -> bool:
+        """Check response content type is worth compressing."""
+        content_type = headers.get('content-type', '')
+        return content_type.split(';')[0].strip() in self.content_types
+
+    def is_compressible(self, headers: Headers, size: int) -> bool:
+        """Check response is not encoded yet and big enough to compress."""
+        return (
+            'content-encoding' not in headers
+            and size >= self.minimum_size
+            and self.is_compressible_type(headers)
+        )
+
+    def compress(self, body: bytes, encoding: str) -> bytes:
+        """Compress body with encoding."""
+        if encoding == 'br':
+            return brotli.compress(body, quality=self.brotli_quality)
+        return gzip.compress(body, compresslevel=self.gzip_level, mtime=0)
+
+
+compressor = Compressor(
+    encodings=settings.COMPRESSION_ENCODINGS,
+    minimum_size=settings.COMPRESSION_MINIMUM_SIZE,
+    content_types=settings.COMPRESSION_CONTENT_TYPES,
+    gzip_level=settings.COMPRESSION_GZIP_LEVEL,
+    brotli_quality=settings.COMPRESSION_BROTLI_QUALITY,
+)
@@ -16,7 +16,27 @@ class Settings:
     PROJECT_VERSION = '1.0.0'
 
     # Database settings
-    SQLALCHEMY_DATABASE_URL = 'sqlite:///postfeed.db'
+    SQLALCHEMY_DATABASE_URL = os.getenv(
+        'SQLALCHEMY_DATABASE_URL', 'sqlite:///postfeed.db'
+    )
+    # Derived from SQLALCHEMY_DATABASE_URL with async driver if not set
+    SQLALCHEMY_ASYNC_DATABASE_URL = os.getenv('SQLALCHEMY_ASYNC_DATABASE_URL')
+    DB_MAX_OVERFLOW = int(os.getenv('DB_MAX_OVERFLOW', 10))
+    DB_POOL_PRE_PING = os.getenv('DB_POOL_PRE_PING', 'true') == 'true'
+    DB_POOL_RECYCLE = int(os.getenv('DB_POOL_RECYCLE', 1800))
+    DB_POOL_SIZE = int(os.getenv('DB_POOL_SIZE', 5))
+    DB_POOL_TIMEOUT = int(os.getenv('DB_POOL_TIMEOUT', 30))
+    DB_STATEMENT_TIMEOUT = int(os.getenv('DB_STATEMENT_TIMEOUT', 30000))
+    SQLITE_MMAP_SIZE = int(os.getenv('SQLITE_MMAP_SIZE', 268435456))
+
+    # Read replicas settings
+    SQLALCHEMY_REPLICA_URLS = [
+        url for url in os.getenv('SQLALCHEMY_REPLICA_URLS', '').split(',')
+        if url
+    ]
+    READ_YOUR_WRITES_TTL = int(os.getenv('READ_YOUR_WRITES_TTL', 10))
+    REPLICA_CHECK_INTERVAL = int(os.getenv('REPLICA_CHECK_INTERVAL', 5))
+    REPLICA_RETRY_INTERVAL = int(os.getenv('REPLICA_RETRY_INTERVAL', 30))
 
     # User constants
     EMAIL_MAX_LENGTH = 100
@@ -35,21 +55,115 @@ class Settings:
 
     # Post constants
     POST_TITLE_MAX_LENGTH = 200
+    POSTS_BULK_MAX_SIZE = 1000
+    POSTS_IDS_MAX_COUNT = 100
+
+    # Posts full-text search settings
+    SEARCH_LANGUAGE = 'english'
+    SEARCH_QUERY_MAX_LENGTH = 200
+    SEARCH_QUERY_NAME = 'Words to search in posts title and text'
 
     # JWT settings
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 600
     ENCODE_ALGORITHM = 'HS256'
     SECRET_KEY: str = os.getenv('SECRET_KEY')
 
+    # Password hashing settings
+    HASHING_POOL_SIZE = int(
+        os.getenv('HASHING_POOL_SIZE', os.cpu_count() or 1)
+    )
+
+    # Public responses cache settings
+    RESPONSE_CACHE_BACKEND = os.getenv(
+        'RESPONSE_CACHE_BACKEND', 'core.cache.InMemoryCacheBackend'
+    )
+    RESPONSE_CACHE_MAX_SIZE = 10000
+    RESPONSE_CACHE_TTL = 30
+
+    # Response compression settings
+    # Comma separated encodings in order of preference, empty disables
+    COMPRESSION_ENCODINGS = [
+        encoding for encoding in os.getenv(
+            'COMPRESSION_ENCODINGS', 'br,gzip'
+        ).split(',') if encoding
+    ]
+    COMPRESSION_MINIMUM_SIZE = int(
+        os.getenv('COMPRESSION_MINIMUM_SIZE', 1024)
+    )
+    COMPRESSION_CONTENT_TYPES = (
+        'application/json', 'text/csv', 'text/html', 'text/plain'
+    )
+    COMPRESSION_GZIP_LEVEL = 6
+    COMPRESSION_BROTLI_QUALITY = 5
+
+    # Live feed settings
+    BROKER_BACKEND = os.getenv(
+        'BROKER_BACKEND', 'core.broker.InMemoryBrokerBackend'
+    )
+    LIVE_GROUP_ID_NAME = 'Receive posts of group with this id only'
+    LIVE_KEEPALIVE = 15
+    LIVE_QUEUE_SIZE = 100
+    LIVE_RETRY = 3000
+
+    # Materialized feeds settings
+    FEED_ALL_POSTS_ID = 0
+    FEED_SIZE = 1000
+    FEEDS_REBUILD_SUCCESS = ('{count} feeds have been successfully rebuilt'
+                             ' with up to {size} newest posts each')
+
+    # Posts counters settings
+    COUNTS_RECONCILE_SUCCESS = ('Posts counts of {groups} groups and {users}'
+                                ' users have been reconciled')
+
+    # Metrics settings
+    METRICS_LATENCY_BUCKETS = (
+        0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10
+    )
+    METRICS_QUERIES_BUCKETS = (0, 1, 2, 3, 5, 10, 25, 50, 100)
+    METRICS_URL = '/metrics'
+    SERVER_TIMING_ENABLED = (
+        os.getenv('SERVER_TIMING_ENABLED', 'false') == 'true'
+    )
+
+    # Authenticated user cache settings
+    USER_CACHE_MAX_SIZE = 1024
+    USER_CACHE_TTL = 60
+
     # CSV import settings
     CSV_IMPORT_FILE_PATH = './db/csv_data'
     CSV_IMPORT_INVALID_PATH = 'Error! {path} not found'
     CSV_IMPORT_PROCCESSING = ('Importing objects from'
                               ' {filename}.csv is processing...')
+    CSV_IMPORT_BATCH_SIZE = 1000
+    CSV_IMPORT_INVALID_TABLE = 'Error! {path} name must be one of: {tables}'
     CSV_IMPORT_SUCCESS = ('{count} objects from {filename}.csv has been '
-                          ' successfully imported into {filename} model')
+                          ' successfully imported into {filename} model'
+                          ' ({rate:.0f} rows/sec)')
     CSV_IMPORT_TIME_FORMAT = '%Y-%m-%dT%H:%M:%SZ'
 
+    # Sharded .csv import settings
+    IMPORT_SHARD_NAME_MAX_LENGTH = 255
+    IMPORT_SHARD_PATTERN = '{table}*.csv'
+    IMPORT_SHARD_SKIPPED = 'Shard {shard} was already imported, skipped'
+    IMPORT_SHARD_SUCCESS = ('{count} objects from {shard} has been'
+                            ' successfully imported, {invalid} invalid rows'
+                            ' skipped')
+    IMPORT_SHARDS_NOT_FOUND = 'Error! No .csv shards found in {path}'
+
+    # Posts export settings
+    EXPORT_BATCH_SIZE = 1000
+    EXPORT_FORMAT_NAME = 'Export file format'
+    EXPORT_SINCE_NAME = 'Export only posts added or changed since then'
+
+    # Synthetic data settings
+    SEED_BATCH_SIZE = 10000
+    SEED_DATES_END = '2026-01-01T00:00:00Z'
+    SEED_DATES_DAYS = 730
+    SEED_PASSWORD = 'Seed_Password_1'
+    SEED_PROCESSING = 'Generating {count} {table}...'
+    SEED_SUCCESS = ('{count} {table} have been successfully generated'
+                    ' ({rate:.0f} rows/sec)')
+
     # Pagination settings
     PAGE_SIZE_NAME = 'Page size'
     PAGE_SIZE_MAX = 25
@@ -57,14 +171,36 @@ class Settings:
     PAGE_SIZE_GROUP = 10
     PAGE_SIZE_POST = 5
     PAGE_SIZE_USER = 10
+    AUTHOR_ID_NAME = 'Show posts of author with this id only'
+    IDS_NAME = 'Show posts with these comma separated ids only'
+    EXPAND_NAME = 'Embed comma separated post relations: author, group'
+    CURSOR_NAME = 'Opaque cursor of the next page'
+    CURSOR_INCLUDE_TOTAL_NAME = 'Count total number of objects'
+
+    # Sparse fieldsets settings
+    FIELDS_NAME = 'Show only these comma separated fields of objects'
+    FIELDS_SCHEMAS_MAX_COUNT = 256
+    SNIPPET_LENGTH_NAME = 'Cut posts text to this number of characters'
 
     # Messages
+    GROUP_HAS_POSTS_MSG = 'Group with id:{id} has posts and can not be deleted'
     OBJECT_DELETED_MSG = '{object} with id:{id} successfully deleted'
     OBJECT_NOT_FOUND_MSG = '{object} with id:{id} does not exist'
     ONLY_POST_AUTHOR_ACTION_MSG = 'Only author can {action} the post'
+    INVALID_FIELD_MSG = '{field}: {message}'
+    POSTS_CONFLICT_MSG = ('Posts groups were changed while posts were'
+                          ' created, retry the request')
 
     SUPERUSER_RESOURCE_MSG = 'Resource for superusers only'
     INVALID_CREDENTIALS_MSG = 'Invalid credentials'
+    INACTIVE_USER_MSG = 'User is inactive'
+    INVALID_CURSOR_MSG = 'Invalid pagination cursor'
+    INVALID_EXPAND_MSG = 'expand must be comma separated values of: {fields}'
+    INVALID_FIELDS_MSG = 'fields must be comma separated values of: {fields}'
+    FIELDS_WITH_EXPAND_MSG = ('fields and snippet_length can not be used'
+                              ' with expand')
+    INVALID_IDS_MSG = ('ids must be up to {count} comma separated'
+                       ' integers')
 
 
 settings = Settings()
@@ -0,0 +1,208 @@
+import hashlib
+from email.utils import formatdate
+from typing import Optional
+
+from fastapi import Request, Response, status
+from fastapi_pagination.api import create_page, resolve_params
+from sqlalchemy import Select, func, inspect, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.projection import (
+    get_columns_key, get_page_fields, get_rows_response, get_schema_columns
+)
+
+
+def make_etag(*versions) -> str:
+    """Make strong ETag from ids and versions of response objects."""
+    return '"{}"'.format(hashlib.md5(repr(versions).encode()).hexdigest())
+
+
+def get_versions(obj) -> list:
+    """Get id and version of object and of its embedded related objects."""
+    state = inspect(obj)
+    versions = [(obj.id, obj.version)]
+    for relation in state.mapper.relationships:
+        if relation.uselist or relation.key in state.unloaded:
+            continue
+        related = getattr(obj, relation.key)
+        if related is not None:
+            versions.append(((relation.key, related.id), related.version))
+    return versions
+
+
+def is_etag_matched(
+    if_none_match: Optional[str], etag: Optional[str]
+) -> bool:
+    """Check If-None-Match request header weakly matches the ETag."""
+    if not if_none_match or not etag:
+        return False
+    client_etags = [tag.strip() for tag in if_none_match.split(',')]
+    return '*' in client_etags or any(
+        tag.removeprefix('W/') == etag.removeprefix('W/')
+        for tag in client_etags
+    )
+
+
+def get_validators(etag: str, versions) -> dict:
+    """Get ETag and Last-Modified headers of response objects."""
+    headers = {'ETag': etag}
+    last_modified = max(
+        (version for _, version in versions if version is not None),
+        default=None,
+    )
+    if last_modified is not None:
+        headers['Last-Modified'] = formatdate(
+            last_modified.timestamp(), usegmt=True
+        )
+    return headers
+
+
+def not_modified_response(etag: str, versions) -> Response:
+    """Get empty 304 response with validators headers."""
+    return Response(
+        status_code=status.HTTP_304_NOT_MODIFIED,
+        headers=get_validators(etag, versions),
+    )
+
+
+async def get_with_etag(
+    request: Request, response: Response, db: AsyncSession, model, id: int,
+    get_object,
+):
+    """
+    Get object or respond 304 if client has its current version.
+
+    Conditional requests check only the indexed version of the object,
+    ETag of object with embedded related ones also covers their versions
+    and is checked after loading.
+    """
+    if_none_match = request.headers.get('if-none-match')
+    if if_none_match is not None:
+        version = (await db.execute(
+            select(model.version).where(model.id == id)
+        )).first()
+        if version is not None:
+            versions = [(id, version[0])]
+            etag = make_etag(*versions)
+            if is_etag_matched(if_none_match, etag):
+                return not_modified_response(etag, versions)
+    obj = await get_object(id=id, db=db)
+    versions = get_versions(obj)
+    etag = make_etag(*versions)
+    if is_etag_matched(if_none_match, etag):
+        return not_modified_response(etag, versions)
+    response.headers.update(get_validators(etag, versions))
+    return obj
+
+
+async def get_rows(db: AsyncSession, query: Select, model, columns: list):
+    """Get rows of columns and their versions."""
+    # Versions need ids even if they are not among the fields
+    id_column = [model.id]
+    if any(column.key == 'id' for column in columns):
+        id_column = []
+    rows = (await db.execute(query.with_only_columns(
+        *columns, *id_column, model.version.label('version')
+    ))).all()
+    return rows, [(row.id, row.version) for row in rows]
+
+
+async def paginate_with_etag(
+    request: Request, response: Response, db: AsyncSession, query: Select,
+    model, count_query: Select = None, options: list = (), schema=None,
+    columns: list = None,
+):
+    """
+    Paginate query or respond 304 if client has current page version.
+
+    Conditional requests check only total and versions of page rows,
+    pages with embedded related objects are checked after loading. Total
+    is counted by count_query if given, by query otherwise, load options
+    apply to page objects only. Without options page of schema
+    is read from selected columns, schema columns by default, and
+    responded as serialized JSON.
+    """
+    variant = ()
+    if columns is not None:
+        variant = get_columns_key(columns)
+    elif schema is not None:
+        columns = get_schema_columns(model, schema)
+    params = resolve_params()
+    raw_params = params.to_raw_params().as_limit_offset()
+    if count_query is None:
+        count_query = select(func.count()).select_from(
+            query.order_by(None).subquery()
+        )
+    total = await db.scalar(count_query)
+    if_none_match = request.headers.get('if-none-match')
+    if if_none_match is not None and not options:
+        versions = [tuple(row) for row in await db.execute(
+            query.with_only_columns(model.id, model.version)
+            .limit(raw_params.limit)
+            .offset(raw_params.offset)
+        )]
+        etag = make_etag(total, versions, *variant)
+        if is_etag_matched(if_none_match, etag):
+            return not_modified_response(etag, versions)
+    if columns is not None and not options:
+        rows, versions = await get_rows(
+            db,
+            query.limit(raw_params.limit).offset(raw_params.offset),
+            model,
+            columns,
+        )
+        return get_rows_response(
+            rows, columns, schema, get_page_fields(total, params),
+            headers=get_validators(
+                make_etag(total, versions, *variant), versions
+            ),
+        )
+    items = (await db.scalars(
+        query.options(*options)
+        .limit(raw_params.limit)
+        .offset(raw_params.offset)
+    )).all()
+    versions = [version for item in items for version in get_versions(item)]
+    etag = make_etag(total, versions)
+    if is_etag_matched(if_none_match, etag):
+        return not_modified_response(etag, versions)
+    response.headers.update(get_validators(etag, versions))
+    return create_page(items, total=total, params=params)
+
+
+async def get_page_with_etag(
+    request: Request, response: Response, db: AsyncSession, query: Select,
+    model, size: int, options: list = (), schema=None, columns: list = None,
+):
+    """
+    Get all objects of short query as one page or respond 304 if unchanged.
+
+    Objects are read by a single query, total is their count. Options and
+    columns are applied as in paginate_with_etag.
+    """
+    variant = ()
+    if columns is not None:
+        variant = get_columns_key(columns)
+    elif schema is not None:
+        columns = get_schema_columns(model, schema)
+    if columns is not None and not options:
+        items, versions = await get_rows(db, query, model, columns)
+    else:
+        items = (await db.scalars(query.options(*options))).all()
+        versions = [
+            version for item in items for version in get_versions(item)
+        ]
+        variant = ()
+    etag = make_etag(versions, *variant)
+    if is_etag_matched(request.headers.get('if-none-match'), etag):
+        return not_modified_response(etag, versions)
+    page = {
+        'total': len(items), 'page': 1, 'size': size, 'pages': int(bool(items))
+    }
+    if columns is not None and not options:
+        return get_rows_response(
+            items, columns, schema, page,
+            headers=get_validators(etag, versions),
+        )
+    response.headers.update(get_validators(etag, versions))
+    return {'items': items, **page}
@@ -0,0 +1,51 @@
+import csv
+import datetime as dt
+import io
+from enum import Enum
+from typing import Iterable, Sequence
+
+import orjson
+
+from core.config import settings
+
+
+class ExportFormat(str, Enum):
+    """Export file formats."""
+
+    csv = 'csv'
+    ndjson = 'ndjson'
+
+
+EXPORT_MEDIA_TYPES = {
+    ExportFormat.csv: 'text/csv',
+    ExportFormat.ndjson: 'application/x-ndjson',
+}
+
+
+def get_csv_header(columns: Sequence[str]) -> bytes:
+    """Get header line of .csv export."""
+    return format_csv([columns])
+
+
+def format_csv(rows: Iterable[Sequence]) -> bytes:
+    """Get pipe-delimited .csv lines, the format import command reads."""
+    buffer = io.StringIO()
+    csv.writer(buffer, delimiter='|').writerows(
+        [
+            value.strftime(settings.CSV_IMPORT_TIME_FORMAT)
+            if isinstance(value, dt.datetime) else value
+            for value in row
+        ]
+        for row in rows
+    )
+    return buffer.getvalue().encode()
+
+
+def format_rows(rows: Sequence, export_format: ExportFormat) -> bytes:
+    """Get export lines of rows batch."""
+    if export_format == ExportFormat.csv:
+        return format_csv(rows)
+    return b''.join(
+        orjson.dumps(row._asdict(), option=orjson.OPT_APPEND_NEWLINE)
+        for row in rows
+    )
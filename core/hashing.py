@@ -1,5 +1,13 @@
+import asyncio
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
 from passlib.context import CryptContext
 
+from core.config import settings
+
 
 pwd_context = CryptContext(schemes=['bcrypt'], deprecated='auto')
 
@@ -16,3 +24,84 @@ class Hasher:
     def get_hashed_password(password):
         """Hash password."""
         return pwd_context.hash(password)
+
+    @staticmethod
+    async def verify_password_async(plain_pass, hashed_pass):
+        """Verify passwords in hashing pool without blocking event loop."""
+        return await hashing_pool.run(
+            Hasher.verify_password, plain_pass, hashed_pass
+        )
+
+    @staticmethod
+    async def get_hashed_password_async(password):
+        """Hash password in hashing pool without blocking event loop."""
+        return await hashing_pool.run(Hasher.get_hashed_password, password)
+
+
+class HashingMetrics:
+    """Hashing pool in-flight calls and latency counters."""
+
+    def __init__(self):
+        self.in_flight = 0
+        self.calls_count = 0
+        self.latency_sum = 0.0
+        self.latency_max = 0.0
+
+    def observe(self, latency: float):
+        """Count finished call latency including time in queue."""
+        self.calls_count += 1
+        self.latency_sum += latency
+        self.latency_max = max(self.latency_max, latency)
+
+
+class HashingPool:
+    """
+    Process pool for CPU bound password hashing.
+
+    bcrypt holds the GIL for every call, so hashes run in separate
+    processes and scale across cores, while request handlers only await.
+    """
+
+    def __init__(self, max_workers: int):
+        self.max_workers = max_workers
+        self.metrics = HashingMetrics()
+        self._executor = None
+
+    def get_executor(self):
+        """Start worker processes on first use."""
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context('spawn'),
+            )
+        return self._executor
+
+    async def run(self, func, *args):
+        """
+        Run func in worker process and count its metrics.
+
+        Pool broken by a dead worker is dropped so the next call starts new
+        processes, the failed call falls back to a thread.
+        """
+        self.metrics.in_flight += 1
+        started_at = time.perf_counter()
+        try:
+            try:
+                return await asyncio.get_running_loop().run_in_executor(
+                    self.get_executor(), func, *args
+                )
+            except BrokenProcessPool:
+                self.shutdown(wait=False)
+                return await asyncio.to_thread(func, *args)
+        finally:
+            self.metrics.in_flight -= 1
+            self.metrics.observe(time.perf_counter() - started_at)
+
+    def shutdown(self, wait: bool = True):
+        """Stop worker processes."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait)
+            self._executor = None
+
+
+hashing_pool = HashingPool(max_workers=settings.HASHING_POOL_SIZE)
@@ -0,0 +1,153 @@
+import bisect
+import time
+from contextvars import ContextVar
+from typing import Dict, Optional, Sequence, Tuple
+
+from fastapi import Request
+from fastapi.responses import PlainTextResponse
+
+from core.config import settings
+from core.hashing import hashing_pool
+
+
+class RequestStats:
+    """Database usage of a single request."""
+
+    def __init__(self):
+        self.queries_count = 0
+        self.db_time = 0.0
+
+
+request_stats: ContextVar[Optional[RequestStats]] = ContextVar(
+    'request_stats', default=None
+)
+
+
+def before_cursor_execute(conn, cursor, statement, parameters, context,
+                          executemany):
+    """Remember statement start time on its execution context."""
+    # Context lives for one execution, failed ones leave nothing behind
+    if context is not None:
+        context.query_started_at = time.perf_counter()
+
+
+def after_cursor_execute(conn, cursor, statement, parameters, context,
+                         executemany):
+    """Count statement and its time in stats of the current request."""
+    started_at = getattr(context, 'query_started_at', None)
+    stats = request_stats.get()
+    if stats is not None and started_at is not None:
+        stats.queries_count += 1
+        stats.db_time += time.perf_counter() - started_at
+
+
+class Histogram:
+    """Prometheus histogram with labels."""
+
+    def __init__(self, name: str, description: str, buckets: Sequence[float]):
+        self.name = name
+        self.description = description
+        self.buckets = sorted(buckets)
+        self.series: Dict[Tuple, list] = {}
+
+    def observe(self, labels: Tuple[Tuple[str, str], ...], value: float):
+        """Count value in buckets of labels series."""
+        series = self.series.setdefault(
+            labels, [[0] * len(self.buckets), 0, 0.0]
+        )
+        index = bisect.bisect_left(self.buckets, value)
+        if index < len(self.buckets):
+            series[0][index] += 1
+        series[1] += 1
+        series[2] += value
+
+    def render(self):
+        """Get histogram lines in Prometheus text format."""
+        yield f'# HELP {self.name} {self.description}'
+        yield f'# TYPE {self.name} histogram'
+        for labels, (counts, count, total) in self.series.items():
+            cumulative = 0
+            for bucket, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                yield (f'{self.name}_bucket'
+                       f'{format_labels(labels + (("le", bucket),))}'
+                       f' {cumulative}')
+            yield (f'{self.name}_bucket'
+                   f'{format_labels(labels + (("le", "+Inf"),))} {count}')
+            yield f'{self.name}_count{format_labels(labels)} {count}'
+            yield f'{self.name}_sum{format_labels(labels)} {total}'
+
+
+def format_labels(labels: Tuple[Tuple[str, str], ...]) -> str:
+    """Get Prometheus labels with escaped values."""
+    return '{' + ','.join(
+        '{}="{}"'.format(name, str(value).replace('\\', '\\\\')
+                         .replace('"', '\\"').replace('\n', '\\n'))
+        for name, value in labels
+    ) + '}'
+
+
+class Metrics:
+    """Request latency and database usage per route."""
+
+    def __init__(self):
+        self.request_duration = Histogram(
+            'http_request_duration_seconds',
+            'Request latency in seconds',
+            settings.METRICS_LATENCY_BUCKETS,
+        )
+        self.db_queries = Histogram(
+            'http_request_db_queries',
+            'Database statements executed per request',
+            settings.METRICS_QUERIES_BUCKETS,
+        )
+        self.db_duration = Histogram(
+            'http_request_db_duration_seconds',
+            'Database time per request in seconds',
+            settings.METRICS_LATENCY_BUCKETS,
+        )
+
+    def observe(self, method: str, route: str, duration: float,
+                stats: RequestStats):
+        """Count finished request."""
+        labels = (('method', method), ('route', route))
+        self.request_duration.observe(labels, duration)
+        self.db_queries.observe(labels, stats.queries_count)
+        self.db_duration.observe(labels, stats.db_time)
+
+    def clear(self):
+        """Forget all observed requests."""
+        for histogram in (
+            self.request_duration, self.db_queries, self.db_duration
+        ):
+            histogram.series.clear()
+
+    def render(self) -> str:
+        """Get all metrics in Prometheus text format."""
+        hashing = hashing_pool.metrics
+        lines = [
+            *self.request_duration.render(),
+            *self.db_queries.render(),
+            *self.db_duration.render(),
+            '# HELP password_hashing_in_flight Hashing calls not finished yet',
+            '# TYPE password_hashing_in_flight gauge',
+            f'password_hashing_in_flight {hashing.in_flight}',
+            '# HELP password_hashing_duration_seconds Hashing calls latency',
+            '# TYPE password_hashing_duration_seconds summary',
+            f'password_hashing_duration_seconds_count {hashing.calls_count}',
+            f'password_hashing_duration_seconds_sum {hashing.latency_sum}',
+            '# HELP password_hashing_duration_seconds_max Slowest hashing',
+            '# TYPE password_hashing_duration_seconds_max gauge',
+            f'password_hashing_duration_seconds_max {hashing.latency_max}',
+        ]
+        return '\n'.join(lines) + '\n'
+
+
+metrics = Metrics()
+
+
+async def metrics_endpoint(request: Request):
+    """Expose metrics for Prometheus scraper."""
+    return PlainTextResponse(
+        metrics.render(), media_type='text/plain; version=0.0.4'
+    )
@@ -0,0 +1,199 @@
+import re
+import time
+from typing import Iterable, Tuple
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.routing import Match
+
+from core.cache import ResponseCache
+from core.compression import Compressor
+from core.etag import is_etag_matched
+from core.metrics import Metrics, RequestStats, request_stats
+
+
+class ResponseCacheMiddleware:
+    """
+    Serve repeated anonymous GET requests from response cache.
+
+    Only successful not streamed responses of paths matching one of
+    namespaces patterns are stored, requests with Authorization header
+    always reach routes.
+    With compressor responses are stored per negotiated encoding, so
+    they are compressed once by inner CompressionMiddleware.
+    """
+
+    def __init__(
+        self,
+        app,
+        cache: ResponseCache,
+        namespaces: Iterable[Tuple[str, str]],
+        compressor: Compressor = None,
+    ):
+        self.app = app
+        self.cache = cache
+        self.compressor = compressor
+        self.namespaces = [
+            (re.compile(pattern), namespace)
+            for pattern, namespace in namespaces
+        ]
+
+    def get_namespace(self, path: str):
+        """Get cache namespace of request path."""
+        for pattern, namespace in self.namespaces:
+            if pattern.match(path):
+                return namespace
+        return None
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http' or scope['method'] != 'GET':
+            return await self.app(scope, receive, send)
+        namespace = self.get_namespace(scope['path'])
+        request_headers = Headers(scope=scope)
+        if namespace is None or 'authorization' in request_headers:
+            return await self.app(scope, receive, send)
+        encoding = None
+        if self.compressor is not None:
+            encoding = self.compressor.negotiate(
+                request_headers.get('accept-encoding')
+            )
+        key = await self.cache.get_key(
+            namespace, scope['path'], scope['query_string'], encoding
+        )
+        cached_response = await self.cache.get(key)
+        if cached_response is not None:
+            status, headers, body = cached_response
+            headers = MutableHeaders(raw=list(headers))
+            headers['X-Cache'] = 'HIT'
+            if is_etag_matched(
+                request_headers.get('if-none-match'), headers.get('etag')
+            ):
+                status, body = 304, b''
+                del headers['content-length']
+                del headers['content-encoding']
+            await send({
+                'type': 'http.response.start',
+                'status': status,
+                'headers': headers.raw,
+            })
+            await send({'type': 'http.response.body', 'body': body})
+            return
+        response = {'body': []}
+
+        async def send_and_store(message):
+            if message['type'] == 'http.response.start':
+                response['status'] = message['status']
+                response['headers'] = list(message['headers'])
+                MutableHeaders(scope=message)['X-Cache'] = 'MISS'
+            elif message['type'] == 'http.response.body':
+                # Streamed responses are not stored, they may never end
+                if message.get('more_body', False):
+                    response['status'] = None
+                elif response['status'] == 200:
+                    response['body'].append(message.get('body', b''))
+                    await self.cache.set(key, (
+                        response['status'],
+                        response['headers'],
+                        b''.join(response['body']),
+                    ))
+            await send(message)
+
+        await self.app(scope, receive, send_and_store)
+
+
+class CompressionMiddleware:
+    """
+    Compress responses with encoding accepted by client.
+
+    Streamed responses and ones smaller than compressor minimum size are
+    sent as is, ETag of compressed response is weakened.
+    """
+
+    def __init__(self, app, compressor: Compressor):
+        self.app = app
+        self.compressor = compressor
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            return await self.app(scope, receive, send)
+        encoding = self.compressor.negotiate(
+            Headers(scope=scope).get('accept-encoding')
+        )
+        response = {}
+
+        async def send_compressed(message):
+            if message['type'] == 'http.response.start':
+                response['start'] = message
+                return
+            start = response.pop('start', None)
+            if start is None:
+                return await send(message)
+            headers = MutableHeaders(scope=start)
+            if self.compressor.is_compressible_type(headers):
+                headers.add_vary_header('Accept-Encoding')
+            body = message.get('body', b'')
+            if (encoding is not None and not message.get('more_body', False)
+                    and self.compressor.is_compressible(headers, len(body))):
+                body = self.compressor.compress(body, encoding)
+                headers['Content-Encoding'] = encoding
+                headers['Content-Length'] = str(len(body))
+                etag = headers.get('etag')
+                if etag is not None and not etag.startswith('W/'):
+                    headers['ETag'] = f'W/{etag}'
+                message = {**message, 'body': body}
+            await send(start)
+            await send(message)
+
+        await self.app(scope, receive, send_compressed)
+
+
+class MetricsMiddleware:
+    """
+    Observe latency and database usage of requests per route.
+
+    Responses get Server-Timing header with request and database time
+    if server_timing is enabled.
+    """
+
+    def __init__(self, app, metrics: Metrics, server_timing: bool = False):
+        self.app = app
+        self.metrics = metrics
+        self.server_timing = server_timing
+
+    @staticmethod
+    def get_route(scope) -> str:
+        """Get path template of route matching request."""
+        route = scope.get('route')
+        if route is None:
+            # Responses served by outer middlewares skip routing
+            for app_route in scope['app'].router.routes:
+                if app_route.matches(scope)[0] == Match.FULL:
+                    route = app_route
+                    break
+        return getattr(route, 'path', 'unmatched')
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            return await self.app(scope, receive, send)
+        stats = RequestStats()
+        token = request_stats.set(stats)
+        started_at = time.perf_counter()
+
+        async def send_with_timing(message):
+            if message['type'] == 'http.response.start' and self.server_timing:
+                MutableHeaders(scope=message)['Server-Timing'] = (
+                    f'app;dur={(time.perf_counter() - started_at) * 1000:.2f}'
+                    f', db;dur={stats.db_time * 1000:.2f}'
+                    f';desc="{stats.queries_count} queries"'
+                )
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            request_stats.reset(token)
+            self.metrics.observe(
+                scope['method'],
+                self.get_route(scope),
+                time.perf_counter() - started_at,
+                stats,
+            )
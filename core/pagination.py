@@ -1,10 +1,18 @@
-from typing import TypeVar
+import base64
+import binascii
+import datetime as dt
+import json
+from dataclasses import dataclass
+from typing import Generic, Optional, Sequence, TypeVar
 
-from fastapi import Query
+from fastapi import HTTPException, Query, status
 from fastapi_pagination import Page
 from fastapi_pagination.customization import (
     CustomizedPage, UseName, UseParamsFields
 )
+from pydantic import BaseModel
+from sqlalchemy import Select, and_, desc, func, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from core.config import settings
 
@@ -43,3 +51,109 @@ UserPaginator = CustomizedPage[
         description=settings.PAGE_SIZE_NAME)
     ),
 ]
+
+
+class CursorPage(BaseModel, Generic[T]):
+    """Serialize page of keyset (cursor) pagination."""
+
+    items: Sequence[T]
+    size: int
+    next_cursor: Optional[str] = None
+    total: Optional[int] = None
+
+
+@dataclass
+class CursorParams:
+    """Keyset pagination request params."""
+
+    cursor: Optional[str]
+    size: int
+    include_total: bool
+
+
+def cursor_params(page_size: int):
+    """Create cursor params dependency with given default page size."""
+
+    def get_cursor_params(
+        cursor: Optional[str] = Query(
+            None, description=settings.CURSOR_NAME
+        ),
+        size: int = Query(
+            page_size,
+            ge=settings.PAGE_SIZE_MIN,
+            lt=settings.PAGE_SIZE_MAX,
+            description=settings.PAGE_SIZE_NAME
+        ),
+        include_total: bool = Query(
+            False, description=settings.CURSOR_INCLUDE_TOTAL_NAME
+        ),
+    ) -> CursorParams:
+        return CursorParams(
+            cursor=cursor, size=size, include_total=include_total
+        )
+
+    return get_cursor_params
+
+
+GroupCursorParams = cursor_params(settings.PAGE_SIZE_GROUP)
+PostCursorParams = cursor_params(settings.PAGE_SIZE_POST)
+UserCursorParams = cursor_params(settings.PAGE_SIZE_USER)
+
+
+def encode_cursor(sort_value: dt.datetime, id: int) -> str:
+    """Pack last page row sorting key into opaque cursor."""
+    return base64.urlsafe_b64encode(
+        json.dumps([sort_value.isoformat(), id]).encode()
+    ).decode()
+
+
+def decode_cursor(cursor: str):
+    """Unpack opaque cursor or raise Exception."""
+    try:
+        sort_value, id = json.loads(base64.urlsafe_b64decode(cursor))
+        return dt.datetime.fromisoformat(sort_value), int(id)
+    except (binascii.Error, TypeError, ValueError):
+        raise HTTPException(
+            detail=settings.INVALID_CURSOR_MSG,
+            status_code=status.HTTP_400_BAD_REQUEST
+        )
+
+
+async def paginate_by_cursor(
+    db: AsyncSession, query: Select, sort_column, id_column,
+    params: CursorParams, options: list = (),
+):
+    """
+    Get query page placed after the cursor.
+
+    Rows are ordered by (sort_column, id_column) descending so the page is
+    an index range scan instead of OFFSET over all previous rows.
+    """
+    page_query = query.order_by(None).order_by(
+        desc(sort_column), desc(id_column)
+    )
+    if params.cursor is not None:
+        sort_value, last_id = decode_cursor(params.cursor)
+        page_query = page_query.where(or_(
+            sort_column < sort_value,
+            and_(sort_column == sort_value, id_column < last_id),
+        ))
+    items = (await db.scalars(
+        page_query.options(*options).limit(params.size + 1)
+    )).all()
+    next_cursor = None
+    if len(items) > params.size:
+        items = items[:params.size]
+        last_item = items[-1]
+        next_cursor = encode_cursor(
+            getattr(last_item, sort_column.key),
+            getattr(last_item, id_column.key),
+        )
+    total = None
+    if params.include_total:
+        total = await db.scalar(
+            select(func.count()).select_from(query.order_by(None).subquery())
+        )
+    return CursorPage(
+        items=items, size=params.size, next_cursor=next_cursor, total=total
+    )
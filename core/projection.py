@@ -0,0 +1,113 @@
+from functools import lru_cache
+from typing import List, Optional, Tuple
+
+from fastapi import HTTPException, Query, Response, status
+from fastapi.responses import ORJSONResponse
+from fastapi_pagination.api import create_page, resolve_params
+from pydantic import TypeAdapter, create_model
+from sqlalchemy import Select, func, inspect, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.config import settings
+
+
+@lru_cache(maxsize=settings.FIELDS_SCHEMAS_MAX_COUNT)
+def get_rows_adapter(schema, fields: Tuple[str, ...]) -> TypeAdapter:
+    """Get validator of rows list with schema fields, built once."""
+    fields_schema = create_model(
+        f'{schema.__name__}Fields',
+        __config__={'from_attributes': True},
+        **{
+            field: (schema.model_fields[field].annotation, ...)
+            for field in fields
+        },
+    )
+    return TypeAdapter(List[fields_schema])
+
+
+def get_schema_columns(model, schema) -> list:
+    """Get model columns of schema fields."""
+    return [
+        getattr(model, field) for field in schema.model_fields
+        if field in inspect(model).column_attrs
+    ]
+
+
+def get_columns_key(columns: list) -> tuple:
+    """Get SQL of selected columns to tell projections apart."""
+    return tuple(
+        str(column.compile(compile_kwargs={'literal_binds': True}))
+        for column in columns
+    )
+
+
+def fields_params(model, schema):
+    """Create dependency of model columns listed in fields query param."""
+    columns = {column.key: column for column in get_schema_columns(
+        model, schema
+    )}
+
+    def get_fields(
+        fields: Optional[str] = Query(None, description=settings.FIELDS_NAME)
+    ) -> Optional[list]:
+        """Get columns of comma separated fields or raise Exception."""
+        if fields is None:
+            return None
+        names = fields.split(',')
+        if not set(names) <= columns.keys():
+            raise HTTPException(
+                detail=settings.INVALID_FIELDS_MSG.format(
+                    fields=', '.join(columns)
+                ),
+                status_code=status.HTTP_400_BAD_REQUEST
+            )
+        return [columns[name] for name in dict.fromkeys(names)]
+
+    return get_fields
+
+
+def get_page_fields(total: int, params) -> dict:
+    """Get fields of page besides items."""
+    return create_page([], total=total, params=params).model_dump(
+        mode='json', by_alias=True, exclude={'items'}
+    )
+
+
+def get_rows_response(
+    rows, columns: list, schema, page: dict, headers: dict = None
+) -> Response:
+    """Get page response of rows serialized by schema fields."""
+    adapter = get_rows_adapter(
+        schema, tuple(column.key for column in columns)
+    )
+    return ORJSONResponse(
+        {
+            'items': adapter.dump_python(
+                adapter.validate_python(rows, from_attributes=True),
+                mode='json',
+            ),
+            **page,
+        },
+        headers=headers,
+    )
+
+
+async def paginate_rows(
+    db: AsyncSession, query: Select, model, schema, columns: list = None
+) -> Response:
+    """Paginate query selecting only columns, schema columns by default."""
+    if columns is None:
+        columns = get_schema_columns(model, schema)
+    params = resolve_params()
+    raw_params = params.to_raw_params().as_limit_offset()
+    total = await db.scalar(
+        select(func.count()).select_from(query.order_by(None).subquery())
+    )
+    rows = (await db.execute(
+        query.with_only_columns(*columns)
+        .limit(raw_params.limit)
+        .offset(raw_params.offset)
+    )).all()
+    return get_rows_response(
+        rows, columns, schema, get_page_fields(total, params)
+    )
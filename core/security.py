@@ -1,6 +1,6 @@
 import datetime as dt
 
-from jose import jwt
+from jose import jwt, JWTError
 from typing import Optional
 
 from core.config import settings
@@ -21,3 +21,25 @@ def create_access_token(
     return jwt.encode(
         to_encode, settings.SECRET_KEY, algorithm=settings.ENCODE_ALGORITHM
     )
+
+
+def get_token_claims(user) -> dict:
+    """Get claims that identify user without database lookup."""
+    return {
+        'sub': str(user.id),
+        'username': user.username,
+        'is_active': user.is_active,
+        'is_superuser': user.is_superuser,
+    }
+
+
+def get_token_subject(token: Optional[str]) -> Optional[str]:
+    """Get subject of verified token or None if token is invalid."""
+    if not token:
+        return None
+    try:
+        return jwt.decode(
+            token, settings.SECRET_KEY, algorithms=[settings.ENCODE_ALGORITHM]
+        ).get('sub')
+    except JWTError:
+        return None
@@ -0,0 +1,19 @@
+from core.config import settings
+from core.export import ExportFormat, format_rows, get_csv_header
+from db.repository.post import get_export_query
+from db.session import engine
+
+
+def handle(
+    output, export_format: ExportFormat, since=None,
+    batch_size=settings.EXPORT_BATCH_SIZE,
+):
+    """Write posts export by batches of server-side cursor rows."""
+    with engine.connect() as connection:
+        result = connection.execution_options(yield_per=batch_size).execute(
+            get_export_query(since)
+        )
+        if export_format == ExportFormat.csv:
+            output.write(get_csv_header(result.keys()))
+        for rows in result.partitions():
+            output.write(format_rows(rows, export_format))
@@ -1,11 +1,16 @@
 import csv
 import datetime as dt
+import time
+from itertools import islice
+from pathlib import Path
 
 import click
+from sqlalchemy import insert
 
 from core.config import settings
+from db.management.commands import rebuild_feeds, reconcile_counts
 from db.models import Group, Post, User
-from db.session import SessionLocal
+from db.session import engine
 
 
 TABLES = {
@@ -15,49 +20,74 @@ TABLES = {
 }
 
 
-def handle():
-    """Extract data from .csv file and call create_object func."""
-    for table in TABLES:
-        file_path = f'{settings.CSV_IMPORT_FILE_PATH}/{table}.csv'
+def handle(batch_size=settings.CSV_IMPORT_BATCH_SIZE, file_path=None):
+    """
+    Stream data from .csv files into database tables by batches.
+
+    Feeds and posts counters are rebuilt after import.
+    """
+    if file_path is None:
+        files = [
+            (table, f'{settings.CSV_IMPORT_FILE_PATH}/{table}.csv')
+            for table in TABLES
+        ]
+    else:
+        table = Path(file_path).stem
+        if table not in TABLES:
+            raise click.BadParameter(settings.CSV_IMPORT_INVALID_TABLE.format(
+                path=file_path, tables=', '.join(TABLES)
+            ))
+        files = [(table, file_path)]
+    for table, path in files:
         try:
-            with open(file_path, mode='r', encoding='utf-8') as csvfile:
-                csv_data = [
-                    row for row in csv.DictReader(csvfile, delimiter='|')
-                ]
+            with open(path, mode='r', encoding='utf-8') as csvfile:
+                create_objects(
+                    cls=TABLES[table],
+                    csv_data=csv.DictReader(csvfile, delimiter='|'),
+                    table=table,
+                    batch_size=batch_size,
+                )
         except FileNotFoundError:
             raise FileExistsError(settings.CSV_IMPORT_INVALID_PATH.format(
-                path=file_path
+                path=path
             ))
-        else:
-            create_object(
-                cls=TABLES[table], csv_data=csv_data, table=table,
-            )
+    rebuild_feeds.handle()
+    reconcile_counts.handle()
 
 
-def create_object(cls, csv_data, table):
-    """Create objects with data from .csv file."""
+def create_objects(cls, csv_data, table, batch_size):
+    """Insert .csv rows with one executemany transaction per batch."""
     print_info(name=table)
-    db = SessionLocal()
-    for obj_data in csv_data:
-        if table in ['groups', 'users']:
-            db.add(cls(**obj_data))
-            db.commit()
-        elif table == 'posts':
-            db.add(Post(
-                author_id=int(obj_data.get('author_id')),
-                group_id=int(obj_data.get('group_id')),
-                pub_date=dt.datetime.strptime(
-                    obj_data.get('pub_date'),
-                    settings.CSV_IMPORT_TIME_FORMAT
-                ),
-                text=obj_data.get('text'),
-                title=obj_data.get('title'),
-            ))
-            db.commit()
-    print_info(name=table, obj_count=len(csv_data))
+    rows = (prepare_row(obj_data, table) for obj_data in csv_data)
+    obj_count = 0
+    started_at = time.perf_counter()
+    while batch := list(islice(rows, batch_size)):
+        with engine.begin() as connection:
+            connection.execute(insert(cls), batch)
+        obj_count += len(batch)
+    print_info(
+        name=table,
+        obj_count=obj_count,
+        elapsed=time.perf_counter() - started_at,
+    )
+
+
+def prepare_row(obj_data, table):
+    """Convert .csv row values to column types."""
+    if table == 'posts':
+        return {
+            'author_id': int(obj_data.get('author_id')),
+            'group_id': int(obj_data.get('group_id')),
+            'pub_date': dt.datetime.strptime(
+                obj_data.get('pub_date'), settings.CSV_IMPORT_TIME_FORMAT
+            ),
+            'text': obj_data.get('text'),
+            'title': obj_data.get('title'),
+        }
+    return obj_data
 
 
-def print_info(name, obj_count=None):
+def print_info(name, obj_count=None, elapsed=None):
     """Print process and success import message."""
     if obj_count is None:
         click.secho(
@@ -67,7 +97,9 @@ def print_info(name, obj_count=None):
     else:
         click.secho(
             settings.CSV_IMPORT_SUCCESS.format(
-                count=obj_count, filename=name
+                count=obj_count,
+                filename=name,
+                rate=obj_count / elapsed if elapsed else obj_count,
             ),
             fg='green',
         )
@@ -0,0 +1,220 @@
+import csv
+import hashlib
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from dataclasses import dataclass
+from itertools import islice
+from pathlib import Path
+
+import click
+from sqlalchemy import insert, select, update
+
+from core.config import settings
+from db.management.commands import rebuild_feeds, reconcile_counts
+from db.management.commands.import_csv import TABLES, prepare_row, print_info
+from db.models import Group, ImportCheckpoint, Post, User
+from db.session import engine
+
+
+REQUIRED_FIELDS = {
+    'groups': ('description', 'slug', 'title'),
+    'users': ('email', 'password', 'username'),
+    'posts': ('author_id', 'group_id', 'pub_date', 'text', 'title'),
+}
+
+
+def handle(directory, batch_size, workers):
+    """
+    Import groups, users and posts .csv shards from directory.
+
+    Shards are parsed by batches in worker processes while the main
+    process is the single writer, tables are written in groups -> users ->
+    posts order. Posts of missing authors or groups are counted invalid.
+    Feeds and posts counters are rebuilt after import.
+    """
+    shards = {
+        table: sorted(Path(directory).glob(
+            settings.IMPORT_SHARD_PATTERN.format(table=table)
+        ))
+        for table in TABLES
+    }
+    if not any(shards.values()):
+        raise click.BadParameter(settings.IMPORT_SHARDS_NOT_FOUND.format(
+            path=directory
+        ))
+    checkpoints = get_checkpoints()
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for table, paths in shards.items():
+            if paths:
+                import_table(
+                    executor, table, paths, checkpoints, batch_size, workers
+                )
+    rebuild_feeds.handle()
+    reconcile_counts.handle()
+
+
+@dataclass
+class Shard:
+    """Shard file with its import progress."""
+
+    path: Path
+    key: str
+    rows_count: int
+    obj_count: int = 0
+    invalid_count: int = 0
+
+
+def get_shard_key(path):
+    """Get checkpoint key of shard, changed or moved file gets a new one."""
+    stat = path.stat()
+    digest = hashlib.sha1(
+        f'{path.resolve()}|{stat.st_size}|{stat.st_mtime_ns}'.encode()
+    ).hexdigest()
+    return f'{digest}:{path.name}'[:settings.IMPORT_SHARD_NAME_MAX_LENGTH]
+
+
+def import_table(executor, table, paths, checkpoints, batch_size, workers):
+    """Parse table shards batches concurrently and write them in order."""
+    print_info(name=table)
+    shards_to_import = []
+    for path in paths:
+        key = get_shard_key(path)
+        rows_count, is_completed = checkpoints.get(key, (0, False))
+        if is_completed:
+            click.secho(
+                settings.IMPORT_SHARD_SKIPPED.format(shard=path.name),
+                fg='yellow',
+            )
+        else:
+            shards_to_import.append(Shard(path, key, rows_count))
+    shards_to_import = iter(shards_to_import)
+    futures = {}
+
+    def submit_batch(shard, position=None):
+        futures[executor.submit(
+            parse_batch, table, str(shard.path), shard.rows_count, position,
+            batch_size,
+        )] = shard
+
+    # Only one parsed batch of a few shards is kept ahead of the writer
+    for shard in islice(shards_to_import, workers + 1):
+        submit_batch(shard)
+    while futures:
+        done, _ = wait(futures, return_when=FIRST_COMPLETED)
+        for future in done:
+            shard = futures.pop(future)
+            batch, shard.rows_count, position, invalid_count = (
+                future.result()
+            )
+            if position is not None:
+                submit_batch(shard, position)
+            write_batch(
+                TABLES[table], shard, batch, invalid_count,
+                is_completed=position is None,
+            )
+            if position is None:
+                click.secho(
+                    settings.IMPORT_SHARD_SUCCESS.format(
+                        count=shard.obj_count,
+                        invalid=shard.invalid_count,
+                        shard=shard.path.name,
+                    ),
+                    fg='green',
+                )
+                next_shard = next(shards_to_import, None)
+                if next_shard is not None:
+                    submit_batch(next_shard)
+
+
+def parse_batch(table, path, rows_count, position, batch_size):
+    """
+    Parse and validate next batch of shard rows in worker process.
+
+    Batch starts at file position, or after rows_count rows if position is
+    None. Return batch, count of shard rows consumed after it, position of
+    the next batch or None at the end of shard and count of invalid rows.
+    """
+    batch = []
+    invalid_count = 0
+    with open(path, mode='r', encoding='utf-8', newline='') as csvfile:
+        fieldnames = next(csv.reader([csvfile.readline()], delimiter='|'))
+        if position is not None:
+            csvfile.seek(position)
+        # Lines are read one by one so file position is known after a row
+        csv_data = csv.DictReader(
+            iter(csvfile.readline, ''), fieldnames=fieldnames, delimiter='|'
+        )
+        if position is None:
+            for _ in islice(csv_data, rows_count):
+                pass
+        for obj_data in islice(csv_data, batch_size):
+            rows_count += 1
+            try:
+                batch.append(validate_row(obj_data, table))
+            except (TypeError, ValueError):
+                invalid_count += 1
+        if len(batch) + invalid_count < batch_size:
+            return batch, rows_count, None, invalid_count
+        return batch, rows_count, csvfile.tell(), invalid_count
+
+
+def validate_row(obj_data, table):
+    """Check required .csv row values and convert them to column types."""
+    for field in REQUIRED_FIELDS[table]:
+        if not obj_data.get(field):
+            raise ValueError(field)
+    return prepare_row(obj_data, table)
+
+
+def get_existing_rows(connection, batch):
+    """Get posts rows whose author and group exist."""
+    existing_ids = {
+        model: set(connection.scalars(select(model.id).where(
+            model.id.in_({row[field] for row in batch})
+        )))
+        for model, field in ((Group, 'group_id'), (User, 'author_id'))
+    }
+    return [
+        row for row in batch
+        if row['group_id'] in existing_ids[Group]
+        and row['author_id'] in existing_ids[User]
+    ]
+
+
+def write_batch(cls, shard, batch, invalid_count, is_completed):
+    """Insert shard batch, checkpoint progress in the same transaction."""
+    with engine.begin() as connection:
+        if batch and cls is Post:
+            rows_count = len(batch)
+            batch = get_existing_rows(connection, batch)
+            invalid_count += rows_count - len(batch)
+        if batch:
+            connection.execute(insert(cls), batch)
+        save_checkpoint(
+            connection, shard.key, shard.rows_count, is_completed
+        )
+    shard.obj_count += len(batch)
+    shard.invalid_count += invalid_count
+
+
+def get_checkpoints():
+    """Get imported rows count and completion flag by shard key."""
+    with engine.connect() as connection:
+        return {
+            shard: (rows_count, is_completed)
+            for shard, rows_count, is_completed in connection.execute(select(
+                ImportCheckpoint.shard,
+                ImportCheckpoint.rows_count,
+                ImportCheckpoint.is_completed,
+            ))
+        }
+
+
+def save_checkpoint(connection, shard, rows_count, is_completed):
+    """Create or update shard checkpoint."""
+    values = {'is_completed': is_completed, 'rows_count': rows_count}
+    if not connection.execute(update(ImportCheckpoint).where(
+        ImportCheckpoint.shard == shard
+    ).values(**values)).rowcount:
+        connection.execute(insert(ImportCheckpoint).values(
+            shard=shard, **values
+        ))
@@ -0,0 +1,43 @@
+import click
+from sqlalchemy import delete, desc, insert, select
+
+from core.config import settings
+from db.models import Feed, FeedEntry, Group, Post
+from db.session import engine
+
+
+def handle(size=settings.FEED_SIZE):
+    """Rebuild feeds of all posts and of every group in one transaction."""
+    with engine.begin() as connection:
+        connection.execute(delete(FeedEntry))
+        connection.execute(delete(Feed))
+        feed_ids = [
+            settings.FEED_ALL_POSTS_ID,
+            *connection.scalars(select(Group.id)),
+        ]
+        for feed_id in feed_ids:
+            rebuild_feed(connection, feed_id, size)
+    click.secho(
+        settings.FEEDS_REBUILD_SUCCESS.format(count=len(feed_ids), size=size),
+        fg='green',
+    )
+
+
+def rebuild_feed(connection, feed_id, size):
+    """Fill feed with newest posts, set floor if feed has older ones."""
+    query = select(Post.id, Post.pub_date).order_by(
+        desc(Post.pub_date), desc(Post.id)
+    ).limit(size + 1)
+    if feed_id != settings.FEED_ALL_POSTS_ID:
+        query = query.where(Post.group_id == feed_id)
+    posts = connection.execute(query).all()
+    floor = posts[size - 1] if len(posts) > size else None
+    connection.execute(insert(Feed).values(
+        group_id=feed_id,
+        floor_post_id=floor.id if floor else None,
+        floor_pub_date=floor.pub_date if floor else None,
+    ))
+    if posts:
+        connection.execute(insert(FeedEntry), [{
+            'group_id': feed_id, 'post_id': post.id, 'pub_date': post.pub_date
+        } for post in posts[:size]])
@@ -0,0 +1,33 @@
+import click
+from sqlalchemy import func, select, update
+
+from core.config import settings
+from db.models import Group, Post, User
+from db.session import engine
+
+
+def handle():
+    """Fix posts counters of groups and users in one transaction."""
+    with engine.begin() as connection:
+        counts = {
+            table: reconcile(connection, model, column)
+            for table, model, column in (
+                ('groups', Group, Post.group_id),
+                ('users', User, Post.author_id),
+            )
+        }
+    click.secho(
+        settings.COUNTS_RECONCILE_SUCCESS.format(**counts), fg='green'
+    )
+
+
+def reconcile(connection, model, column):
+    """Set counters differing from posts count, get fixed rows count."""
+    posts_count = select(func.count(Post.id)).where(
+        column == model.id
+    ).scalar_subquery()
+    return connection.execute(
+        update(model)
+        .where(model.posts_count != posts_count)
+        .values(posts_count=posts_count)
+    ).rowcount
@@ -0,0 +1,200 @@
+import csv
+import datetime as dt
+import io
+import itertools
+import random
+import time
+from itertools import islice
+
+import click
+from sqlalchemy import insert
+
+from core.config import settings
+from core.hashing import Hasher
+from db.management.commands import rebuild_feeds, reconcile_counts
+from db.models import Group, Post, User
+from db.session import engine
+
+
+WORDS = (
+    'новости', 'город', 'погода', 'сегодня', 'проект', 'команда', 'время',
+    'работа', 'жизнь', 'друзья', 'книга', 'музыка', 'фильм', 'путешествие',
+    'море', 'горы', 'утро', 'вечер', 'кофе', 'идея', 'вопрос', 'ответ',
+    'история', 'спорт', 'игра', 'победа', 'весна', 'лето', 'осень', 'зима',
+    'python', 'fastapi', 'release', 'update', 'feed', 'post', 'group',
+    'and', 'the', 'with', 'и', 'в', 'на', 'с', 'по', 'для', 'это', 'очень',
+    'новый', 'большой', 'лучший', 'первый', 'последний', 'хороший',
+)
+FIRST_NAMES = (
+    'Alexandr', 'Anna', 'Dmitry', 'Elena', 'Ivan', 'Maria', 'Olga', 'Pavel',
+    'Sergey', 'Tatiana',
+)
+LAST_NAMES = (
+    'Ivanov', 'Kuznetsova', 'Morozov', 'Novikova', 'Petrov', 'Popova',
+    'Smirnov', 'Sokolova', 'Volkov', 'Zaitseva',
+)
+# Zipf exponents: few big groups and prolific authors, long tail of rest
+GROUP_SKEW = 1.1
+AUTHOR_SKEW = 1.2
+# Share of posts published around news bursts, hours they spread over
+BURST_SHARE = 0.3
+BURST_HOURS = 6
+BURST_INTERVAL_DAYS = 3
+# Posts are mostly published in the evening
+HOUR_WEIGHTS = (
+    2, 1, 1, 1, 1, 2, 4, 6, 8, 8, 7, 7, 8, 7, 6, 6, 7, 8, 10, 12, 13, 12, 8,
+    4,
+)
+# Log-normal text length, median is about 33 words
+TEXT_WORDS_MU = 3.5
+TEXT_WORDS_SIGMA = 1.0
+TEXT_WORDS_MAX = 2000
+
+
+def handle(users, groups, posts, seed, batch_size=settings.SEED_BATCH_SIZE):
+    """Generate users, groups and their posts, deterministic by seed."""
+    rng = random.Random(seed)
+    end = dt.datetime.strptime(
+        settings.SEED_DATES_END, settings.CSV_IMPORT_TIME_FORMAT
+    )
+    start = end - dt.timedelta(days=settings.SEED_DATES_DAYS)
+    user_ids = write_rows(
+        User, generate_users(rng, users, seed, start, end), users,
+        batch_size, returning=True,
+    )
+    group_ids = write_rows(
+        Group, generate_groups(rng, groups, seed, start), groups,
+        batch_size, returning=True,
+    )
+    write_rows(
+        Post, generate_posts(rng, posts, user_ids, group_ids, start, end),
+        posts, batch_size,
+    )
+    rebuild_feeds.handle()
+    reconcile_counts.handle()
+
+
+def generate_users(rng, count, seed, start, end):
+    """Generate users sharing one password hash, hashing each is slow."""
+    password = Hasher.get_hashed_password(settings.SEED_PASSWORD)
+    span = (end - start).total_seconds()
+    for index in range(count):
+        yield {
+            'date_joined': start + dt.timedelta(seconds=rng.uniform(0, span)),
+            'email': f'user{seed}_{index}@example.com',
+            'first_name': rng.choice(FIRST_NAMES),
+            'is_active': True,
+            'is_superuser': False,
+            'last_name': rng.choice(LAST_NAMES),
+            'password': password,
+            'username': f'user{seed}_{index}',
+        }
+
+
+def generate_groups(rng, count, seed, start):
+    """Generate groups created before all posts."""
+    for index in range(count):
+        yield {
+            'created_at': start,
+            'description': get_text(rng),
+            'slug': f'group-{seed}-{index}',
+            'title': f'{rng.choice(WORDS).capitalize()} {index}',
+        }
+
+
+def generate_posts(rng, count, author_ids, group_ids, start, end):
+    """Generate posts of skewed groups and authors in bursty time."""
+    author_ids = list(author_ids)
+    group_ids = list(group_ids)
+    rng.shuffle(author_ids)
+    rng.shuffle(group_ids)
+    author_weights = get_zipf_cum_weights(len(author_ids), AUTHOR_SKEW)
+    group_weights = get_zipf_cum_weights(len(group_ids), GROUP_SKEW)
+    bursts = [
+        start + dt.timedelta(days=rng.uniform(0, settings.SEED_DATES_DAYS))
+        for _ in range(max(1, settings.SEED_DATES_DAYS // BURST_INTERVAL_DAYS))
+    ]
+    for _ in range(count):
+        author_id, = rng.choices(author_ids, cum_weights=author_weights)
+        group_id, = rng.choices(group_ids, cum_weights=group_weights)
+        yield {
+            'author_id': author_id,
+            'group_id': group_id,
+            'pub_date': get_pub_date(rng, start, end, bursts),
+            'text': get_text(rng),
+            'title': ' '.join(rng.choices(WORDS, k=rng.randint(2, 8)))
+            .capitalize()[:settings.POST_TITLE_MAX_LENGTH],
+        }
+
+
+def get_zipf_cum_weights(count, skew):
+    """Get cumulative weights of ranks following Zipf's law."""
+    return list(itertools.accumulate(
+        1 / rank ** skew for rank in range(1, count + 1)
+    ))
+
+
+def get_pub_date(rng, start, end, bursts):
+    """Get publication time around burst or at daily activity hour."""
+    if rng.random() < BURST_SHARE:
+        pub_date = rng.choice(bursts) + dt.timedelta(
+            hours=rng.gauss(0, BURST_HOURS)
+        )
+    else:
+        pub_date = start + dt.timedelta(
+            days=rng.randrange(settings.SEED_DATES_DAYS),
+            hours=rng.choices(range(24), weights=HOUR_WEIGHTS)[0],
+            seconds=rng.uniform(0, 3600),
+        )
+    return min(max(pub_date, start), end)
+
+
+def get_text(rng):
+    """Get text of log-normally distributed words count."""
+    words_count = min(TEXT_WORDS_MAX, max(1, int(
+        rng.lognormvariate(TEXT_WORDS_MU, TEXT_WORDS_SIGMA)
+    )))
+    return ' '.join(rng.choices(WORDS, k=words_count)).capitalize()
+
+
+def write_rows(cls, rows, count, batch_size, returning=False):
+    """Insert rows by batches, get their ids if returning."""
+    table = cls.__table__.name
+    click.secho(
+        settings.SEED_PROCESSING.format(count=count, table=table),
+        fg='yellow',
+    )
+    ids = []
+    started_at = time.perf_counter()
+    while batch := list(islice(rows, batch_size)):
+        with engine.begin() as connection:
+            if returning:
+                ids.extend(connection.scalars(
+                    insert(cls).returning(cls.id), batch
+                ))
+            elif connection.dialect.driver == 'psycopg2':
+                copy_rows(connection, table, batch)
+            else:
+                connection.execute(insert(cls), batch)
+    elapsed = time.perf_counter() - started_at
+    click.secho(
+        settings.SEED_SUCCESS.format(
+            count=count, table=table, rate=count / elapsed if elapsed else 0
+        ),
+        fg='green',
+    )
+    return ids
+
+
+def copy_rows(connection, table, batch):
+    """Load batch with COPY, the fastest PostgreSQL bulk path."""
+    columns = list(batch[0])
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows(
+        [row[column] for column in columns] for row in batch
+    )
+    buffer.seek(0)
+    connection.connection.cursor().copy_expert(
+        f'COPY {table} ({", ".join(columns)}) FROM STDIN WITH (FORMAT csv)',
+        buffer,
+    )
@@ -1,5 +1,6 @@
 import datetime as dt
 
+from sqlalchemy.ext.hybrid import hybrid_property
 from sqlalchemy.orm import declarative_base, relationship
 import sqlalchemy as db
 
@@ -9,12 +10,20 @@ from core.config import settings
 Base = declarative_base()
 
 
+def get_search_vector(title, text):
+    """Get Postgres full-text search vector of post title and text."""
+    return db.func.to_tsvector(
+        db.literal_column(f"'{settings.SEARCH_LANGUAGE}'"),
+        title + db.literal_column("' '") + text
+    )
+
+
 class User(Base):
     """Model for users."""
 
     __tablename__ = 'users'
     id = db.Column(db.Integer(), primary_key=True, index=True)
-    date_joined = db.Column(db.DateTime(), default=dt.datetime.now())
+    date_joined = db.Column(db.DateTime(), default=dt.datetime.now)
     email = db.Column(
         db.String(settings.EMAIL_MAX_LENGTH),
         index=True,
@@ -27,8 +36,12 @@ class User(Base):
     last_name = db.Column(db.String(settings.FIRST_LAST_NAMES_MAX_LENGTH))
     password = db.Column(db.String(), nullable=False)
     posts = relationship('Post', cascade='all, delete')
+    # Maintained by posts repository, fixed by reconcile-counts command
+    posts_count = db.Column(
+        db.Integer, default=0, nullable=False, server_default='0'
+    )
     updated_on = db.Column(
-        db.DateTime(), default=dt.datetime.now(), onupdate=dt.datetime.now()
+        db.DateTime(), default=dt.datetime.now, onupdate=dt.datetime.now
     )
     username = db.Column(
         db.String(settings.USERNAME_MAX_LENGTH),
@@ -37,6 +50,19 @@ class User(Base):
         unique=True
     )
 
+    __table_args__ = (db.Index(
+        'users_date_joined_id_index', 'date_joined', 'id'),
+    )
+
+    @hybrid_property
+    def version(self):
+        """Get time of the last user change."""
+        return self.updated_on or self.date_joined
+
+    @version.expression
+    def version(cls):
+        return db.func.coalesce(cls.updated_on, cls.date_joined)
+
     def __repr__(self) -> str:
         return f'{self.username}'
 
@@ -46,21 +72,38 @@ class Group(Base):
 
     __tablename__ = 'groups'
     id = db.Column(db.Integer, primary_key=True)
-    created_at = db.Column(db.DateTime(), default=dt.datetime.now())
+    created_at = db.Column(db.DateTime(), default=dt.datetime.now)
     description = db.Column(db.Text(), nullable=False)
     slug = db.Column(
         db.String(settings.GROUP_SLUG_MAX_LENGTH),
         nullable=False,
         unique=True
     )
+    # Maintained by posts repository, fixed by reconcile-counts command
+    posts_count = db.Column(
+        db.Integer, default=0, nullable=False, server_default='0'
+    )
     title = db.Column(
         db.String(settings.GROUP_TITLE_MAX_LENGTH), nullable=False
     )
+    updated_at = db.Column(
+        db.DateTime(), default=dt.datetime.now, onupdate=dt.datetime.now
+    )
 
-    __table_args__ = (db.Index(
-        'title_description_index' 'title', 'description'),
+    __table_args__ = (
+        db.Index('title_description_index' 'title', 'description'),
+        db.Index('groups_created_at_id_index', 'created_at', 'id'),
     )
 
+    @hybrid_property
+    def version(self):
+        """Get time of the last group change."""
+        return self.updated_at or self.created_at
+
+    @version.expression
+    def version(cls):
+        return db.func.coalesce(cls.updated_at, cls.created_at)
+
     def __repr__(self) -> str:
         return self.title
 
@@ -74,12 +117,125 @@ class Post(Base):
     author_id = db.Column(db.Integer, db.ForeignKey('users.id'))
     group = relationship('Group')
     group_id = db.Column(db.Integer, db.ForeignKey('groups.id'))
-    pub_date = db.Column(db.DateTime(), default=dt.datetime.now())
-    text = db.Column(db.Text(), nullable=False, index=True)
+    pub_date = db.Column(db.DateTime(), default=dt.datetime.now)
+    text = db.Column(db.Text(), nullable=False)
     title = db.Column(
         db.String(settings.POST_TITLE_MAX_LENGTH), nullable=False, index=True
     )
+    updated_at = db.Column(
+        db.DateTime(), default=dt.datetime.now, onupdate=dt.datetime.now
+    )
+
+    __table_args__ = (
+        db.Index('posts_pub_date_id_index', 'pub_date', 'id'),
+        db.Index(
+            'posts_group_id_pub_date_id_index',
+            group_id, pub_date.desc(), id.desc()
+        ),
+        db.Index(
+            'posts_author_id_pub_date_id_index',
+            author_id, pub_date.desc(), id.desc()
+        ),
+        db.Index(
+            'posts_search_index',
+            get_search_vector(title, text),
+            postgresql_using='gin'
+        ).ddl_if(dialect='postgresql'),
+    )
+
+    @hybrid_property
+    def version(self):
+        """Get time of the last post change."""
+        return self.updated_at or self.pub_date
+
+    @version.expression
+    def version(cls):
+        return db.func.coalesce(cls.updated_at, cls.pub_date)
 
     def __repr__(self) -> str:
         return (f'Текст: {self.text[:30]}; Автор: {self.author};'
                 f' Группа: {self.group}; Опубликован: {self.pub_date};')
+
+
+# SQLite full-text index of posts, kept in sync with posts by triggers
+posts_fts = db.table('posts_fts', db.column('rowid'))
+
+for statement in (
+    '''CREATE VIRTUAL TABLE posts_fts USING fts5(
+        title, text, content='posts', content_rowid='id'
+    )''',
+    '''CREATE TRIGGER posts_fts_insert AFTER INSERT ON posts BEGIN
+        INSERT INTO posts_fts(rowid, title, text)
+        VALUES (new.id, new.title, new.text);
+    END''',
+    '''CREATE TRIGGER posts_fts_delete AFTER DELETE ON posts BEGIN
+        INSERT INTO posts_fts(posts_fts, rowid, title, text)
+        VALUES ('delete', old.id, old.title, old.text);
+    END''',
+    '''CREATE TRIGGER posts_fts_update AFTER UPDATE OF title, text ON posts
+    BEGIN
+        INSERT INTO posts_fts(posts_fts, rowid, title, text)
+        VALUES ('delete', old.id, old.title, old.text);
+        INSERT INTO posts_fts(rowid, title, text)
+        VALUES (new.id, new.title, new.text);
+    END''',
+):
+    db.event.listen(
+        Post.__table__,
+        'after_create',
+        db.DDL(statement).execute_if(dialect='sqlite')
+    )
+db.event.listen(
+    Post.__table__,
+    'before_drop',
+    db.DDL('DROP TABLE IF EXISTS posts_fts').execute_if(dialect='sqlite')
+)
+
+
+class ImportCheckpoint(Base):
+    """Model for progress of sharded .csv files import."""
+
+    __tablename__ = 'import_checkpoints'
+    shard = db.Column(
+        db.String(settings.IMPORT_SHARD_NAME_MAX_LENGTH), primary_key=True
+    )
+    is_completed = db.Column(db.Boolean, default=False, nullable=False)
+    rows_count = db.Column(db.Integer, default=0, nullable=False)
+
+
+class Feed(Base):
+    """
+    Model for materialized feed of all posts or posts of a group.
+
+    Feed entries hold every post of the feed not older than the floor post,
+    feed without floor holds all its posts.
+    """
+
+    __tablename__ = 'feeds'
+    group_id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    floor_post_id = db.Column(db.Integer, nullable=True)
+    floor_pub_date = db.Column(db.DateTime(), nullable=True)
+
+
+class FeedEntry(Base):
+    """Model for post in materialized feed."""
+
+    __tablename__ = 'feed_entries'
+    group_id = db.Column(
+        db.Integer,
+        db.ForeignKey('feeds.group_id', ondelete='CASCADE'),
+        primary_key=True
+    )
+    post_id = db.Column(
+        db.Integer,
+        db.ForeignKey('posts.id', ondelete='CASCADE'),
+        primary_key=True
+    )
+    pub_date = db.Column(db.DateTime(), nullable=False)
+
+    __table_args__ = (
+        db.Index(
+            'feed_entries_group_id_pub_date_post_id_index',
+            group_id, pub_date.desc(), post_id.desc()
+        ),
+    )
@@ -0,0 +1,183 @@
+from typing import Iterable
+
+from fastapi import Request, Response
+from fastapi_pagination.api import resolve_params
+from sqlalchemy import (
+    Select, and_, delete, desc, func, insert, or_, select, tuple_, update
+)
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.config import settings
+from core.etag import paginate_with_etag
+from db.models import Feed, FeedEntry, Group, Post
+
+
+async def add_to_feeds(
+    db: AsyncSession, post_ids: Iterable[int], group_ids: Iterable[int]
+):
+    """Append posts to built feeds they belong to, trim overflowed feeds."""
+    await db.execute(insert(FeedEntry).from_select(
+        ['group_id', 'post_id', 'pub_date'],
+        select(Feed.group_id, Post.id, Post.pub_date).join(Feed, or_(
+            Feed.group_id == settings.FEED_ALL_POSTS_ID,
+            Feed.group_id == Post.group_id,
+        )).where(
+            Post.id.in_(post_ids),
+            or_(
+                Feed.floor_pub_date.is_(None),
+                tuple_(Post.pub_date, Post.id) >= tuple_(
+                    Feed.floor_pub_date, Feed.floor_post_id
+                ),
+            ),
+        )
+    ))
+    await trim_feeds(db, group_ids)
+
+
+async def remove_from_feeds(db: AsyncSession, post_id: int):
+    """Remove post from all feeds, get ids of feeds it was removed from."""
+    return (await db.scalars(
+        delete(FeedEntry)
+        .where(FeedEntry.post_id == post_id)
+        .returning(FeedEntry.group_id)
+    )).all()
+
+
+async def refill_feeds(db: AsyncSession, group_ids: Iterable[int]):
+    """
+    Refill feeds short of FEED_SIZE posts with posts below their floor.
+
+    Feeds without floor hold all their posts and are never short.
+    """
+    entries_count = select(func.count()).where(
+        FeedEntry.group_id == Feed.group_id
+    ).scalar_subquery()
+    short_feeds = (await db.execute(
+        select(
+            Feed.group_id, Feed.floor_pub_date, Feed.floor_post_id,
+            entries_count.label('entries_count'),
+        ).where(
+            Feed.group_id.in_({settings.FEED_ALL_POSTS_ID, *group_ids}),
+            Feed.floor_post_id.is_not(None),
+            entries_count < settings.FEED_SIZE,
+        )
+    )).all()
+    for feed in short_feeds:
+        missing_count = settings.FEED_SIZE - feed.entries_count
+        query = select(Post.id, Post.pub_date).where(
+            tuple_(Post.pub_date, Post.id) < tuple_(
+                feed.floor_pub_date, feed.floor_post_id
+            )
+        ).order_by(desc(Post.pub_date), desc(Post.id)).limit(
+            missing_count + 1
+        )
+        if feed.group_id != settings.FEED_ALL_POSTS_ID:
+            query = query.where(Post.group_id == feed.group_id)
+        posts = (await db.execute(query)).all()
+        if posts:
+            await db.execute(insert(FeedEntry), [{
+                'group_id': feed.group_id,
+                'post_id': post.id,
+                'pub_date': post.pub_date,
+            } for post in posts[:missing_count]])
+        floor = (
+            posts[missing_count - 1] if len(posts) > missing_count else None
+        )
+        await db.execute(update(Feed).where(
+            Feed.group_id == feed.group_id
+        ).values(
+            floor_post_id=floor.id if floor else None,
+            floor_pub_date=floor.pub_date if floor else None,
+        ))
+
+
+async def trim_feeds(db: AsyncSession, group_ids: Iterable[int]):
+    """Keep FEED_SIZE newest posts in feeds, raise floor of longer ones."""
+    feed_ids = {settings.FEED_ALL_POSTS_ID, *group_ids}
+    newest_entries = select(FeedEntry).where(
+        FeedEntry.group_id == Feed.group_id
+    ).order_by(desc(FeedEntry.pub_date), desc(FeedEntry.post_id))
+    floor_entry = newest_entries.offset(settings.FEED_SIZE - 1).limit(1)
+    await db.execute(update(Feed).where(
+        Feed.group_id.in_(feed_ids),
+        newest_entries.offset(settings.FEED_SIZE).limit(1).exists(),
+    ).values(
+        floor_post_id=floor_entry.with_only_columns(
+            FeedEntry.post_id
+        ).scalar_subquery(),
+        floor_pub_date=floor_entry.with_only_columns(
+            FeedEntry.pub_date
+        ).scalar_subquery(),
+    ))
+    feed_floor = select(Feed).where(Feed.group_id == FeedEntry.group_id)
+    await db.execute(delete(FeedEntry).where(
+        FeedEntry.group_id.in_(feed_ids),
+        tuple_(FeedEntry.pub_date, FeedEntry.post_id) < tuple_(
+            feed_floor.with_only_columns(
+                Feed.floor_pub_date
+            ).scalar_subquery(),
+            feed_floor.with_only_columns(
+                Feed.floor_post_id
+            ).scalar_subquery(),
+        ),
+    ))
+
+
+def get_feed_count(group_id: int = None):
+    """Get posts count of group or of all posts from groups counters."""
+    if group_id is None:
+        return select(func.coalesce(func.sum(Group.posts_count), 0))
+    return select(Group.posts_count).where(Group.id == group_id)
+
+
+def get_feed_posts(feed_id: int):
+    """Get posts of materialized feed query."""
+    return select(Post).join(FeedEntry, and_(
+        FeedEntry.post_id == Post.id, FeedEntry.group_id == feed_id
+    )).order_by(desc(FeedEntry.pub_date), desc(FeedEntry.post_id))
+
+
+async def paginate_feed(
+    request: Request,
+    response: Response,
+    db: AsyncSession,
+    query: Select,
+    group_id: int = None,
+    options: list = (),
+    schema=None,
+    columns: list = None,
+):
+    """
+    Paginate posts query, pages above feed floor come from built feed.
+
+    Posts are sorted by query only for unbuilt feeds and older pages,
+    total comes from posts counters of groups.
+    """
+    feed = await db.get(
+        Feed, settings.FEED_ALL_POSTS_ID if group_id is None else group_id
+    )
+    if feed is not None and await is_page_in_feed(db, feed):
+        query = get_feed_posts(feed.group_id)
+    return await paginate_with_etag(
+        request, response, db, query, Post,
+        count_query=get_feed_count(group_id),
+        options=options,
+        schema=schema,
+        columns=columns,
+    )
+
+
+async def is_page_in_feed(db: AsyncSession, feed: Feed) -> bool:
+    """Check requested page is above floor of the feed."""
+    if feed.floor_pub_date is None:
+        return True
+    raw_params = resolve_params().to_raw_params().as_limit_offset()
+    page_end = raw_params.offset + raw_params.limit
+    return page_end == await db.scalar(
+        select(func.count()).select_from(
+            select(FeedEntry.post_id)
+            .where(FeedEntry.group_id == feed.group_id)
+            .limit(page_end)
+            .subquery()
+        )
+    )
@@ -1,31 +1,41 @@
 from typing import Union
 
 from fastapi import HTTPException, status
-from sqlalchemy import desc
-from sqlalchemy.orm import Session
+from sqlalchemy import delete, desc, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 
+from core.cache import response_cache
 from core.config import settings
-from db.models import Group
-from schemas.schemas import GroupCreate, GroupPatch, GroupUpdate
+from core.projection import fields_params
+from db.models import Feed, Group
+from schemas.schemas import GroupCreate, GroupPatch, GroupShow, GroupUpdate
 
 
-def create_new_group(db: Session, group: GroupCreate):
+GroupFields = fields_params(Group, GroupShow)
+
+
+async def create_new_group(db: AsyncSession, group: GroupCreate):
     """Create new group."""
     group = Group(**group.model_dump())
     db.add(group)
-    db.commit()
-    db.refresh(group)
+    await db.flush()
+    # Feed of new group holds all its posts from the start
+    db.add(Feed(group_id=group.id))
+    await db.commit()
+    await db.refresh(group)
+    await response_cache.invalidate('groups')
     return group
 
 
-def get_all_groups(db: Session):
-    """Get groups list."""
-    return db.query(Group).order_by(desc(Group.created_at))
+def get_all_groups():
+    """Get groups list query."""
+    return select(Group).order_by(desc(Group.created_at))
 
 
-def get_group(id: int, db: Session):
+async def get_group(id: int, db: AsyncSession):
     """Get group by id or raise Exception."""
-    group = db.query(Group).filter(Group.id == id).first()
+    group = await db.scalar(select(Group).where(Group.id == id))
     if not group:
         raise HTTPException(
             detail=settings.OBJECT_NOT_FOUND_MSG.format(
@@ -36,18 +46,26 @@ def get_group(id: int, db: Session):
     return group
 
 
-def remove_group(id: int, db: Session):
+async def remove_group(id: int, db: AsyncSession):
     """Delete group."""
-    group_in_db = db.query(Group).filter(Group.id == id)
-    if not group_in_db.first():
+    if not await db.scalar(select(Group.id).where(Group.id == id)):
         raise HTTPException(
             detail=settings.OBJECT_NOT_FOUND_MSG.format(
                 object='Group', id=id
             ),
             status_code=status.HTTP_404_NOT_FOUND
         )
-    group_in_db.delete()
-    db.commit()
+    try:
+        await db.execute(delete(Group).where(Group.id == id))
+        await db.execute(delete(Feed).where(Feed.group_id == id))
+        await db.commit()
+    except IntegrityError:
+        await db.rollback()
+        raise HTTPException(
+            detail=settings.GROUP_HAS_POSTS_MSG.format(id=id),
+            status_code=status.HTTP_409_CONFLICT
+        )
+    await response_cache.invalidate('groups', 'posts')
     return {
         'message': settings.OBJECT_DELETED_MSG.format(
             object='Group', id=id
@@ -55,16 +73,18 @@ def remove_group(id: int, db: Session):
     }
 
 
-def update_group_info(
-    id: int, db: Session, group: Union[GroupPatch, GroupUpdate],
+async def update_group_info(
+    id: int, db: AsyncSession, group: Union[GroupPatch, GroupUpdate],
 ):
     """Full or partial update existing group."""
-    group_in_db = get_group(id, db)
+    group_in_db = await get_group(id, db)
     if isinstance(group, GroupPatch):
         for attr, value in group.model_dump(exclude_unset=True).items():
             group_in_db.__setattr__(attr, value)
     elif isinstance(group, GroupUpdate):
         for attr, value in group.model_dump().items():
             group_in_db.__setattr__(attr, value)
-    db.commit()
+    await db.commit()
+    # Posts pages embed groups and group feeds are cached as posts
+    await response_cache.invalidate('groups', 'posts')
     return group_in_db
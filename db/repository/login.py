@@ -1,21 +1,23 @@
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import jwt, JWTError
-from sqlalchemy.orm import Session
+from pydantic import ValidationError
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from core.config import settings
 from core.hashing import Hasher
-from db.repository.user import get_user
-from db.session import get_db
+from db.repository.user import get_user, user_cache
+from db.session import get_db, stick_to_primary
+from schemas.schemas import Principal
 
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl='/token')
 
 
-def authenticate_user(username: str, password: str, db: Session):
+async def authenticate_user(username: str, password: str, db: AsyncSession):
     """Authenticate current user with request credentials."""
-    user = get_user(username=username, db=db)
-    if not Hasher.verify_password(password, user.password):
+    user = await get_user(username=username, db=db)
+    if not await Hasher.verify_password_async(password, user.password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail=settings.INVALID_CREDENTIALS_MSG
@@ -23,35 +25,48 @@ def authenticate_user(username: str, password: str, db: Session):
     return user
 
 
-def check_is_superuser(
-    token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)
+async def get_current_principal(
+    request: Request, token: str = Depends(oauth2_scheme)
 ):
+    """Get request user data from verified token without db lookup."""
+    credentials_exception = HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail=settings.INVALID_CREDENTIALS_MSG
+    )
+    try:
+        principal = Principal.model_validate(jwt.decode(
+            token, settings.SECRET_KEY, algorithms=[settings.ENCODE_ALGORITHM]
+        ))
+    except (JWTError, ValidationError):
+        raise credentials_exception
+    if not principal.is_active:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail=settings.INACTIVE_USER_MSG
+        )
+    if request.method not in ('GET', 'HEAD', 'OPTIONS'):
+        await stick_to_primary(principal.id)
+    return principal
+
+
+def check_is_superuser(principal: Principal = Depends(get_current_principal)):
     """Raise exception if user is not superuser."""
-    user = get_current_user(token=token, db=db)
-    if user.is_superuser:
-        return user
+    if principal.is_superuser:
+        return principal
     raise HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail=settings.SUPERUSER_RESOURCE_MSG
     )
 
 
-def get_current_user(
-    token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)
+async def get_current_user(
+    principal: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_db),
 ):
-    """Get request User instance."""
-    credentials_exception = HTTPException(
-        status_code=status.HTTP_401_UNAUTHORIZED,
-        detail=settings.INVALID_CREDENTIALS_MSG
-    )
-    try:
-        payload = jwt.decode(
-            token, settings.SECRET_KEY, algorithms=[settings.ENCODE_ALGORITHM]
-        )
-        username: str = payload.get('username')
-        password: str = payload.get('password')
-        if username is None or password is None:
-            raise credentials_exception
-    except JWTError:
-        raise credentials_exception
-    return get_user(username=username, db=db)
+    """Get request User instance, cached for USER_CACHE_TTL seconds."""
+    user = user_cache.get(principal.id)
+    if user is None:
+        user = await get_user(id=principal.id, db=db)
+        user_cache.set(principal.id, user)
+        return user
+    return await db.merge(user, load=False)
@@ -1,34 +1,315 @@
-from typing import Union
+import re
+from collections import Counter
+from datetime import datetime
+from typing import Iterable, List, Optional, Union
 
-from fastapi import HTTPException, status
-from sqlalchemy import desc
-from sqlalchemy.orm import Session
+from fastapi import Depends, HTTPException, Query, status
+from pydantic import ValidationError
+from sqlalchemy import (
+    bindparam, case, delete, desc, false, func, insert, literal_column, or_,
+    select, update
+)
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload
 
+from core.broker import broker, get_feed_channel
+from core.cache import response_cache
 from core.config import settings
-from db.models import Post
-from db.repository.group import get_group
-from db.repository.user import get_user
-from schemas.schemas import PostCreate, PostPatch, PostUpdate
-
-
-def create_new_post(author_id: int, db: Session, post: PostCreate):
-    """Create new post."""
-    get_group(post.group_id, db)
-    created_post = Post(**post.model_dump(), author_id=author_id)
-    db.add(created_post)
-    db.commit()
-    db.refresh(created_post)
+from core.export import ExportFormat, format_rows, get_csv_header
+from core.projection import fields_params, get_schema_columns
+from db.models import Group, Post, User, get_search_vector, posts_fts
+from db.repository.feed import (
+    add_to_feeds, refill_feeds, remove_from_feeds
+)
+from db.repository.user import user_cache
+from schemas.schemas import PostCreate, PostPatch, PostShow, PostUpdate
+
+
+# Import columns of posts.csv preceded by id
+EXPORT_COLUMNS = (
+    Post.id, Post.title, Post.text, Post.pub_date, Post.author_id,
+    Post.group_id,
+)
+# Many-to-one relations are joined, so a page is still a single query
+EXPAND_OPTIONS = {
+    'author': joinedload(Post.author),
+    'group': joinedload(Post.group),
+}
+
+
+async def create_new_post(author_id: int, db: AsyncSession, post: PostCreate):
+    """Create new post, missing group is checked on constraint failure."""
+    try:
+        created_post = await db.scalar(
+            insert(Post)
+            .values(**post.model_dump(), author_id=author_id)
+            .returning(Post)
+        )
+        await add_to_feeds(db, [created_post.id], [created_post.group_id])
+        await change_posts_counts(db, Group, [created_post.group_id])
+        await change_posts_counts(db, User, [author_id])
+        await db.commit()
+    except IntegrityError:
+        await db.rollback()
+        if await group_exists(db, post.group_id):
+            raise
+        raise_group_not_found(post.group_id)
+    # Cached current user holds the posts counter
+    user_cache.delete(author_id)
+    await response_cache.invalidate('groups', 'posts')
+    await publish_post_event('created', created_post)
     return created_post
 
 
-def get_all_posts(db: Session):
-    """Get posts list."""
-    return db.query(Post).order_by(desc(Post.pub_date))
+async def create_posts(author_id: int, db: AsyncSession, posts: List[dict]):
+    """
+    Create valid posts with existing groups in one multi-row insert.
+
+    Invalid posts and posts of missing groups are reported by index.
+    """
+    errors, valid_posts = [], {}
+    for index, post in enumerate(posts):
+        try:
+            valid_posts[index] = PostCreate.model_validate(post)
+        except ValidationError as error:
+            errors.append({
+                'index': index, 'detail': get_validation_detail(error)
+            })
+    group_ids = set((await db.scalars(select(Group.id).where(
+        Group.id.in_({post.group_id for post in valid_posts.values()})
+    ))).all())
+    values = []
+    for index, post in valid_posts.items():
+        if post.group_id in group_ids:
+            values.append({**post.model_dump(), 'author_id': author_id})
+        else:
+            errors.append({
+                'index': index,
+                'detail': settings.OBJECT_NOT_FOUND_MSG.format(
+                    object='Group', id=post.group_id
+                ),
+            })
+    created_posts = []
+    if values:
+        try:
+            created_posts = (await db.scalars(
+                insert(Post).returning(Post, sort_by_parameter_order=True),
+                values,
+            )).all()
+            await add_to_feeds(
+                db,
+                [post.id for post in created_posts],
+                {post.group_id for post in created_posts},
+            )
+            await change_posts_counts(
+                db, Group, [post.group_id for post in created_posts]
+            )
+            await change_posts_counts(
+                db, User, [author_id] * len(created_posts)
+            )
+            await db.commit()
+        except IntegrityError:
+            # Group was deleted after the check above
+            await db.rollback()
+            raise HTTPException(
+                detail=settings.POSTS_CONFLICT_MSG,
+                status_code=status.HTTP_409_CONFLICT
+            )
+        user_cache.delete(author_id)
+        await response_cache.invalidate('groups', 'posts')
+        for created_post in created_posts:
+            await publish_post_event('created', created_post)
+    return {
+        'created': created_posts,
+        'errors': sorted(errors, key=lambda error: error['index']),
+    }
+
+
+def get_validation_detail(error: ValidationError) -> str:
+    """Get validation errors of post fields as one message."""
+    return '; '.join(
+        settings.INVALID_FIELD_MSG.format(
+            field='.'.join(map(str, item['loc'])) or 'post',
+            message=item['msg'],
+        )
+        for item in error.errors()
+    )
+
+
+async def change_posts_counts(
+    db: AsyncSession, model, ids: Iterable[int], change: int = 1
+):
+    """Change posts counters of groups or users by change for each id."""
+    table = model.__table__
+    await db.execute(
+        update(table)
+        .where(table.c.id == bindparam('counter_id'))
+        .values(posts_count=table.c.posts_count + bindparam('change')),
+        [
+            {'counter_id': id, 'change': count * change}
+            for id, count in Counter(ids).items()
+        ],
+    )
+
+
+async def move_posts_count(
+    db: AsyncSession, id: int, user_id: int, group_id: int
+):
+    """Move post of user from its group counter to counter of group_id."""
+    current_group_id = select(Post.group_id).where(
+        Post.id == id, Post.author_id == user_id
+    ).scalar_subquery()
+    await db.execute(
+        update(Group)
+        .where(
+            or_(Group.id == group_id, Group.id == current_group_id),
+            current_group_id != group_id,
+        )
+        .values(posts_count=Group.posts_count + case(
+            (Group.id == group_id, 1), else_=-1
+        ))
+        .execution_options(synchronize_session=False)
+    )
+
+
+async def publish_post_event(event: str, post):
+    """Push post event to live feeds of all posts and of its group."""
+    if event == 'deleted':
+        data = {'id': post.id, 'group_id': post.group_id}
+    else:
+        data = PostShow.model_validate(post).model_dump(mode='json')
+    await broker.publish(
+        (get_feed_channel(), get_feed_channel(post.group_id)),
+        {'event': event, 'post': data},
+    )
+
+
+def get_all_posts(
+    author_id: int = None, group_id: int = None, ids: List[int] = None
+):
+    """Get posts list query, filtered by author, group and ids if given."""
+    query = select(Post).order_by(desc(Post.pub_date), desc(Post.id))
+    if author_id is not None:
+        query = query.where(Post.author_id == author_id)
+    if group_id is not None:
+        query = query.where(Post.group_id == group_id)
+    if ids is not None:
+        query = query.where(Post.id.in_(ids))
+    return query
+
+
+def get_author_posts_count(author_id: int):
+    """Get posts count of author from counter, 0 for unknown author."""
+    return select(func.coalesce(
+        select(User.posts_count).where(User.id == author_id)
+        .scalar_subquery(),
+        0,
+    ))
+
+
+def get_export_query(since: datetime = None):
+    """Get posts export query, of posts changed since given time if set."""
+    query = select(*EXPORT_COLUMNS).order_by(Post.id)
+    if since is not None:
+        if since.tzinfo is not None:
+            # Dates are stored as naive local time
+            since = since.astimezone().replace(tzinfo=None)
+        query = query.where(Post.version >= since)
+    return query
+
+
+async def stream_posts(
+    db: AsyncSession, export_format: ExportFormat, since: datetime = None
+):
+    """
+    Stream posts export by batches of server-side cursor rows.
+
+    Request session is closed before streaming response is sent, it
+    reconnects on first query and is closed again by the stream.
+    """
+    try:
+        result = await db.stream(get_export_query(since).execution_options(
+            yield_per=settings.EXPORT_BATCH_SIZE
+        ))
+        if export_format == ExportFormat.csv:
+            yield get_csv_header(result.keys())
+        async for rows in result.partitions():
+            yield format_rows(rows, export_format)
+    finally:
+        await db.close()
+
+
+def search_posts(q: str, dialect: str):
+    """Get posts full-text search query ordered by relevance."""
+    words = re.findall(r'\w+', q)
+    query = select(Post)
+    if not words:
+        return query.where(false())
+    if dialect == 'postgresql':
+        vector = get_search_vector(Post.title, Post.text)
+        ts_query = func.plainto_tsquery(
+            literal_column(f"'{settings.SEARCH_LANGUAGE}'"), ' '.join(words)
+        )
+        return query.where(vector.op('@@')(ts_query)).order_by(
+            desc(func.ts_rank(vector, ts_query)), desc(Post.id)
+        )
+    fts_table = literal_column(posts_fts.name)
+    return query.join(posts_fts, posts_fts.c.rowid == Post.id).where(
+        fts_table.op('MATCH')(' '.join(f'"{word}"' for word in words))
+    ).order_by(func.bm25(fts_table), desc(Post.id))
+
+
+def get_expand_options(
+    expand: Optional[str] = Query(None, description=settings.EXPAND_NAME)
+):
+    """Get load options of post relations to embed or raise Exception."""
+    if expand is None:
+        return []
+    fields = set(expand.split(','))
+    if not fields <= EXPAND_OPTIONS.keys():
+        raise HTTPException(
+            detail=settings.INVALID_EXPAND_MSG.format(
+                fields=', '.join(EXPAND_OPTIONS)
+            ),
+            status_code=status.HTTP_400_BAD_REQUEST
+        )
+    return [EXPAND_OPTIONS[field] for field in sorted(fields)]
+
+
+PostFields = fields_params(Post, PostShow)
 
 
-def get_post(id: int, db: Session):
+def get_post_columns(
+    columns: Optional[list] = Depends(PostFields),
+    snippet_length: Optional[int] = Query(
+        None, ge=1, description=settings.SNIPPET_LENGTH_NAME
+    ),
+    options: list = Depends(get_expand_options),
+):
+    """Get posts columns to select, text cut in SQL, or raise Exception."""
+    if columns is None and snippet_length is None:
+        return None
+    if options:
+        raise HTTPException(
+            detail=settings.FIELDS_WITH_EXPAND_MSG,
+            status_code=status.HTTP_400_BAD_REQUEST
+        )
+    if columns is None:
+        columns = get_schema_columns(Post, PostShow)
+    if snippet_length is None:
+        return columns
+    return [
+        func.substr(Post.text, 1, snippet_length).label('text')
+        if column.key == 'text' else column for column in columns
+    ]
+
+
+async def get_post(id: int, db: AsyncSession, options: list = ()):
     """Get post detail by id or raise Exception."""
-    post = db.query(Post).filter(Post.id == id).first()
+    post = await db.scalar(
+        select(Post).where(Post.id == id).options(*options)
+    )
     if not post:
         raise HTTPException(
             detail=settings.OBJECT_NOT_FOUND_MSG.format(
@@ -39,26 +320,54 @@ def get_post(id: int, db: Session):
     return post
 
 
-def remove_post(id: int, db: Session, user_id: int):
-    """Delete post."""
-    post_in_db = db.query(Post).filter(Post.id == id)
-    if not post_in_db.first():
+async def group_exists(db: AsyncSession, id: int) -> bool:
+    """Check group exists."""
+    return await db.scalar(select(Group.id).where(Group.id == id)) is not None
+
+
+def raise_group_not_found(id: int):
+    """Raise Exception for post group that does not exist."""
+    raise HTTPException(
+        detail=settings.OBJECT_NOT_FOUND_MSG.format(object='Group', id=id),
+        status_code=status.HTTP_404_NOT_FOUND
+    )
+
+
+async def raise_post_forbidden(id: int, db: AsyncSession, action: str):
+    """Raise Exception for missing post or the post of another author."""
+    if not await db.scalar(select(Post.id).where(Post.id == id)):
         raise HTTPException(
             detail=settings.OBJECT_NOT_FOUND_MSG.format(
                 object='Post', id=id
             ),
             status_code=status.HTTP_404_NOT_FOUND
         )
-    if (post_in_db.first().author_id != user_id
-            and get_user(db, user_id).is_superuser is False):
-        raise HTTPException(
-            detail=settings.ONLY_POST_AUTHOR_ACTION_MSG.format(
-                action='delete'
-            ),
-            status_code=status.HTTP_401_UNAUTHORIZED
-        )
-    post_in_db.delete()
-    db.commit()
+    raise HTTPException(
+        detail=settings.ONLY_POST_AUTHOR_ACTION_MSG.format(action=action),
+        status_code=status.HTTP_401_UNAUTHORIZED
+    )
+
+
+async def remove_post(
+    id: int, db: AsyncSession, user_id: int, is_superuser: bool = False
+):
+    """Delete post in single statement if user may delete it."""
+    query = delete(Post).where(Post.id == id)
+    if not is_superuser:
+        query = query.where(Post.author_id == user_id)
+    deleted_post = (await db.execute(
+        query.returning(Post.id, Post.group_id, Post.author_id)
+    )).first()
+    if deleted_post is None:
+        await raise_post_forbidden(id, db, action='delete')
+    # Feed entries of the post are deleted by foreign key
+    await refill_feeds(db, [deleted_post.group_id])
+    await change_posts_counts(db, Group, [deleted_post.group_id], change=-1)
+    await change_posts_counts(db, User, [deleted_post.author_id], change=-1)
+    await db.commit()
+    user_cache.delete(deleted_post.author_id)
+    await response_cache.invalidate('groups', 'posts')
+    await publish_post_event('deleted', deleted_post)
     return {
         'message': settings.OBJECT_DELETED_MSG.format(
             object='Post', id=id
@@ -66,28 +375,39 @@ def remove_post(id: int, db: Session, user_id: int):
     }
 
 
-def update_post_info(
+async def update_post_info(
     id: int,
     post: Union[PostUpdate, PostPatch],
-    db: Session,
+    db: AsyncSession,
     user_id: int
 ):
-    """Full or partial update existing post."""
-    post_in_db = get_post(id, db)
-    if post_in_db.author_id != user_id:
-        raise HTTPException(
-            detail=settings.ONLY_POST_AUTHOR_ACTION_MSG.format(
-                action='edit'
-            ),
-            status_code=status.HTTP_401_UNAUTHORIZED
-        )
+    """Full or partial update existing post, moving it between groups."""
     if post.group_id is not None:
-        get_group(post.group_id, db)
-    if isinstance(post, PostPatch):
-        for attr, value in post.model_dump(exclude_unset=True).items():
-            post_in_db.__setattr__(attr, value)
-    elif isinstance(post, PostUpdate):
-        for attr, value in post.model_dump().items():
-            post_in_db.__setattr__(attr, value)
-    db.commit()
+        await move_posts_count(db, id, user_id, post.group_id)
+    try:
+        post_in_db = await db.scalar(
+            update(Post)
+            .where(Post.id == id, Post.author_id == user_id)
+            .values(**post.model_dump(
+                exclude_unset=isinstance(post, PostPatch)
+            ))
+            .returning(Post)
+            .execution_options(populate_existing=True)
+        )
+    except IntegrityError:
+        await db.rollback()
+        if post.group_id is None or await group_exists(db, post.group_id):
+            raise
+        raise_group_not_found(post.group_id)
+    if post_in_db is None:
+        await raise_post_forbidden(id, db, action='edit')
+    if post.group_id is not None or post.pub_date is not None:
+        feed_ids = await remove_from_feeds(db, id)
+        await add_to_feeds(db, [id], [post_in_db.group_id])
+        await refill_feeds(db, {*feed_ids, post_in_db.group_id})
+    await db.commit()
+    await response_cache.invalidate(
+        'posts', *(() if post.group_id is None else ('groups',))
+    )
+    await publish_post_event('updated', post_in_db)
     return post_in_db
@@ -1,36 +1,47 @@
 from typing import Union
 
 from fastapi import HTTPException, status
-from sqlalchemy import desc
-from sqlalchemy.orm import Session
+from sqlalchemy import desc, select
+from sqlalchemy.ext.asyncio import AsyncSession
 
+from core.cache import TTLCache
 from core.config import settings
 from core.hashing import Hasher
+from core.projection import fields_params
 from db.models import User
-from schemas.schemas import UserCreate, UserPatch, UserUpdate
+from schemas.schemas import UserCreate, UserPatch, UserShow, UserUpdate
 
 
-def create_new_user(db: Session, user: UserCreate):
+UserFields = fields_params(User, UserShow)
+
+user_cache = TTLCache(
+    maxsize=settings.USER_CACHE_MAX_SIZE, ttl=settings.USER_CACHE_TTL
+)
+
+
+async def create_new_user(db: AsyncSession, user: UserCreate):
     """Create new user."""
     user_data = user.model_dump()
-    user_data.update({'password': Hasher.get_hashed_password(user.password)})
+    user_data.update({
+        'password': await Hasher.get_hashed_password_async(user.password)
+    })
     created_user = User(**user_data)
     db.add(created_user)
-    db.commit()
+    await db.commit()
     return created_user
 
 
-def get_all_users(db: Session):
-    """Get users list."""
-    return db.query(User).order_by(desc(User.date_joined))
+def get_all_users():
+    """Get users list query."""
+    return select(User).order_by(desc(User.date_joined))
 
 
-def get_user(db: Session, id: int = None, username: str = None):
+async def get_user(db: AsyncSession, id: int = None, username: str = None):
     """Get user from db by id or username or raise Exception."""
     if id is not None:
-        user = db.query(User).filter(User.id == id).first()
+        user = await db.scalar(select(User).where(User.id == id))
     elif username is not None:
-        user = db.query(User).filter(User.username == username).first()
+        user = await db.scalar(select(User).where(User.username == username))
     if not user:
         raise HTTPException(
             detail=settings.OBJECT_NOT_FOUND_MSG.format(
@@ -41,18 +52,19 @@ def get_user(db: Session, id: int = None, username: str = None):
     return user
 
 
-def update_user_info(
+async def update_user_info(
     current_user_id: int,
-    db: Session,
+    db: AsyncSession,
     user: Union[UserPatch, UserUpdate],
 ):
     """Full or partial update existing user."""
-    user_in_db = get_user(id=current_user_id, db=db)
+    user_in_db = await get_user(id=current_user_id, db=db)
     if isinstance(user, UserPatch):
         for attr, value in user.model_dump(exclude_unset=True).items():
             user_in_db.__setattr__(attr, value)
     elif isinstance(user, UserUpdate):
         for attr, value in user.model_dump().items():
             user_in_db.__setattr__(attr, value)
-    db.commit()
+    await db.commit()
+    user_cache.delete(current_user_id)
     return user_in_db
@@ -1,22 +1,187 @@
-from typing import Generator
+import itertools
+import time
+from typing import AsyncGenerator, Optional, Sequence, Union
 
-from sqlalchemy import create_engine
+from fastapi import Request
+from fastapi.security.utils import get_authorization_scheme_param
+from sqlalchemy import URL, Engine, create_engine, event, make_url
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine, async_sessionmaker, create_async_engine
+)
 from sqlalchemy.orm import sessionmaker
 
+from core.cache import import_string
 from core.config import settings
+from core.metrics import after_cursor_execute, before_cursor_execute
+from core.security import get_token_subject
 
 
-engine = create_engine(
-    settings.SQLALCHEMY_DATABASE_URL,
-    connect_args={'check_same_thread': False}
+ASYNC_DRIVERS = {
+    'postgresql': 'postgresql+asyncpg',
+    'sqlite': 'sqlite+aiosqlite',
+}
+SQLITE_PRAGMAS = (
+    'foreign_keys=ON',
+    'journal_mode=WAL',
+    'synchronous=NORMAL',
+    f'mmap_size={settings.SQLITE_MMAP_SIZE}',
 )
+
+
+def get_async_url(url: Union[str, URL]) -> URL:
+    """Get url of the same database with async driver."""
+    url = make_url(url)
+    return url.set(drivername=ASYNC_DRIVERS[url.get_backend_name()])
+
+
+def get_engine_options(url: Union[str, URL]) -> dict:
+    """Get pool and connection options for the database backend."""
+    url = make_url(url)
+    if url.get_backend_name() == 'sqlite':
+        return {'connect_args': {
+            'check_same_thread': False,
+            'timeout': settings.DB_STATEMENT_TIMEOUT / 1000,
+        }}
+    if url.get_driver_name() == 'asyncpg':
+        connect_args = {'server_settings': {
+            'statement_timeout': str(settings.DB_STATEMENT_TIMEOUT)
+        }}
+    else:
+        connect_args = {
+            'options': f'-c statement_timeout={settings.DB_STATEMENT_TIMEOUT}'
+        }
+    # Default pool of server databases is QueuePool
+    return {
+        'connect_args': connect_args,
+        'max_overflow': settings.DB_MAX_OVERFLOW,
+        'pool_pre_ping': settings.DB_POOL_PRE_PING,
+        'pool_recycle': settings.DB_POOL_RECYCLE,
+        'pool_size': settings.DB_POOL_SIZE,
+        'pool_timeout': settings.DB_POOL_TIMEOUT,
+    }
+
+
+def set_sqlite_pragmas(dbapi_connection, connection_record):
+    """Let SQLite readers work alongside the writer with less fsync."""
+    cursor = dbapi_connection.cursor()
+    for pragma in SQLITE_PRAGMAS:
+        cursor.execute(f'PRAGMA {pragma}')
+    cursor.close()
+
+
+def get_engine(
+    url: Union[str, URL], **options
+) -> Union[AsyncEngine, Engine]:
+    """Create sync or async (by url driver) engine tuned for its backend."""
+    url = make_url(url)
+    options = {**get_engine_options(url), **options}
+    if url.get_dialect().is_async:
+        engine = create_async_engine(url, **options)
+        sync_engine = engine.sync_engine
+    else:
+        engine = sync_engine = create_engine(url, **options)
+    if url.get_backend_name() == 'sqlite':
+        event.listen(sync_engine, 'connect', set_sqlite_pragmas)
+    event.listen(sync_engine, 'before_cursor_execute', before_cursor_execute)
+    event.listen(sync_engine, 'after_cursor_execute', after_cursor_execute)
+    return engine
+
+
+class ReplicaRouter:
+    """
+    Pick read replica engines round-robin, skipping unhealthy ones.
+
+    Replica health is checked by connecting at most once per check
+    interval, not on every read.
+    """
+
+    def __init__(
+        self,
+        engines: Sequence[AsyncEngine],
+        retry_interval: float,
+        check_interval: float = settings.REPLICA_CHECK_INTERVAL,
+    ):
+        self.engines = list(engines)
+        self.retry_interval = retry_interval
+        self.check_interval = check_interval
+        self._counter = itertools.count()
+        self._healthy_until = [0.0] * len(self.engines)
+        self._unhealthy_until = [0.0] * len(self.engines)
+
+    async def get_engine(self) -> Optional[AsyncEngine]:
+        """Get next healthy replica engine or None if there is none."""
+        for _ in range(len(self.engines)):
+            index = next(self._counter) % len(self.engines)
+            now = time.monotonic()
+            if self._unhealthy_until[index] > now:
+                continue
+            engine = self.engines[index]
+            if self._healthy_until[index] > now:
+                return engine
+            try:
+                async with engine.connect():
+                    self._healthy_until[index] = now + self.check_interval
+                    return engine
+            except (DBAPIError, OSError):
+                self._unhealthy_until[index] = now + self.retry_interval
+        return None
+
+
+# Sync engine serves admin site, management commands and migrations
+engine = get_engine(settings.SQLALCHEMY_DATABASE_URL)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+async_engine = get_engine(
+    settings.SQLALCHEMY_ASYNC_DATABASE_URL
+    or get_async_url(settings.SQLALCHEMY_DATABASE_URL)
+)
+AsyncSessionLocal = async_sessionmaker(
+    async_engine, autoflush=False, expire_on_commit=False
+)
+
+
+replica_router = ReplicaRouter(
+    engines=[
+        get_engine(get_async_url(url))
+        for url in settings.SQLALCHEMY_REPLICA_URLS
+    ],
+    retry_interval=settings.REPLICA_RETRY_INTERVAL,
+)
+# Users who have just written read from primary. Workers share them only
+# with a shared RESPONSE_CACHE_BACKEND, in-memory one is per worker
+primary_readers = import_string(settings.RESPONSE_CACHE_BACKEND)(
+    maxsize=settings.USER_CACHE_MAX_SIZE
+)
+
 
-def get_db() -> Generator:
+async def stick_to_primary(user_id: int):
+    """Route user reads to primary for READ_YOUR_WRITES_TTL seconds."""
+    await primary_readers.set(
+        f'primary:{user_id}', True, settings.READ_YOUR_WRITES_TTL
+    )
+
+
+async def get_read_engine(user_id: Optional[str]) -> AsyncEngine:
+    """Get replica engine or primary one after the user own writes."""
+    if user_id is not None and await primary_readers.get(
+        f'primary:{user_id}'
+    ):
+        return async_engine
+    return await replica_router.get_engine() or async_engine
+
+
+async def get_db() -> AsyncGenerator:
     """Change db for tests and for deploy."""
-    try:
-        db = SessionLocal()
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+async def get_read_db(request: Request) -> AsyncGenerator:
+    """Get read-only session of replica, of primary if none is healthy."""
+    scheme, token = get_authorization_scheme_param(
+        request.headers.get('Authorization')
+    )
+    user_id = get_token_subject(token) if scheme.lower() == 'bearer' else None
+    async with AsyncSessionLocal(bind=await get_read_engine(user_id)) as db:
         yield db
-    finally:
-        db.close()
@@ -10,12 +10,21 @@ class GroupAdmin(ModelView, model=Group):
     column_exclude_list = [Group.description]
     column_searchable_list = [Group.slug, Group.title]
     column_default_sort = 'created_at'
+    form_excluded_columns = [Group.posts_count]
 
 
 class PostAdmin(ModelView, model=Post):
-    """Post model view for admin site."""
+    """
+    Post model view for admin site.
+
+    Posts are read-only, their writes go through the API to keep feeds,
+    counters, cache and live feeds in sync.
+    """
 
     name_plural = 'Posts'
+    can_create = False
+    can_delete = False
+    can_edit = False
     column_exclude_list = [Post.text, Post.author_id, Post.group_id]
     column_sortable_list = [Post.pub_date]
     column_searchable_list = [Post.author, Post.group, Post.title]
@@ -31,3 +40,4 @@ class UserAdmin(ModelView, model=User):
     column_sortable_list = [User.is_active, User.is_superuser]
     column_searchable_list = [User.email, User.last_name, User.username]
     column_default_sort = 'date_joined'
+    form_excluded_columns = [User.posts, User.posts_count]
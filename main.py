@@ -1,12 +1,20 @@
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
 from fastapi_pagination import add_pagination
 from sqladmin import Admin
 
+from core.cache import response_cache
+from core.compression import compressor
 from core.config import settings
+from core.hashing import hashing_pool
+from core.metrics import metrics, metrics_endpoint
+from core.middleware import (
+    CompressionMiddleware, MetricsMiddleware, ResponseCacheMiddleware
+)
 from db.models import Base
 from db.session import engine
 from internal.admin import GroupAdmin, PostAdmin, UserAdmin
-from routes.base import api_router
+from routes.base import CACHE_NAMESPACES, api_router
 
 
 def create_tables():
@@ -22,15 +30,33 @@ def include_router(app):
 def start_app():
     """Start Fast API app, create admin site."""
     app = FastAPI(
-        title=settings.PROJECT_NAME, version=settings.PROJECT_VERSION
+        title=settings.PROJECT_NAME,
+        version=settings.PROJECT_VERSION,
+        default_response_class=ORJSONResponse,
     )
     admin = Admin(app, engine)
     admin.add_view(GroupAdmin)
     admin.add_view(PostAdmin)
     admin.add_view(UserAdmin)
     create_tables()
-    add_pagination(app)
     include_router(app)
+    add_pagination(app)
+    app.add_middleware(CompressionMiddleware, compressor=compressor)
+    app.add_middleware(
+        ResponseCacheMiddleware,
+        cache=response_cache,
+        namespaces=CACHE_NAMESPACES,
+        compressor=compressor,
+    )
+    app.add_middleware(
+        MetricsMiddleware,
+        metrics=metrics,
+        server_timing=settings.SERVER_TIMING_ENABLED,
+    )
+    app.add_route(
+        settings.METRICS_URL, metrics_endpoint, include_in_schema=False
+    )
+    app.add_event_handler('shutdown', hashing_pool.shutdown)
     return app
 
 
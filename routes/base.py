@@ -4,6 +4,13 @@ from routes.v1 import groups, login, posts, users
 
 
 API_URL_PREFIX = '/api/v1'
+# Public GET responses cached by ResponseCacheMiddleware, path pattern to
+# namespace invalidated by the repository mutators
+CACHE_NAMESPACES = (
+    (rf'^{API_URL_PREFIX}/groups/\d+/posts', 'posts'),
+    (f'^{API_URL_PREFIX}/groups', 'groups'),
+    (f'^{API_URL_PREFIX}/posts', 'posts'),
+)
 
 api_router = APIRouter()
 api_router.include_router(
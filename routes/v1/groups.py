@@ -1,10 +1,17 @@
-from fastapi import APIRouter, Depends, status
-from fastapi_pagination.ext.sqlalchemy import paginate
-from sqlalchemy.orm import Session
+from typing import Optional
 
-from core.pagination import GroupPaginator
-from db.models import User
+from fastapi import APIRouter, Depends, Request, Response, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.etag import get_with_etag, paginate_with_etag
+from core.pagination import (
+    CursorPage, CursorParams, GroupCursorParams, GroupPaginator,
+    PostPaginator, paginate_by_cursor
+)
+from db.models import Group
+from db.repository.feed import paginate_feed
 from db.repository.group import (
+    GroupFields,
     create_new_group,
     get_all_groups,
     get_group,
@@ -12,58 +19,113 @@ from db.repository.group import (
     update_group_info,
 )
 from db.repository.login import check_is_superuser
-from db.session import get_db
-from schemas.schemas import GroupCreate, GroupShow, GroupUpdate
+from db.repository.post import (
+    get_all_posts, get_expand_options, get_post_columns
+)
+from db.session import get_db, get_read_db
+from schemas.schemas import (
+    GroupCreate, GroupShow, GroupUpdate, PostShow, Principal
+)
 
 
 router = APIRouter()
 
 
 @router.get('/', response_model=GroupPaginator[GroupShow])
-def get_groups_list(db: Session = Depends(get_db)):
-    return paginate(get_all_groups(db=db))
+async def get_groups_list(
+    request: Request,
+    response: Response,
+    columns: Optional[list] = Depends(GroupFields),
+    db: AsyncSession = Depends(get_read_db),
+):
+    return await paginate_with_etag(
+        request,
+        response,
+        db,
+        get_all_groups(),
+        Group,
+        schema=GroupShow,
+        columns=columns,
+    )
+
+
+@router.get('/cursor', response_model=CursorPage[GroupShow])
+async def get_groups_cursor_list(
+    db: AsyncSession = Depends(get_read_db),
+    params: CursorParams = Depends(GroupCursorParams),
+):
+    return await paginate_by_cursor(
+        db, get_all_groups(), Group.created_at, Group.id, params
+    )
 
 
 @router.post(
     '/', response_model=GroupShow, status_code=status.HTTP_201_CREATED
 )
-def create_group(
+async def create_group(
     group: GroupCreate,
-    current_user: User = Depends(check_is_superuser),
-    db: Session = Depends(get_db),
+    current_user: Principal = Depends(check_is_superuser),
+    db: AsyncSession = Depends(get_db),
 ):
-    return create_new_group(group=group, db=db)
+    return await create_new_group(group=group, db=db)
 
 
 @router.get('/{id}', response_model=GroupShow)
-def get_group_detail(id: int, db: Session = Depends(get_db)):
-    return get_group(id=id, db=db)
+async def get_group_detail(
+    id: int,
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_read_db),
+):
+    return await get_with_etag(request, response, db, Group, id, get_group)
+
+
+@router.get('/{id}/posts', response_model=PostPaginator[PostShow])
+async def get_group_posts_list(
+    id: int,
+    request: Request,
+    response: Response,
+    options: list = Depends(get_expand_options),
+    columns: Optional[list] = Depends(get_post_columns),
+    db: AsyncSession = Depends(get_read_db),
+):
+    await get_group(id=id, db=db)
+    return await paginate_feed(
+        request,
+        response,
+        db,
+        get_all_posts(group_id=id),
+        group_id=id,
+        options=options,
+        schema=PostShow,
+        columns=columns,
+    )
 
 
 @router.put('/{id}', response_model=GroupShow)
-def update_group(
+async def update_group(
     id: int,
     group: GroupUpdate,
-    current_user: User = Depends(check_is_superuser),
-    db: Session = Depends(get_db),
+    current_user: Principal = Depends(check_is_superuser),
+    db: AsyncSession = Depends(get_db),
 ):
-    return update_group_info(id=id, group=group, db=db)
+    return await update_group_info(id=id, group=group, db=db)
 
 
 @router.patch('/{id}', response_model=GroupShow)
-def partial_update_group(
+async def partial_update_group(
     id: int,
     group: GroupUpdate,
-    current_user: User = Depends(check_is_superuser),
-    db: Session = Depends(get_db),
+    current_user: Principal = Depends(check_is_superuser),
+    db: AsyncSession = Depends(get_db),
 ):
-    return update_group_info(id=id, group=group, db=db)
+    return await update_group_info(id=id, group=group, db=db)
 
 
 @router.delete('/{id}', status_code=status.HTTP_204_NO_CONTENT)
-def delete_group(
+async def delete_group(
     id: int,
-    current_user: User = Depends(check_is_superuser),
-    db: Session = Depends(get_db),
+    current_user: Principal = Depends(check_is_superuser),
+    db: AsyncSession = Depends(get_db),
 ):
-    return remove_group(id=id, db=db)
+    return await remove_group(id=id, db=db)
@@ -1,8 +1,8 @@
 from fastapi import APIRouter, Depends
 from fastapi.security import OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from core.security import create_access_token
+from core.security import create_access_token, get_token_claims
 from db.repository.login import authenticate_user
 from db.session import get_db
 from schemas.schemas import Token
@@ -12,14 +12,13 @@ router = APIRouter()
 
 
 @router.post('/token', response_model=Token)
-def login_for_access_token(
-    db: Session = Depends(get_db),
+async def login_for_access_token(
+    db: AsyncSession = Depends(get_db),
     form_data: OAuth2PasswordRequestForm = Depends(),
 ):
     """Get access token for request user."""
-    user = authenticate_user(form_data.username, form_data.password, db)
+    user = await authenticate_user(form_data.username, form_data.password, db)
     return {
-        'access_token': create_access_token(
-            data={'username': user.username, 'password': user.password}),
+        'access_token': create_access_token(data=get_token_claims(user)),
         'token_type': 'Bearer'
     }
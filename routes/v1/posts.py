@@ -1,67 +1,275 @@
-from fastapi import APIRouter, Depends, status
-from fastapi_pagination.ext.sqlalchemy import paginate
-from sqlalchemy.orm import Session
+from datetime import datetime
+from functools import partial
+from typing import List, Optional
 
-from core.pagination import PostPaginator
-from db.models import User
-from db.repository.login import get_current_user
+from fastapi import (
+    APIRouter, Body, Depends, HTTPException, Query, Request, Response,
+    WebSocket, status
+)
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.broker import broker, get_feed_channel, send_events, stream_events
+from core.config import settings
+from core.etag import (
+    get_page_with_etag, get_with_etag, paginate_with_etag
+)
+from core.export import EXPORT_MEDIA_TYPES, ExportFormat
+from core.pagination import (
+    CursorPage, CursorParams, PostCursorParams, PostPaginator,
+    paginate_by_cursor
+)
+from db.models import Post
+from db.repository.feed import paginate_feed
+from db.repository.login import check_is_superuser, get_current_principal
 from db.repository.post import (
-    create_new_post, get_all_posts, get_post, remove_post, update_post_info
+    create_new_post,
+    create_posts,
+    get_all_posts,
+    get_author_posts_count,
+    get_expand_options,
+    get_post,
+    get_post_columns,
+    remove_post,
+    search_posts,
+    stream_posts,
+    update_post_info,
+)
+from db.session import get_db, get_read_db
+from schemas.schemas import (
+    PostBulkResult, PostCreate, PostPatch, PostShow, PostUpdate, Principal
 )
-from db.session import get_db
-from schemas.schemas import PostCreate, PostPatch, PostShow, PostUpdate
 
 
 router = APIRouter()
 
 
+def get_ids(ids: Optional[str] = Query(None, description=settings.IDS_NAME)):
+    """Parse comma separated ids filter or raise Exception."""
+    if ids is None:
+        return None
+    try:
+        parsed_ids = [int(id) for id in ids.split(',')]
+    except ValueError:
+        parsed_ids = []
+    if not 0 < len(parsed_ids) <= settings.POSTS_IDS_MAX_COUNT:
+        raise HTTPException(
+            detail=settings.INVALID_IDS_MSG.format(
+                count=settings.POSTS_IDS_MAX_COUNT
+            ),
+            status_code=status.HTTP_400_BAD_REQUEST
+        )
+    return parsed_ids
+
+
 @router.get('/', response_model=PostPaginator[PostShow])
-def get_posts_list(db: Session = Depends(get_db)):
-    return paginate(get_all_posts(db=db))
+async def get_posts_list(
+    request: Request,
+    response: Response,
+    author_id: Optional[int] = Query(
+        None, description=settings.AUTHOR_ID_NAME
+    ),
+    ids: Optional[List[int]] = Depends(get_ids),
+    options: list = Depends(get_expand_options),
+    columns: Optional[list] = Depends(get_post_columns),
+    db: AsyncSession = Depends(get_read_db),
+):
+    query = get_all_posts(author_id=author_id, ids=ids)
+    if author_id is None and ids is None:
+        return await paginate_feed(
+            request,
+            response,
+            db,
+            query,
+            options=options,
+            schema=PostShow,
+            columns=columns,
+        )
+    if ids is not None:
+        # Ids lookup is never paginated, all found posts are responded
+        return await get_page_with_etag(
+            request,
+            response,
+            db,
+            query,
+            Post,
+            size=len(ids),
+            options=options,
+            schema=PostShow,
+            columns=columns,
+        )
+    return await paginate_with_etag(
+        request,
+        response,
+        db,
+        query,
+        Post,
+        count_query=get_author_posts_count(author_id),
+        options=options,
+        schema=PostShow,
+        columns=columns,
+    )
+
+
+@router.get('/cursor', response_model=CursorPage[PostShow])
+async def get_posts_cursor_list(
+    author_id: Optional[int] = Query(
+        None, description=settings.AUTHOR_ID_NAME
+    ),
+    options: list = Depends(get_expand_options),
+    db: AsyncSession = Depends(get_read_db),
+    params: CursorParams = Depends(PostCursorParams),
+):
+    return await paginate_by_cursor(
+        db,
+        get_all_posts(author_id=author_id),
+        Post.pub_date,
+        Post.id,
+        params,
+        options=options,
+    )
+
+
+@router.get('/search', response_model=PostPaginator[PostShow])
+async def search_posts_list(
+    request: Request,
+    response: Response,
+    q: str = Query(
+        min_length=1,
+        max_length=settings.SEARCH_QUERY_MAX_LENGTH,
+        description=settings.SEARCH_QUERY_NAME
+    ),
+    options: list = Depends(get_expand_options),
+    columns: Optional[list] = Depends(get_post_columns),
+    db: AsyncSession = Depends(get_read_db),
+):
+    return await paginate_with_etag(
+        request,
+        response,
+        db,
+        search_posts(q, db.bind.dialect.name),
+        Post,
+        options=options,
+        schema=PostShow,
+        columns=columns,
+    )
+
+
+@router.get('/export', response_class=StreamingResponse)
+async def export_posts(
+    export_format: ExportFormat = Query(
+        ExportFormat.ndjson, alias='format',
+        description=settings.EXPORT_FORMAT_NAME
+    ),
+    since: Optional[datetime] = Query(
+        None, description=settings.EXPORT_SINCE_NAME
+    ),
+    current_user: Principal = Depends(check_is_superuser),
+    db: AsyncSession = Depends(get_read_db),
+):
+    return StreamingResponse(
+        stream_posts(db, export_format, since),
+        headers={'Content-Disposition': (
+            f'attachment; filename="posts.{export_format.value}"'
+        )},
+        media_type=EXPORT_MEDIA_TYPES[export_format],
+    )
+
+
+@router.get('/live', response_class=StreamingResponse)
+async def live_feed_events(
+    group_id: Optional[int] = Query(
+        None, description=settings.LIVE_GROUP_ID_NAME
+    ),
+):
+    return StreamingResponse(
+        stream_events(broker, get_feed_channel(group_id)),
+        headers={'Cache-Control': 'no-cache'},
+        media_type='text/event-stream',
+    )
+
+
+@router.websocket('/live')
+async def live_feed(
+    websocket: WebSocket,
+    group_id: Optional[int] = Query(
+        None, description=settings.LIVE_GROUP_ID_NAME
+    ),
+):
+    await send_events(broker, get_feed_channel(group_id), websocket)
 
 
 @router.post('/', response_model=PostShow, status_code=status.HTTP_201_CREATED)
-def create_post(
+async def create_post(
     post: PostCreate,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_db),
+):
+    return await create_new_post(author_id=current_user.id, db=db, post=post)
+
+
+@router.post(
+    '/bulk',
+    response_model=PostBulkResult,
+    status_code=status.HTTP_201_CREATED
+)
+async def create_posts_bulk(
+    # Items are validated one by one so each invalid post is reported
+    posts: List[dict] = Body(
+        min_length=1, max_length=settings.POSTS_BULK_MAX_SIZE
+    ),
+    current_user: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_db),
 ):
-    return create_new_post(author_id=current_user.id, db=db, post=post)
+    return await create_posts(author_id=current_user.id, db=db, posts=posts)
 
 
 @router.get('/{id}', response_model=PostShow)
-def get_post_detail(id: int, db: Session = Depends(get_db)):
-    return get_post(id=id, db=db)
+async def get_post_detail(
+    id: int,
+    request: Request,
+    response: Response,
+    options: list = Depends(get_expand_options),
+    db: AsyncSession = Depends(get_read_db),
+):
+    return await get_with_etag(
+        request, response, db, Post, id, partial(get_post, options=options)
+    )
 
 
 @router.put('/{id}', response_model=PostShow)
-def update_post(
+async def update_post(
     id: int,
     post: PostUpdate,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_db),
 ):
-    return update_post_info(
+    return await update_post_info(
         id=id, post=post, db=db, user_id=current_user.id
     )
 
 
 @router.patch('/{id}', response_model=PostShow)
-def partial_update_post(
+async def partial_update_post(
     id: int,
     post: PostPatch,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_db),
 ):
-    return update_post_info(
+    return await update_post_info(
         id=id, post=post, db=db, user_id=current_user.id
     )
 
 
 @router.delete('/{id}', status_code=status.HTTP_204_NO_CONTENT)
-def delete_post(
+async def delete_post(
     id: int,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_db),
 ):
-    return remove_post(id=id, db=db, user_id=current_user.id)
+    return await remove_post(
+        id=id,
+        db=db,
+        user_id=current_user.id,
+        is_superuser=current_user.is_superuser,
+    )
@@ -1,68 +1,88 @@
+from typing import Optional
+
 from fastapi import APIRouter, Depends, status
-from fastapi_pagination.ext.sqlalchemy import paginate
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from core.pagination import UserPaginator
+from core.pagination import (
+    CursorPage, CursorParams, UserCursorParams, UserPaginator,
+    paginate_by_cursor
+)
+from core.projection import paginate_rows
 from db.models import User
-from db.repository.login import check_is_superuser, get_current_user
+from db.repository.login import (
+    check_is_superuser, get_current_principal, get_current_user
+)
 from db.repository.user import (
-    create_new_user, get_all_users, get_user, update_user_info
+    UserFields, create_new_user, get_all_users, get_user, update_user_info
+)
+from db.session import get_db, get_read_db
+from schemas.schemas import (
+    Principal, UserCreate, UserPatch, UserShow, UserUpdate
 )
-from db.session import get_db
-from schemas.schemas import UserCreate, UserPatch, UserShow, UserUpdate
 
 
 router = APIRouter()
 
 
 @router.get('/me', response_model=UserShow)
-def about_me(
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
-):
+async def about_me(current_user: User = Depends(get_current_user)):
     """Get current user info."""
-    return get_user(id=current_user.id, db=db)
+    return current_user
 
 
 @router.put('/me', response_model=UserShow)
-def update_user(
+async def update_user(
     user: UserUpdate,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_db),
 ):
-    return update_user_info(
+    return await update_user_info(
         current_user_id=current_user.id, db=db, user=user
     )
 
 
 @router.patch('/me', response_model=UserShow)
-def partial_update_user(
+async def partial_update_user(
     user: UserPatch,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_db),
 ):
-    return update_user_info(
+    return await update_user_info(
         current_user_id=current_user.id, db=db, user=user
     )
 
 
 @router.get('/', response_model=UserPaginator[UserShow])
-def get_users_list(
-    current_user: User = Depends(check_is_superuser),
-    db: Session = Depends(get_db),
+async def get_users_list(
+    current_user: Principal = Depends(check_is_superuser),
+    columns: Optional[list] = Depends(UserFields),
+    db: AsyncSession = Depends(get_read_db),
 ):
-    return paginate(get_all_users(db=db))
+    return await paginate_rows(
+        db, get_all_users(), User, UserShow, columns=columns
+    )
+
+
+@router.get('/cursor', response_model=CursorPage[UserShow])
+async def get_users_cursor_list(
+    current_user: Principal = Depends(check_is_superuser),
+    db: AsyncSession = Depends(get_read_db),
+    params: CursorParams = Depends(UserCursorParams),
+):
+    return await paginate_by_cursor(
+        db, get_all_users(), User.date_joined, User.id, params
+    )
 
 
 @router.post('/', response_model=UserShow, status_code=status.HTTP_201_CREATED)
-def create_user(user: UserCreate, db: Session = Depends(get_db)):
-    return create_new_user(user=user, db=db)
+async def create_user(user: UserCreate, db: AsyncSession = Depends(get_db)):
+    return await create_new_user(user=user, db=db)
 
 
 @router.get('/{id}', response_model=UserShow)
-def get_user_detail(
+async def get_user_detail(
     id: int,
-    current_user: User = Depends(check_is_superuser),
-    db: Session = Depends(get_db),
+    current_user: Principal = Depends(check_is_superuser),
+    db: AsyncSession = Depends(get_read_db),
 ):
-    return get_user(id=id, db=db)
+    return await get_user(id=id, db=db)
@@ -1,7 +1,10 @@
 from datetime import datetime
-from typing import Optional, Union
+from typing import List, Optional, Union
 
-from pydantic import BaseModel, EmailStr, Field
+from pydantic import (
+    BaseModel, EmailStr, Field, model_serializer, model_validator
+)
+from sqlalchemy import inspect
 
 from core.config import settings
 
@@ -32,6 +35,18 @@ class GroupShow(GroupCreate):
 
     id: int
     created_at: datetime
+    posts_count: int
+
+    class Config:
+        from_attributes = True
+
+
+class GroupSummary(BaseModel):
+    """Serialize Group instance embedded into post."""
+
+    id: int
+    slug: str
+    title: str
 
     class Config:
         from_attributes = True
@@ -41,7 +56,7 @@ class PostCreate(BaseModel):
     """Serialize data for Post instance creation."""
 
     group_id: int
-    pub_date: Optional[datetime] = datetime.now()
+    pub_date: Optional[datetime] = Field(default_factory=datetime.now)
     text: str
     title: str = Field(max_length=settings.POST_TITLE_MAX_LENGTH)
 
@@ -60,6 +75,16 @@ class PostUpdate(PostCreate):
     pass
 
 
+class PostAuthor(BaseModel):
+    """Serialize User instance embedded into post."""
+
+    id: int
+    username: str
+
+    class Config:
+        from_attributes = True
+
+
 class PostShow(BaseModel):
     """Serialize data for safety methods with Post instance."""
 
@@ -69,10 +94,56 @@ class PostShow(BaseModel):
     pub_date: datetime
     text: str
     title: str
+    author: Optional[PostAuthor] = None
+    group: Optional[GroupSummary] = None
 
     class Config:
         from_attributes = True
 
+    @model_validator(mode='before')
+    @classmethod
+    def skip_unloaded(cls, data):
+        """Read only loaded attributes of Post instance, never lazy load."""
+        state = inspect(data, raiseerr=False)
+        if state is None:
+            return data
+        return {
+            field: getattr(data, field) for field in cls.model_fields
+            if field not in state.unloaded
+        }
+
+    @model_serializer(mode='wrap')
+    def skip_not_expanded(self, handler):
+        """Leave out relations which were not expanded."""
+        data = handler(self)
+        for field in ('author', 'group'):
+            if data.get(field) is None:
+                data.pop(field, None)
+        return data
+
+
+class PostBulkError(BaseModel):
+    """Serialize error of bulk created post."""
+
+    index: int
+    detail: str
+
+
+class PostBulkResult(BaseModel):
+    """Serialize result of bulk posts creation."""
+
+    created: List[PostShow]
+    errors: List[PostBulkError]
+
+
+class Principal(BaseModel):
+    """Serialize verified user data from access token claims."""
+
+    id: int = Field(alias='sub')
+    username: str
+    is_active: bool
+    is_superuser: bool
+
 
 class Token(BaseModel):
     """Serialize data for getting token."""
@@ -138,6 +209,7 @@ class UserShow(BaseModel):
     username: str
     is_active: bool
     is_superuser: bool
+    posts_count: int
 
     class Config:
         from_attributes = True
@@ -1,3 +1,4 @@
+import asyncio
 import os
 import sys
 from datetime import datetime, timedelta
@@ -5,17 +6,30 @@ from datetime import datetime, timedelta
 from jose import jwt
 from fastapi import FastAPI
 from fastapi_pagination import add_pagination
+from fastapi.responses import ORJSONResponse
 from fastapi.testclient import TestClient
-from sqlalchemy import create_engine
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import async_sessionmaker
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
 from typing import Any, Generator
 import pytest
 
+from core.cache import response_cache
+from core.compression import compressor
 from core.config import settings
 from core.hashing import Hasher
+from core.metrics import metrics, metrics_endpoint
+from core.middleware import (
+    CompressionMiddleware, MetricsMiddleware, ResponseCacheMiddleware
+)
+from core.security import get_token_claims
 from db.models import Base, Group, Post, User
-from db.session import get_db
-from routes.base import API_URL_PREFIX, api_router
+from db.repository.user import user_cache
+from db.session import (
+    get_async_url, get_db, get_engine, get_read_db, primary_readers
+)
+from routes.base import API_URL_PREFIX, CACHE_NAMESPACES, api_router
 
 
 GROUP_DATA = {
@@ -59,17 +73,31 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 def start_app():
     """Start FastAPI app, include routes."""
-    app = FastAPI()
+    app = FastAPI(default_response_class=ORJSONResponse)
     app.include_router(api_router)
     add_pagination(app)
+    app.add_middleware(CompressionMiddleware, compressor=compressor)
+    app.add_middleware(
+        ResponseCacheMiddleware,
+        cache=response_cache,
+        namespaces=CACHE_NAMESPACES,
+        compressor=compressor,
+    )
+    app.add_middleware(MetricsMiddleware, metrics=metrics, server_timing=True)
+    app.add_route(
+        settings.METRICS_URL, metrics_endpoint, include_in_schema=False
+    )
     return app
 
 
 TEST_DATABASE_URL = 'sqlite:///test.db'
-engine = create_engine(
-    TEST_DATABASE_URL, connect_args={'check_same_thread': False}
-)
+engine = get_engine(TEST_DATABASE_URL)
 SessionTesting = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# Every TestClient runs its own event loop, so connections are not pooled
+async_engine = get_engine(get_async_url(TEST_DATABASE_URL), poolclass=NullPool)
+AsyncSessionTesting = async_sessionmaker(
+    async_engine, autoflush=False, expire_on_commit=False
+)
 
 
 @pytest.fixture(scope='function')
@@ -79,37 +107,62 @@ def app() -> Generator[FastAPI, Any, None]:
     _app = start_app()
     yield _app
     Base.metadata.drop_all(engine)
+    user_cache.clear()
+    asyncio.run(response_cache.clear())
+    asyncio.run(primary_readers.clear())
+    metrics.clear()
 
 
 @pytest.fixture(scope='function')
 def db_session(app: FastAPI) -> Generator[SessionTesting, Any, None]:
-    """Create test database session."""
-    connection = engine.connect()
-    transaction = connection.begin()
-    session = SessionTesting(bind=connection)
+    """
+    Create test database session.
+
+    App requests use their own async connection, so test data is committed
+    and tables are dropped by app fixture after the test.
+    """
+    session = SessionTesting()
     yield session  # Use session in tests
     session.close()
-    transaction.rollback()
-    connection.close()
 
 
 @pytest.fixture(scope='function')
 def client(
     app: FastAPI, db_session: SessionTesting
 ) -> Generator[TestClient, Any, None]:
-    """Create FastAPI TestClient, override the get_db dependency."""
+    """Create FastAPI TestClient, override the db session dependencies."""
 
-    def _get_test_db():
-        try:
-            yield db_session
-        finally:
-            pass
+    async def _get_test_db():
+        async with AsyncSessionTesting() as session:
+            try:
+                yield session
+            finally:
+                # Reload test objects changed by request from database
+                db_session.expire_all()
 
     app.dependency_overrides[get_db] = _get_test_db
+    app.dependency_overrides[get_read_db] = _get_test_db
     with TestClient(app) as client:
         yield client
 
 
+@pytest.fixture
+def query_counter():
+    """Collect SQL statements executed by app requests."""
+    statements = []
+
+    def count_statement(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(
+        async_engine.sync_engine, 'before_cursor_execute', count_statement
+    )
+    yield statements
+    event.remove(
+        async_engine.sync_engine, 'before_cursor_execute', count_statement
+    )
+
+
 @pytest.fixture
 def superuser(db_session):
     """Create and return superuser."""
@@ -129,9 +182,7 @@ def superuser_token(superuser):
     """Create JWT for superuser."""
     return jwt.encode(
         algorithm=settings.ENCODE_ALGORITHM,
-        claims={
-            'username': superuser.username, 'password': superuser.password
-        },
+        claims=get_token_claims(superuser),
         key=settings.SECRET_KEY,
     )
 
@@ -163,9 +214,7 @@ def author_token(author):
     """Create JWT for author."""
     return jwt.encode(
         algorithm=settings.ENCODE_ALGORITHM,
-        claims={
-            'username': author.username, 'password': author.password
-        },
+        claims=get_token_claims(author),
         key=settings.SECRET_KEY,
     )
 
@@ -214,9 +263,7 @@ def not_author_token(not_author):
     """Create JWT for not author."""
     return jwt.encode(
         algorithm=settings.ENCODE_ALGORITHM,
-        claims={
-            'username': not_author.username, 'password': not_author.password
-        },
+        claims=get_token_claims(not_author),
         key=settings.SECRET_KEY,
     )
 
@@ -292,6 +339,8 @@ def post(author, db_session, group):
         author_id=author.id, group_id=group.id, **POST_DATA
     )
     db_session.add(post)
+    author.posts_count += 1
+    group.posts_count += 1
     db_session.commit()
     return post
 
@@ -311,6 +360,8 @@ def many_posts(author, db_session, group):
         )
         for index in range(settings.PAGE_SIZE_POST + 1)
     ])
+    author.posts_count += settings.PAGE_SIZE_POST + 1
+    group.posts_count += settings.PAGE_SIZE_POST + 1
     db_session.commit()
 
 
@@ -326,6 +377,12 @@ def users_list():
     return f'{API_URL_PREFIX}/users'
 
 
+@pytest.fixture
+def users_cursor_list(users_list):
+    """Return users cursor list url."""
+    return f'{users_list}/cursor'
+
+
 @pytest.fixture
 def user_detail(not_author, users_list):
     """Return user detail url."""
@@ -344,18 +401,36 @@ def group_list():
     return f'{API_URL_PREFIX}/groups'
 
 
+@pytest.fixture
+def group_cursor_list(group_list):
+    """Return groups cursor list url."""
+    return f'{group_list}/cursor'
+
+
 @pytest.fixture
 def group_detail(group, group_list):
     """Return group detail url."""
     return f'{group_list}/{group.id}'
 
 
+@pytest.fixture
+def group_posts_list(group, group_list):
+    """Return group posts list url."""
+    return f'{group_list}/{group.id}/posts'
+
+
 @pytest.fixture
 def posts_list():
     """Return posts list url."""
     return f'{API_URL_PREFIX}/posts'
 
 
+@pytest.fixture
+def posts_cursor_list(posts_list):
+    """Return posts cursor list url."""
+    return f'{posts_list}/cursor'
+
+
 @pytest.fixture
 def post_detail(post, posts_list):
     """Return post detail url."""
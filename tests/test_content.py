@@ -1,6 +1,13 @@
+import csv
+import io
+import json
+from http import HTTPStatus
+
 import pytest
+from sqlalchemy import event
 
 from core.config import settings
+from db.models import Post
 from tests.conftest import (
     GROUP_UPDATED_DATA,
     POST_UPDATED_DATA,
@@ -36,6 +43,45 @@ def test_pagination(
     assert response.json().get('size') == page_size
 
 
+@pytest.mark.parametrize('url, client_, page_size, order_field', (
+    (
+        utils.GROUPS_CURSOR_LIST_URL,
+        utils.AUTHENTICATED_USER,
+        settings.PAGE_SIZE_GROUP,
+        'created_at'
+    ),
+    (
+        utils.POSTS_CURSOR_LIST_URL,
+        utils.AUTHENTICATED_USER,
+        settings.PAGE_SIZE_POST,
+        'pub_date'
+    ),
+    (
+        utils.USERS_CURSOR_LIST_URL,
+        utils.SUPERUSER,
+        settings.PAGE_SIZE_USER,
+        'date_joined'
+    ),
+))
+def test_cursor_pagination(
+    client_, many_groups, many_not_authors, many_posts, order_field,
+    page_size, url
+):
+    """Group, post, user cursor pages follow each other without gaps."""
+    first_page = client_.get(url).json()
+    assert len(first_page.get('items')) == page_size
+    assert first_page.get('total') is None
+    second_page = client_.get(url, params={
+        'cursor': first_page.get('next_cursor'), 'include_total': True
+    }).json()
+    assert second_page.get('next_cursor') is None
+    items = first_page.get('items') + second_page.get('items')
+    assert len({item.get('id') for item in items}) == len(items)
+    assert second_page.get('total') == len(items)
+    all_dates = [item.get(order_field) for item in items]
+    assert all_dates == sorted(all_dates, reverse=True)
+
+
 @pytest.mark.parametrize('url, client_, order_field', (
     (
         utils.GROUPS_LIST_URL,
@@ -57,6 +103,29 @@ def test_ordering(client_, many_groups, many_posts, order_field, url):
     assert all_dates == sorted(all_dates, reverse=True)
 
 
+def test_group_posts_and_author_filter(
+    client, db_session, group_list, group_updated, not_author, post,
+    posts_list
+):
+    """Group feed and author filter show matching posts only."""
+    db_session.add(Post(
+        author_id=not_author.id, group_id=group_updated.id,
+        text=POST_UPDATED_DATA.get('text'),
+        title=POST_UPDATED_DATA.get('title')
+    ))
+    db_session.commit()
+    for url, params in (
+        (f'{group_list}/{post.group_id}/posts', None),
+        (posts_list, {'author_id': post.author_id}),
+    ):
+        items = client.get(url, params=params).json().get('items')
+        assert [item.get('id') for item in items] == [post.id]
+    missing_id = max(post.group_id, group_updated.id) + 1
+    assert client.get(
+        f'{group_list}/{missing_id}/posts'
+    ).status_code == HTTPStatus.NOT_FOUND
+
+
 @pytest.mark.parametrize('client_, url, method, data', (
     (utils.SUPERUSER, utils.GROUPS_LIST_URL, 'get', None),
     (utils.SUPERUSER, utils.GROUPS_LIST_URL, 'post', GROUP_UPDATED_DATA),
@@ -163,3 +232,100 @@ def test_user_content(client_, data, not_author, users_list, method, url):
     assert 'last_name' in response
     assert 'username' in response
     assert 'is_superuser' in response
+
+
+def test_post_expand(
+    author, client, group, post, post_detail, posts_list, query_counter
+):
+    """Expanded posts embed author and group loaded in the same query."""
+    assert 'author' not in client.get(post_detail).json()
+    query_counter.clear()
+    response = client.get(post_detail, params={'expand': 'author,group'})
+    assert len(query_counter) == 1
+    assert response.json().get('author') == {
+        'id': author.id, 'username': author.username
+    }
+    assert response.json().get('group') == {
+        'id': group.id, 'slug': group.slug, 'title': group.title
+    }
+    query_counter.clear()
+    items = client.get(
+        posts_list, params={'expand': 'author'}
+    ).json().get('items')
+    assert len(query_counter) <= 3
+    assert items[0].get('author').get('id') == author.id
+    assert 'group' not in items[0]
+    assert client.get(
+        posts_list, params={'expand': 'comments'}
+    ).status_code == HTTPStatus.BAD_REQUEST
+
+
+def test_posts_list_rows(client, post, post_detail, posts_list):
+    """Posts list is read from columns rows without loading Post objects."""
+    loaded = []
+
+    def on_load(target, context):
+        loaded.append(target)
+
+    event.listen(Post, 'load', on_load)
+    try:
+        response = client.get(posts_list)
+    finally:
+        event.remove(Post, 'load', on_load)
+    assert loaded == []
+    assert response.headers.get('ETag') is not None
+    assert response.json().get('items') == [client.get(post_detail).json()]
+
+
+@pytest.mark.parametrize('url, client_, fields', (
+    (utils.GROUPS_LIST_URL, utils.AUTHENTICATED_USER, 'slug,id'),
+    (utils.POSTS_LIST_URL, utils.AUTHENTICATED_USER, 'title,pub_date'),
+    (utils.USERS_LIST_URL, utils.SUPERUSER, 'username'),
+))
+def test_list_fields(client_, fields, post, url):
+    """Lists show only requested fields, unknown fields are rejected."""
+    response = client_.get(url, params={'fields': fields})
+    assert response.status_code == HTTPStatus.OK
+    assert list(response.json().get('items')[0]) == fields.split(',')
+    assert client_.get(
+        url, params={'fields': 'password'}
+    ).status_code == HTTPStatus.BAD_REQUEST
+
+
+def test_posts_snippet(client, post, posts_list):
+    """Posts text is cut to snippet, projections have distinct ETags."""
+    response = client.get(posts_list, params={'snippet_length': 4})
+    assert response.json().get('items')[0].get('text') == post.text[:4]
+    etag = client.get(posts_list).headers.get('ETag')
+    assert response.headers.get('ETag') != etag
+    assert client.get(
+        posts_list, params={'snippet_length': 4},
+        headers={'If-None-Match': response.headers.get('ETag')},
+    ).status_code == HTTPStatus.NOT_MODIFIED
+    assert client.get(
+        posts_list, params={'fields': 'id', 'expand': 'author'}
+    ).status_code == HTTPStatus.BAD_REQUEST
+
+
+def test_posts_export(
+    many_posts, not_author_client, posts_list, superuser_client
+):
+    """Superuser streams all posts as NDJSON or importable .csv."""
+    url = f'{posts_list}/export'
+    assert not_author_client.get(
+        url
+    ).status_code == HTTPStatus.UNAUTHORIZED
+    response = superuser_client.get(url)
+    assert response.headers.get('Content-Type') == 'application/x-ndjson'
+    posts = [json.loads(line) for line in response.text.splitlines()]
+    assert len(posts) == settings.PAGE_SIZE_POST + 1
+    assert posts == sorted(posts, key=lambda post: post.get('id'))
+    response = superuser_client.get(url, params={'format': 'csv'})
+    rows = list(csv.DictReader(io.StringIO(response.text), delimiter='|'))
+    assert [row.get('id') for row in rows] == [
+        str(post.get('id')) for post in posts
+    ]
+    assert rows[0].get('text') == posts[0].get('text')
+    assert superuser_client.get(
+        url, params={'since': '2999-01-01T00:00:00'}
+    ).text == ''
@@ -1,7 +1,21 @@
+import asyncio
+import os
+import random
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime
 from http import HTTPStatus
 
+from click.testing import CliRunner
+import httpx
+from jose import jwt
 import pytest
+from sqlalchemy import event
+from sqlalchemy.exc import IntegrityError, OperationalError
 
+from benchmarks import __main__ as benchmarks_cli
+from benchmarks import runner as benchmark_runner
+from benchmarks.scenarios import SCENARIOS, Scenario, post_delete
+from benchmarks.workload import Workload
 from conftest import (
     GROUP_DATA,
     GROUP_UPDATED_DATA,
@@ -9,9 +23,24 @@ from conftest import (
     SUPERUSER_DATA,
     USER_NOT_AUTHOR_DATA,
     USER_UPDATED_DATA,
+    async_engine,
+    engine,
 )
-from core.hashing import Hasher
-from db.models import Group, Post, User
+from core.broker import Broker, InMemoryBrokerBackend
+from core.compression import compressor
+from core.config import settings
+from core.hashing import Hasher, HashingPool
+from core.security import get_token_claims
+from db.management.commands import (
+    import_csv, import_shards, rebuild_feeds, reconcile_counts, seed
+)
+from db.models import FeedEntry, Group, ImportCheckpoint, Post, User
+from db import session
+from db.session import (
+    ReplicaRouter, get_engine, get_engine_options, get_read_engine
+)
+from routes.base import API_URL_PREFIX
+import cli
 import utils
 
 
@@ -109,6 +138,24 @@ def test_auth_user_can_create_post(
     assert created_post.title == post_data.get('title')
 
 
+def test_default_dates_are_write_time(
+    author_client, db_session, group_list, post_data, post_updated_data,
+    posts_list, superuser_client
+):
+    """Dates missing from request are set at write, not at app start."""
+    started_at = datetime.now()
+    new_post = author_client.post(posts_list, json=post_data).json()
+    new_group = superuser_client.post(group_list, json={
+        **GROUP_DATA, 'slug': 'new-group'
+    }).json()
+    assert datetime.fromisoformat(new_post.get('pub_date')) >= started_at
+    assert db_session.get(Group, new_group.get('id')).created_at >= started_at
+    updated_at = datetime.now()
+    assert datetime.fromisoformat(author_client.put(
+        f'{posts_list}/{new_post.get("id")}', json=post_updated_data
+    ).json().get('pub_date')) >= updated_at
+
+
 @pytest.mark.parametrize('client_, data, status', (
     (utils.AUTHENTICATED_USER, utils.POST_DATA, HTTPStatus.UNAUTHORIZED),
     (utils.AUTHENTICATED_AUTHOR, utils.POST_UPDATED_DATA, HTTPStatus.OK),
@@ -231,3 +278,733 @@ def test_getting_access_token(client_, content, login, status):
     response = client_.post(login, data=USER_NOT_AUTHOR_DATA)
     assert response.status_code == status
     assert content in response.json()
+
+
+def test_access_token_claims(client, login, not_author):
+    """Access token identifies user and does not contain password hash."""
+    token = client.post(
+        login, data=USER_NOT_AUTHOR_DATA
+    ).json().get('access_token')
+    claims = jwt.decode(
+        token, settings.SECRET_KEY, algorithms=[settings.ENCODE_ALGORITHM]
+    )
+    assert claims.get('sub') == str(not_author.id)
+    assert claims.get('username') == not_author.username
+    assert claims.get('is_active') is True
+    assert claims.get('is_superuser') is False
+    assert 'password' not in claims
+
+
+def test_inactive_user_token_rejected(client, current_user_detail, not_author):
+    """Requests with token of inactive user are unauthorized."""
+    claims = get_token_claims(not_author)
+    claims.update({'is_active': False})
+    token = jwt.encode(
+        algorithm=settings.ENCODE_ALGORITHM,
+        claims=claims,
+        key=settings.SECRET_KEY,
+    )
+    assert client.get(
+        current_user_detail, headers={'Authorization': f'Bearer {token}'}
+    ).status_code == HTTPStatus.UNAUTHORIZED
+
+
+def test_hashing_pool():
+    """Hashes run in spawned worker processes and are counted."""
+    password = SUPERUSER_DATA['password']
+    pool = HashingPool(max_workers=1)
+    try:
+        hashed = asyncio.run(pool.run(Hasher.get_hashed_password, password))
+        assert pool.get_executor()._mp_context.get_start_method() == 'spawn'
+        assert asyncio.run(pool.run(
+            Hasher.verify_password, password, hashed
+        )) is True
+    finally:
+        pool.shutdown()
+    assert (pool.metrics.calls_count, pool.metrics.in_flight) == (2, 0)
+
+
+def test_hashing_pool_broken():
+    """Call to broken pool falls back to thread, pool is started again."""
+    password = SUPERUSER_DATA['password']
+    pool = HashingPool(max_workers=1)
+    executor = pool.get_executor()
+    try:
+        with pytest.raises(BrokenProcessPool):
+            executor.submit(os._exit, 1).result()
+        hashed = asyncio.run(pool.run(Hasher.get_hashed_password, password))
+        assert Hasher.verify_password(password, hashed)
+        assert pool.get_executor() is not executor
+    finally:
+        pool.shutdown()
+
+
+def test_response_compression(client, many_posts, monkeypatch, posts_list):
+    """Big responses are gzipped once, cached per accepted encoding."""
+    compressed = []
+    compress = compressor.compress
+
+    def count_compress(body, encoding):
+        compressed.append(encoding)
+        return compress(body, encoding)
+
+    monkeypatch.setattr(compressor, 'compress', count_compress)
+    monkeypatch.setattr(compressor, 'minimum_size', 1)
+    response = client.get(posts_list, headers={'Accept-Encoding': 'gzip'})
+    assert response.headers.get('Content-Encoding') == 'gzip'
+    assert 'Accept-Encoding' in response.headers.get('Vary')
+    assert response.headers.get('ETag').startswith('W/')
+    response = client.get(posts_list, headers={'Accept-Encoding': 'gzip'})
+    assert response.headers.get('X-Cache') == 'HIT'
+    assert response.headers.get('Content-Encoding') == 'gzip'
+    assert len(response.json().get('items')) == settings.PAGE_SIZE_POST
+    assert compressed == ['gzip']
+    assert client.get(
+        posts_list,
+        headers={
+            'Accept-Encoding': 'gzip',
+            'If-None-Match': response.headers.get('ETag'),
+        },
+    ).status_code == HTTPStatus.NOT_MODIFIED
+    response = client.get(
+        posts_list, headers={'Accept-Encoding': 'gzip;q=0, identity'}
+    )
+    assert response.headers.get('X-Cache') == 'MISS'
+    assert 'Content-Encoding' not in response.headers
+    monkeypatch.setattr(compressor, 'minimum_size', len(response.content))
+    response = client.get(posts_list, params={'size': 1})
+    assert 'Content-Encoding' not in response.headers
+
+
+def test_posts_list_cache_invalidation(
+    author_client, client, post_data, posts_list
+):
+    """Repeated posts list is cached until new post is created."""
+    assert client.get(posts_list).headers.get('X-Cache') == 'MISS'
+    response = client.get(posts_list)
+    assert response.headers.get('X-Cache') == 'HIT'
+    assert response.json().get('total') == 0
+    author_client.post(posts_list, json=post_data)
+    response = client.get(posts_list)
+    assert response.headers.get('X-Cache') == 'MISS'
+    assert response.json().get('total') == 1
+
+
+def test_expanded_posts_cache_invalidation(
+    client, group_detail, post, posts_list, superuser_client
+):
+    """Cached posts with embedded group are stale after group update."""
+    params = {'expand': 'group'}
+    client.get(posts_list, params=params)
+    assert client.get(
+        posts_list, params=params
+    ).headers.get('X-Cache') == 'HIT'
+    superuser_client.put(group_detail, json=GROUP_UPDATED_DATA)
+    response = client.get(posts_list, params=params)
+    assert response.headers.get('X-Cache') == 'MISS'
+    assert response.json().get('items')[0].get('group').get(
+        'title'
+    ) == GROUP_UPDATED_DATA.get('title')
+
+
+@pytest.mark.parametrize('client_', (
+    utils.AUTHENTICATED_AUTHOR, utils.UNAUTHENTICATED_USER
+))
+@pytest.mark.parametrize('url', (
+    utils.GROUP_DETAIL_URL,
+    utils.GROUPS_LIST_URL,
+    utils.POST_DETAIL_URL,
+    utils.POSTS_LIST_URL,
+))
+def test_conditional_get(client_, post, url):
+    """Unchanged group and post resources are not sent again."""
+    response = client_.get(url)
+    etag = response.headers.get('ETag')
+    assert etag is not None
+    assert 'Last-Modified' in response.headers
+    response = client_.get(url, headers={'If-None-Match': etag})
+    assert response.status_code == HTTPStatus.NOT_MODIFIED
+    assert response.content == b''
+
+
+def test_etag_changes_after_update(
+    author_client, post_detail, post_updated_data
+):
+    """Updated post does not match ETag of its previous version."""
+    etag = author_client.get(post_detail).headers.get('ETag')
+    author_client.put(post_detail, json=post_updated_data)
+    response = author_client.get(post_detail, headers={'If-None-Match': etag})
+    assert response.status_code == HTTPStatus.OK
+    assert response.headers.get('ETag') != etag
+
+
+@pytest.mark.parametrize('url', (
+    utils.POST_DETAIL_URL,
+    utils.POSTS_LIST_URL,
+))
+def test_expanded_etag_changes_after_group_update(
+    author_client, group_detail, post, superuser_client, url
+):
+    """ETag of post with embedded group covers the group version."""
+    params = {'expand': 'group'}
+    etag = author_client.get(url, params=params).headers.get('ETag')
+    assert author_client.get(
+        url, params=params, headers={'If-None-Match': etag}
+    ).status_code == HTTPStatus.NOT_MODIFIED
+    superuser_client.put(group_detail, json=GROUP_UPDATED_DATA)
+    response = author_client.get(
+        url, params=params, headers={'If-None-Match': etag}
+    )
+    assert response.status_code == HTTPStatus.OK
+    assert response.headers.get('ETag') != etag
+
+
+def test_posts_search_index_sync(
+    author_client, post, post_detail, post_updated_data, posts_list
+):
+    """Search finds created, updated posts and skips deleted ones."""
+    search_url = f'{posts_list}/search'
+
+    def search(q):
+        return [
+            item.get('id') for item
+            in author_client.get(search_url, params={'q': q}).json()['items']
+        ]
+
+    assert search('test post') == [post.id]
+    assert search('new') == []
+    assert search('"); DROP TABLE posts; --') == []
+    author_client.put(post_detail, json=post_updated_data)
+    assert search('new') == [post.id]
+    author_client.delete(post_detail)
+    assert search(post_updated_data.get('title')) == []
+
+
+def test_sqlite_engine_profile(app):
+    """SQLite connections use WAL journal with NORMAL synchronous mode."""
+    with engine.connect() as connection:
+        assert connection.exec_driver_sql(
+            'PRAGMA journal_mode'
+        ).scalar() == 'wal'
+        assert connection.exec_driver_sql(
+            'PRAGMA synchronous'
+        ).scalar() == 1
+
+
+@pytest.mark.parametrize('url, connect_args', (
+    (
+        'postgresql://user@localhost/postfeed',
+        {'options': f'-c statement_timeout={settings.DB_STATEMENT_TIMEOUT}'}
+    ),
+    (
+        'postgresql+asyncpg://user@localhost/postfeed',
+        {'server_settings': {
+            'statement_timeout': str(settings.DB_STATEMENT_TIMEOUT)
+        }}
+    ),
+))
+def test_server_engine_options(connect_args, url):
+    """Server databases use tuned pool with statement timeout."""
+    options = get_engine_options(url)
+    assert options.get('connect_args') == connect_args
+    assert options.get('pool_size') == settings.DB_POOL_SIZE
+    assert options.get('pool_pre_ping') is settings.DB_POOL_PRE_PING
+
+
+def test_replica_router_skips_unhealthy(app):
+    """Replica router skips unavailable replicas, reuses health checks."""
+    broken_replica = get_engine('sqlite+aiosqlite:////nonexistent/replica.db')
+    router = ReplicaRouter([broken_replica, async_engine], retry_interval=60)
+    assert asyncio.run(router.get_engine()) is async_engine
+    assert asyncio.run(router.get_engine()) is async_engine
+    assert asyncio.run(
+        ReplicaRouter([broken_replica], retry_interval=60).get_engine()
+    ) is None
+    checkouts = []
+
+    def count_checkout(*args):
+        checkouts.append(args)
+
+    event.listen(async_engine.sync_engine, 'checkout', count_checkout)
+    try:
+        router = ReplicaRouter([async_engine], retry_interval=60)
+        for _ in range(3):
+            assert asyncio.run(router.get_engine()) is async_engine
+    finally:
+        event.remove(async_engine.sync_engine, 'checkout', count_checkout)
+    assert len(checkouts) == 1
+
+
+def test_read_your_writes(app, author, author_client, monkeypatch, post_data):
+    """Author reads go to primary after own write, others to replica."""
+    replica = get_engine('sqlite+aiosqlite:///test.db')
+    monkeypatch.setattr(
+        session, 'replica_router', ReplicaRouter([replica], retry_interval=60)
+    )
+    assert asyncio.run(get_read_engine(str(author.id))) is replica
+    author_client.post(f'{API_URL_PREFIX}/posts', json=post_data)
+    assert asyncio.run(
+        get_read_engine(str(author.id))
+    ) is session.async_engine
+    assert asyncio.run(get_read_engine(None)) is replica
+
+
+@pytest.mark.parametrize('method, url, data, queries_count', (
+    ('get', utils.POST_DETAIL_URL, None, 1),
+    ('get', utils.POSTS_LIST_URL, None, 3),
+    ('post', utils.POSTS_LIST_URL, utils.POST_DATA, 6),
+    ('put', utils.POST_DETAIL_URL, utils.POST_UPDATED_DATA, 7),
+    ('patch', utils.POST_DETAIL_URL, {}, 1),
+    ('delete', utils.POST_DETAIL_URL, None, 4),
+))
+def test_post_queries_count(
+    author_client, data, method, post, query_counter, queries_count, url
+):
+    """Post endpoints run fixed number of statements, feeds included."""
+    query_counter.clear()
+    response = author_client.request(method, url, json=data)
+    assert response.status_code < HTTPStatus.BAD_REQUEST
+    assert len(query_counter) == queries_count, query_counter
+
+
+def test_post_missing_group_and_author_errors(
+    db_session, group, group_list, not_author_client, post, post_data,
+    post_detail, posts_list, superuser_client
+):
+    """Post writes keep not found and author errors without extra reads."""
+    missing_post_url = f'{posts_list}/{post.id + 1}'
+    post_data.update({'group_id': group.id + 1})
+    assert not_author_client.post(
+        posts_list, json=post_data
+    ).status_code == HTTPStatus.NOT_FOUND
+    assert not_author_client.patch(
+        post_detail, json={'title': 'title'}
+    ).status_code == HTTPStatus.UNAUTHORIZED
+    assert not_author_client.delete(
+        missing_post_url
+    ).status_code == HTTPStatus.NOT_FOUND
+    assert superuser_client.delete(
+        f'{group_list}/{group.id}'
+    ).status_code == HTTPStatus.CONFLICT
+
+
+def test_post_author_constraint_error(
+    db_session, not_author, not_author_client, post_data, posts_list
+):
+    """Constraint failures other than missing group are not hidden."""
+    db_session.delete(not_author)
+    db_session.commit()
+    with pytest.raises(IntegrityError):
+        not_author_client.post(posts_list, json=post_data)
+
+
+def test_metrics(client, post, post_detail):
+    """Requests latency and database usage are exposed per route."""
+    server_timing = client.get(post_detail).headers.get('Server-Timing')
+    assert 'db;dur=' in server_timing
+    assert 'desc="1 queries"' in server_timing
+    client.get(post_detail)
+    response = client.get(settings.METRICS_URL)
+    assert response.status_code == HTTPStatus.OK
+    labels = '{method="GET",route="/api/v1/posts/{id}"}'
+    assert f'http_request_duration_seconds_count{labels} 2' in response.text
+    assert f'http_request_db_queries_sum{labels} 1' in response.text
+    assert 'password_hashing_in_flight 0' in response.text
+
+
+def test_query_timing_after_error(app):
+    """Failed statements leave no start times on pooled connection."""
+    with engine.connect() as connection:
+        with pytest.raises(OperationalError):
+            connection.exec_driver_sql('SELECT * FROM missing_table')
+        connection.exec_driver_sql('SELECT 1')
+        assert 'query_started_at' not in connection.info
+
+
+def test_create_posts_bulk(
+    author_client, group, posts_list, post_data, query_counter
+):
+    """Bulk posts are created in one insert, bad posts reported by index."""
+    posts = [
+        {**post_data, 'title': 'a'},
+        {**post_data, 'group_id': group.id + 1},
+        {**post_data, 'title': 'b'},
+        {**post_data, 'title': 'x' * (settings.POST_TITLE_MAX_LENGTH + 1)},
+        {'group_id': group.id},
+        {**post_data, 'title': 'c'},
+    ]
+    query_counter.clear()
+    response = author_client.post(f'{posts_list}/bulk', json=posts)
+    assert response.status_code == HTTPStatus.CREATED
+    created = response.json().get('created')
+    # SQLite has no ordered multi-row RETURNING, rows are inserted one by one
+    assert len(query_counter) == 6 + len(created)
+    assert [post.get('title') for post in created] == ['a', 'b', 'c']
+    assert [post.get('id') for post in created] == sorted(
+        post.get('id') for post in created
+    )
+    errors = response.json().get('errors')
+    assert [error.get('index') for error in errors] == [1, 3, 4]
+    assert errors[1].get('detail').startswith('title: ')
+    assert author_client.post(
+        f'{posts_list}/bulk', json=[]
+    ).status_code == HTTPStatus.UNPROCESSABLE_ENTITY
+
+
+def test_create_posts_bulk_group_deleted(
+    author_client, group, posts_list, post_data
+):
+    """Group deleted between check and insert is reported as conflict."""
+
+    def delete_group(conn, cursor, statement, parameters, context, many):
+        if statement.startswith('INSERT INTO posts'):
+            cursor.execute('DELETE FROM groups WHERE id = ?', (group.id,))
+
+    event.listen(
+        async_engine.sync_engine, 'before_cursor_execute', delete_group
+    )
+    try:
+        response = author_client.post(
+            f'{posts_list}/bulk', json=[post_data]
+        )
+    finally:
+        event.remove(
+            async_engine.sync_engine, 'before_cursor_execute', delete_group
+        )
+    assert response.status_code == HTTPStatus.CONFLICT
+
+
+def test_posts_ids_filter(
+    client, db_session, many_posts, posts_list, query_counter
+):
+    """Posts are fetched by ids in single query, never paginated."""
+    ids = [post.id for post in db_session.query(Post)]
+    assert len(ids) > settings.PAGE_SIZE_POST
+    query_counter.clear()
+    response = client.get(posts_list, params={'ids': ','.join(map(str, ids))})
+    assert len(query_counter) == 1
+    assert sorted(
+        item.get('id') for item in response.json().get('items')
+    ) == sorted(ids)
+    assert response.json().get('total') == len(ids)
+    etag = response.headers.get('ETag')
+    assert client.get(
+        posts_list,
+        params={'ids': ','.join(map(str, ids[:3])), 'expand': 'author'},
+    ).json().get('total') == 3
+    assert client.get(
+        posts_list,
+        params={'ids': ','.join(map(str, ids))},
+        headers={'If-None-Match': etag},
+    ).status_code == HTTPStatus.NOT_MODIFIED
+    for invalid_ids in ('1,a', ','.join(['1'] * 101)):
+        assert client.get(
+            posts_list, params={'ids': invalid_ids}
+        ).status_code == HTTPStatus.BAD_REQUEST
+
+
+def test_materialized_feed(
+    author_client, db_session, group, many_posts, monkeypatch, post_data,
+    posts_list
+):
+    """Feed pages match sorted posts while feed follows post writes."""
+    monkeypatch.setattr(rebuild_feeds, 'engine', engine)
+    monkeypatch.setattr(settings, 'FEED_SIZE', settings.PAGE_SIZE_POST)
+    rebuild_feeds.handle(size=settings.PAGE_SIZE_POST)
+
+    def get_feed_ids():
+        return [
+            post.get('id') for page in (1, 2) for post in author_client.get(
+                posts_list, params={'page': page}
+            ).json().get('items')
+        ]
+
+    def get_sorted_ids():
+        return [post.id for post in db_session.query(Post).order_by(
+            Post.pub_date.desc(), Post.id.desc()
+        )]
+
+    assert get_feed_ids() == get_sorted_ids()
+    new_post = author_client.post(posts_list, json=post_data).json()
+    assert new_post.get('id') in get_feed_ids()
+    assert get_feed_ids() == get_sorted_ids()
+    author_client.delete(f'{posts_list}/{new_post.get("id")}')
+    assert get_feed_ids() == get_sorted_ids()
+    db_session.expire_all()
+    assert db_session.query(FeedEntry).filter(
+        FeedEntry.group_id == settings.FEED_ALL_POSTS_ID
+    ).count() == settings.PAGE_SIZE_POST
+
+
+def test_imported_posts_feed(
+    author, client, group_list, monkeypatch, posts_list, superuser_client,
+    tmp_path
+):
+    """Imported posts are served by feeds of new group and of all posts."""
+    for module in (import_csv, rebuild_feeds, reconcile_counts):
+        monkeypatch.setattr(module, 'engine', engine)
+    new_group = superuser_client.post(group_list, json=GROUP_DATA).json()
+    path = tmp_path / 'posts.csv'
+    write_posts_shard(path, author, Group(**new_group), ['a', 'b', 'c'])
+    import_csv.handle(batch_size=2, file_path=path)
+    for url in (posts_list, f'{group_list}/{new_group.get("id")}/posts'):
+        page = client.get(url).json()
+        assert sorted(
+            post.get('title') for post in page.get('items')
+        ) == ['a', 'b', 'c']
+        assert page.get('total') == 3
+
+
+def test_posts_counts(
+    author, author_client, current_user_detail, db_session, group,
+    group_detail, group_updated, monkeypatch, post_data, post_updated_data,
+    posts_list
+):
+    """Posts counters follow posts writes, drifted ones are reconciled."""
+    assert author_client.get(
+        current_user_detail
+    ).json().get('posts_count') == 0
+    new_post = author_client.post(posts_list, json=post_data).json()
+    assert author_client.get(
+        current_user_detail
+    ).json().get('posts_count') == 1
+    post_detail = f'{posts_list}/{new_post.get("id")}'
+    for params in (None, {'author_id': author.id}):
+        assert author_client.get(
+            posts_list, params=params
+        ).json().get('total') == 1
+    assert author_client.get(
+        posts_list, params={'author_id': author.id + 100}
+    ).json().get('total') == 0
+    assert author_client.get(group_detail).json().get('posts_count') == 1
+    author_client.put(post_detail, json=post_updated_data)
+    db_session.expire_all()
+    assert (group.posts_count, group_updated.posts_count) == (0, 1)
+    assert author.posts_count == 1
+    author_client.delete(post_detail)
+    db_session.expire_all()
+    assert (group_updated.posts_count, author.posts_count) == (0, 0)
+    assert author_client.get(
+        current_user_detail
+    ).json().get('posts_count') == 0
+    author_client.post(posts_list, json=post_data)
+    group.posts_count = author.posts_count = 5
+    db_session.commit()
+    monkeypatch.setattr(reconcile_counts, 'engine', engine)
+    reconcile_counts.handle()
+    db_session.expire_all()
+    assert (group.posts_count, author.posts_count) == (1, 1)
+    assert author_client.get(posts_list).json().get('total') == 1
+
+
+def write_posts_shard(path, author, group, titles):
+    """Write posts .csv shard of author posts with given titles."""
+    path.write_text('\n'.join([
+        'author_id|group_id|pub_date|text|title',
+        *(
+            f'{author.id}|{group.id}|2026-01-01T00:00:00Z|Text {title}|{title}'
+            for title in titles
+        ),
+    ]), encoding='utf-8')
+
+
+def test_import_csv(author, db_session, group, monkeypatch, tmp_path):
+    """Posts .csv file is streamed by batches, the last one is flushed."""
+    for module in (import_csv, rebuild_feeds, reconcile_counts):
+        monkeypatch.setattr(module, 'engine', engine)
+    path = tmp_path / 'posts.csv'
+    write_posts_shard(path, author, group, ['a', 'b', 'c', 'd', 'e'])
+    batches = []
+
+    def count_batch(conn, cursor, statement, parameters, context, many):
+        if statement.startswith('INSERT INTO posts'):
+            batches.append(len(parameters) if many else 1)
+
+    event.listen(engine, 'before_cursor_execute', count_batch)
+    try:
+        result = CliRunner().invoke(cli.posts, [
+            'test-data', '--file', str(path), '--batch-size', '2'
+        ])
+    finally:
+        event.remove(engine, 'before_cursor_execute', count_batch)
+    assert result.exit_code == 0, result.output
+    assert batches == [2, 2, 1]
+    assert sorted(
+        post.title for post in db_session.query(Post)
+    ) == ['a', 'b', 'c', 'd', 'e']
+    path = path.rename(tmp_path / 'comments.csv')
+    assert CliRunner().invoke(
+        cli.posts, ['test-data', '--file', str(path)]
+    ).exit_code == 2
+
+
+def test_import_shards(author, db_session, group, monkeypatch, tmp_path):
+    """Valid rows of shards are imported, invalid rows are skipped."""
+    for module in (import_shards, rebuild_feeds, reconcile_counts):
+        monkeypatch.setattr(module, 'engine', engine)
+    write_posts_shard(tmp_path / 'posts-0001.csv', author, group, ['a', 'b'])
+    (tmp_path / 'posts-0002.csv').write_text('\n'.join([
+        'author_id|group_id|pub_date|text|title',
+        f'{author.id}|{group.id}|2026-01-01T00:00:00Z|Text|c',
+        f'{author.id}|{group.id}|2026-01-01T00:00:00Z|Text|',
+        f'{author.id}|{group.id}|not a date|Text|d',
+        f'{author.id}|{group.id + 1}|2026-01-01T00:00:00Z|Text|e',
+        f'{author.id}|{group.id}|2026-01-01T00:00:00Z|"Multi\nline"|f',
+    ]), encoding='utf-8')
+    import_shards.handle(directory=tmp_path, batch_size=2, workers=2)
+    assert sorted(
+        post.title for post in db_session.query(Post)
+    ) == ['a', 'b', 'c', 'f']
+    db_session.expire_all()
+    assert (group.posts_count, author.posts_count) == (4, 4)
+    assert [
+        (checkpoint.rows_count, checkpoint.is_completed)
+        for checkpoint in db_session.query(ImportCheckpoint).order_by(
+            ImportCheckpoint.rows_count
+        )
+    ] == [(2, True), (5, True)]
+
+
+def test_import_shards_checkpoints(
+    author, db_session, group, monkeypatch, tmp_path
+):
+    """Imported shards are skipped, new shard of same name is imported."""
+    for module in (import_shards, rebuild_feeds, reconcile_counts):
+        monkeypatch.setattr(module, 'engine', engine)
+    shard = tmp_path / 'posts-0001.csv'
+    write_posts_shard(shard, author, group, ['a', 'b', 'c'])
+    db_session.add(ImportCheckpoint(
+        shard=import_shards.get_shard_key(shard), rows_count=2
+    ))
+    db_session.commit()
+    import_shards.handle(directory=tmp_path, batch_size=2, workers=1)
+    import_shards.handle(directory=tmp_path, batch_size=2, workers=1)
+    assert [post.title for post in db_session.query(Post)] == ['c']
+    write_posts_shard(shard, author, group, ['d', 'e', 'f', 'g'])
+    import_shards.handle(directory=tmp_path, batch_size=2, workers=1)
+    assert sorted(
+        post.title for post in db_session.query(Post)
+    ) == ['c', 'd', 'e', 'f', 'g']
+
+
+def test_seed_data(db_session, monkeypatch):
+    """Seeded data is written in batches and deterministic by seed."""
+    monkeypatch.setattr(rebuild_feeds, 'engine', engine)
+    monkeypatch.setattr(reconcile_counts, 'engine', engine)
+    monkeypatch.setattr(seed, 'engine', engine)
+    seed.handle(users=3, groups=2, posts=25, seed=1, batch_size=10)
+    assert db_session.query(User).count() == 3
+    assert db_session.query(Group).count() == 2
+    assert db_session.query(Post).count() == 25
+    assert db_session.query(FeedEntry).count() == 25 * 2
+    assert sum(group.posts_count for group in db_session.query(Group)) == 25
+    start = datetime(2025, 1, 1)
+    end = datetime(2026, 1, 1)
+    assert list(seed.generate_posts(
+        random.Random(1), 10, [1, 2], [1, 2], start, end
+    )) == list(seed.generate_posts(
+        random.Random(1), 10, [1, 2], [1, 2], start, end
+    ))
+
+
+def test_benchmark_scenario_names():
+    """Scenarios offered by benchmarks CLI are the defined ones."""
+    assert benchmarks_cli.SCENARIO_NAMES == tuple(
+        scenario.name for scenario in SCENARIOS
+    )
+
+
+def test_benchmark_run_scenario():
+    """Scenario stats count sent, failed and skipped requests."""
+    statuses = iter((
+        HTTPStatus.OK, HTTPStatus.INTERNAL_SERVER_ERROR, None,
+        HTTPStatus.FOUND, HTTPStatus.OK,
+    ))
+
+    async def request(client, workload, rng):
+        status = next(statuses)
+        return None if status is None else httpx.Response(status)
+
+    stats = asyncio.run(benchmark_runner.run_scenario(
+        None, Scenario('test', request), None, requests=5, concurrency=2,
+        seed=0,
+    ))
+    assert (stats['requests'], stats['errors'], stats['skipped']) == (5, 2, 1)
+    assert stats['p50_ms'] <= stats['p95_ms'] <= stats['p99_ms']
+    assert benchmark_runner.percentile([1, 2, 3, 4], 50) == 2
+    empty_stats = asyncio.run(benchmark_runner.run_scenario(
+        None, Scenario('test', post_delete), Workload(1, 1, []),
+        requests=3, concurrency=2, seed=0,
+    ))
+    assert (empty_stats['skipped'], empty_stats['p99_ms']) == (3, 0)
+
+
+def test_benchmark_compare():
+    """Common scenarios are compared, change of zero metric is unknown."""
+    old = {'scenarios': {
+        'login': {'rps': 10, 'p50_ms': 0, 'p95_ms': 20, 'p99_ms': 40},
+        'removed': {'rps': 1, 'p50_ms': 1, 'p95_ms': 1, 'p99_ms': 1},
+    }}
+    new = {'scenarios': {
+        'login': {'rps': 15, 'p50_ms': 5, 'p95_ms': 10, 'p99_ms': 40},
+        'added': {'rps': 1, 'p50_ms': 1, 'p95_ms': 1, 'p99_ms': 1},
+    }}
+    assert benchmark_runner.compare(old, new) == [
+        ('login', 'rps', 10, 15, 50.0),
+        ('login', 'p50_ms', 0, 5, None),
+        ('login', 'p95_ms', 20, 10, -50.0),
+        ('login', 'p99_ms', 40, 40, 0.0),
+    ]
+
+
+def test_live_feed(
+    author_client, client, group, post_data, post_updated_data, posts_list
+):
+    """Posts changes are pushed to live feeds of all posts and of group."""
+    with client.websocket_connect(
+        f'{posts_list}/live'
+    ) as feed, client.websocket_connect(
+        f'{posts_list}/live?group_id={group.id}'
+    ) as group_feed:
+        new_post = author_client.post(posts_list, json=post_data).json()
+        post_detail = f'{posts_list}/{new_post.get("id")}'
+        for websocket in (feed, group_feed):
+            assert websocket.receive_json() == {
+                'event': 'created', 'post': new_post
+            }
+        updated_post = author_client.put(
+            post_detail, json=post_updated_data
+        ).json()
+        assert feed.receive_json() == {
+            'event': 'updated', 'post': updated_post
+        }
+        author_client.delete(post_detail)
+        assert feed.receive_json() == {
+            'event': 'deleted',
+            'post': {
+                'id': new_post.get('id'),
+                'group_id': post_updated_data.get('group_id'),
+            },
+        }
+
+
+def test_broker_drops_slow_consumer():
+    """Event is serialized once, subscriber with full queue is dropped."""
+
+    async def check():
+        broker = Broker(backend=InMemoryBrokerBackend(), queue_size=2)
+        async with broker.subscribe('feed') as slow, broker.subscribe(
+            'feed'
+        ) as fast:
+            await broker.publish(['feed'], {'id': 1})
+            event = await fast.get()
+            assert event is slow.queue.get_nowait()
+            assert event.sse == b'data: {"id":1}\n\n'
+            for id in range(3):
+                await broker.publish(['feed'], {'id': id})
+                assert (await fast.get()).text == f'{{"id":{id}}}'
+            assert await slow.get() is None
+            assert broker.subscriptions['feed'] == {fast}
+        assert broker.subscriptions == {}
+
+    asyncio.run(check())
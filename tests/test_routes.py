@@ -15,6 +15,7 @@ import utils
 
 @pytest.mark.parametrize('url, client_, status', (
     (utils.GROUP_DETAIL_URL, utils.UNAUTHENTICATED_USER, HTTPStatus.OK),
+    (utils.GROUP_POSTS_LIST_URL, utils.UNAUTHENTICATED_USER, HTTPStatus.OK),
     (utils.GROUPS_LIST_URL, utils.UNAUTHENTICATED_USER, HTTPStatus.OK),
     (utils.POST_DETAIL_URL, utils.UNAUTHENTICATED_USER, HTTPStatus.OK),
     (utils.POSTS_LIST_URL, utils.UNAUTHENTICATED_USER, HTTPStatus.OK),
@@ -38,6 +39,25 @@ def test_get_method_availability(url, client_, status):
     assert client_.get(url).status_code == status
 
 
+@pytest.mark.parametrize('url, client_, status', (
+    (utils.GROUPS_CURSOR_LIST_URL, utils.UNAUTHENTICATED_USER, HTTPStatus.OK),
+    (utils.POSTS_CURSOR_LIST_URL, utils.UNAUTHENTICATED_USER, HTTPStatus.OK),
+    (
+        utils.USERS_CURSOR_LIST_URL,
+        utils.AUTHENTICATED_USER,
+        HTTPStatus.UNAUTHORIZED
+    ),
+    (utils.USERS_CURSOR_LIST_URL, utils.SUPERUSER, HTTPStatus.OK),
+))
+def test_cursor_list_availability(url, client_, status):
+    """Cursor list availability for not auth, auth, superuser clients."""
+    assert client_.get(url).status_code == status
+    if status == HTTPStatus.OK:
+        assert client_.get(
+            url, params={'cursor': 'invalid'}
+        ).status_code == HTTPStatus.BAD_REQUEST
+
+
 @pytest.mark.parametrize('url, data, client_, status', (
     (
         utils.GROUPS_LIST_URL,
@@ -2,12 +2,16 @@ import pytest
 
 
 GROUP_DETAIL_URL = pytest.lazy_fixture('group_detail')
+GROUP_POSTS_LIST_URL = pytest.lazy_fixture('group_posts_list')
+GROUPS_CURSOR_LIST_URL = pytest.lazy_fixture('group_cursor_list')
 GROUPS_LIST_URL = pytest.lazy_fixture('group_list')
 LOGIN_URL = pytest.lazy_fixture('login')
 POST_DETAIL_URL = pytest.lazy_fixture('post_detail')
+POSTS_CURSOR_LIST_URL = pytest.lazy_fixture('posts_cursor_list')
 POSTS_LIST_URL = pytest.lazy_fixture('posts_list')
 USER_DETAIL_URL = pytest.lazy_fixture('user_detail')
 USER_ME_URL = pytest.lazy_fixture('current_user_detail')
+USERS_CURSOR_LIST_URL = pytest.lazy_fixture('users_cursor_list')
 USERS_LIST_URL = pytest.lazy_fixture('users_list')
 
 AUTHENTICATED_AUTHOR = pytest.lazy_fixture('author_client')